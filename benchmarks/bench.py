@@ -0,0 +1,345 @@
+"""SAA 热点路径的基准测试
+
+不依赖 nonebug，使用 `call_api` 被替换的假 Bot 直接调用 SAA，测量：
+
+- 各适配器的消息段构建
+- MessageFactory 的组合（`__add__`、`join`、`copy`）
+- `extract_target` / `get_message_id`
+- BOT_CACHE 很大时的 `get_bot`
+- PlatformTarget 的序列化与反序列化
+- 使用假 Bot 的端到端发送
+
+用法:
+
+    python benchmarks/bench.py                       # 运行全部基准
+    python benchmarks/bench.py -k build              # 只运行名称包含 build 的基准
+    python benchmarks/bench.py --save benchmarks/baseline.json
+    python benchmarks/bench.py --compare benchmarks/baseline.json
+
+--compare 会将结果与基线对比，单次耗时比基线慢超过 --threshold（默认 25%）时
+以非零状态码退出。基线与机器相关，在同一台机器上对比才有意义。
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+from pathlib import Path
+from collections.abc import Awaitable
+from typing import Any, Union, Callable
+
+import nonebot
+from nonebot.compat import model_dump
+from nonebot.adapters.qq import Bot as QQBot
+from nonebot.adapters.qq import Adapter as QQAdapter
+from nonebot.adapters.onebot.v11 import Bot as OB11Bot
+from nonebot.adapters.onebot.v12 import Bot as OB12Bot
+from nonebot.adapters.kaiheila import Bot as KaiheilaBot
+from nonebot.adapters.telegram import Bot as TelegramBot
+from nonebot.adapters.qq.config import BotInfo as QQBotInfo
+from nonebot.adapters.onebot.v11 import Adapter as OB11Adapter
+from nonebot.adapters.onebot.v11 import Message as OB11Message
+from nonebot.adapters.onebot.v12 import Adapter as OB12Adapter
+from nonebot.adapters.kaiheila import Adapter as KaiheilaAdapter
+from nonebot.adapters.telegram import Adapter as TelegramAdapter
+from nonebot.adapters.onebot.v11.event import Sender as OB11Sender
+from nonebot.adapters.onebot.v11 import GroupMessageEvent as OB11Event
+from nonebot.adapters.telegram.config import BotConfig as TelegramConfig
+
+# SAA 读取插件配置需要先初始化 NoneBot
+nonebot.init(driver="~fastapi+~httpx+~websockets")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from nonebot_plugin_saa.registries import get_message_id
+from nonebot_plugin_saa import (
+    Text,
+    Image,
+    Mention,
+    TargetQQGroup,
+    MessageFactory,
+    PlatformTarget,
+    AggregatedMessageFactory,
+    extract_target,
+    auto_select_bot,
+)
+
+ROUNDS = 5
+ROUND_TIME = 0.2
+
+Benchmark = Callable[[], Union[Any, Awaitable[Any]]]
+
+benchmarks: dict[str, Benchmark] = {}
+
+
+def register_benchmark(name: str):
+    def wrapper(func: Benchmark):
+        benchmarks[name] = func
+        return func
+
+    return wrapper
+
+
+async def fake_call_api(bot, api: str, **data: Any) -> Any:
+    # 各适配器需要的返回字段不同，统一返回一个包含常用字段的结果
+    return {
+        "message_id": 1,
+        "forward_id": "1",
+        "file_id": "1",
+        "url": "https://example.com/file",
+        "user_id": 2233,
+        "nickname": "bot",
+    }
+
+
+def make_bots() -> dict[str, Any]:
+    driver = nonebot.get_driver()
+    bots = {
+        "onebot_v11": OB11Bot(OB11Adapter(driver), "2233"),
+        "onebot_v12": OB12Bot(OB12Adapter(driver), "2233", "walle-q", "qq"),
+        "telegram": TelegramBot(
+            TelegramAdapter(driver),
+            "2233",
+            config=TelegramConfig(token="2233:token"),
+        ),
+        "kaiheila": KaiheilaBot(KaiheilaAdapter(driver), "2233", "bot", "token"),
+        "qq": QQBot(
+            QQAdapter(driver),
+            "2233",
+            QQBotInfo(id="2233", token="token", secret="secret"),
+        ),
+    }
+    for bot in bots.values():
+        bot.adapter._call_api = fake_call_api
+    return bots
+
+
+BOTS = make_bots()
+OB11_BOT = BOTS["onebot_v11"]
+
+SEGMENTS = {
+    "text": Text("hello world"),
+    "image": Image(b"\x89PNG" + bytes(1024)),
+    "mention": Mention("2233"),
+}
+
+
+# 开黑啦的图片需要上传，假 API 无法返回上传结果的模型
+SKIPPED_BUILDS = {("kaiheila", "image")}
+
+
+def register_build_benchmarks():
+    for adapter, bot in BOTS.items():
+        for segment_name, segment in SEGMENTS.items():
+            if (adapter, segment_name) in SKIPPED_BUILDS:
+                continue
+
+            async def build(bot=bot, segment=segment):
+                await segment.build(bot)
+
+            register_benchmark(f"build.{adapter}.{segment_name}")(build)
+
+
+register_build_benchmarks()
+
+MSG_A = MessageFactory([Text("hello"), Mention("2233"), Image("https://a.b/c.png")])
+MSG_B = MessageFactory([Text("world")] * 10)
+
+
+@register_benchmark("message_factory.add")
+def message_factory_add():
+    return MSG_A + MSG_B
+
+
+@register_benchmark("message_factory.join")
+def message_factory_join():
+    return MessageFactory(Text("\n")).join([MSG_A] * 10)
+
+
+@register_benchmark("message_factory.copy")
+def message_factory_copy():
+    return MSG_B.copy()
+
+
+OB11_EVENT = OB11Event(
+    time=1122,
+    self_id=2233,
+    group_id=3344,
+    post_type="message",
+    sub_type="",
+    user_id=2233,
+    message_type="group",
+    message_id=4455,
+    message=OB11Message("hello"),
+    original_message=OB11Message("hello"),
+    raw_message="hello",
+    font=1,
+    sender=OB11Sender(user_id=2233),
+    to_me=False,
+)
+
+
+@register_benchmark("extract_target.onebot_v11")
+def extract_target_ob11():
+    return extract_target(OB11_EVENT, OB11_BOT)
+
+
+@register_benchmark("get_message_id.onebot_v11")
+def get_message_id_ob11():
+    return get_message_id(OB11_EVENT)
+
+
+def fill_bot_cache(bot_count: int = 100, targets_per_bot: int = 100):
+    driver = nonebot.get_driver()
+    adapter = OB11Adapter(driver)
+    auto_select_bot.BOT_CACHE.clear()
+    for i in range(bot_count):
+        bot = OB11Bot(adapter, str(i))
+        auto_select_bot.BOT_CACHE[bot] = {
+            TargetQQGroup(group_id=i * targets_per_bot + j)
+            for j in range(targets_per_bot)
+        }
+    auto_select_bot.inited = True
+
+
+fill_bot_cache()
+CACHED_TARGET = TargetQQGroup(group_id=5050)
+
+
+@register_benchmark("get_bot.bot_cache_100x100")
+def get_bot_large_cache():
+    return auto_select_bot.get_bot(CACHED_TARGET)
+
+
+TARGET_DICT = model_dump(CACHED_TARGET)
+
+
+@register_benchmark("platform_target.serialize")
+def platform_target_serialize():
+    return model_dump(CACHED_TARGET)
+
+
+@register_benchmark("platform_target.deserialize")
+def platform_target_deserialize():
+    return PlatformTarget.deserialize(TARGET_DICT)
+
+
+SEND_TARGET = TargetQQGroup(group_id=3344)
+
+
+@register_benchmark("send.onebot_v11.text")
+async def send_ob11_text():
+    await MessageFactory("hello").send_to(SEND_TARGET, OB11_BOT)
+
+
+@register_benchmark("send.onebot_v11.mixed")
+async def send_ob11_mixed():
+    await MSG_A.send_to(SEND_TARGET, OB11_BOT)
+
+
+AGGREGATED = AggregatedMessageFactory([MessageFactory(f"node {i}") for i in range(10)])
+
+
+@register_benchmark("send.onebot_v11.aggregated_10")
+async def send_ob11_aggregated():
+    await AGGREGATED.send_to(SEND_TARGET, OB11_BOT)
+
+
+async def measure(func: Benchmark) -> dict[str, float]:
+    """返回每次调用的耗时（纳秒），取多轮中的最小值与中位数"""
+    is_async = asyncio.iscoroutinefunction(func)
+
+    async def run(n: int) -> float:
+        start = time.perf_counter_ns()
+        if is_async:
+            for _ in range(n):
+                await func()  # type: ignore
+        else:
+            for _ in range(n):
+                func()
+        return (time.perf_counter_ns() - start) / n
+
+    # 预热并确定每轮的调用次数
+    n = 1
+    while (await run(n)) * n < ROUND_TIME * 1e9 / 10:
+        n *= 2
+    n = max(1, int(ROUND_TIME * 1e9 / await run(n)))
+
+    results = [await run(n) for _ in range(ROUNDS)]
+    return {
+        "min_ns": round(min(results)),
+        "median_ns": round(statistics.median(results)),
+        "iterations": n,
+    }
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f}{unit}"
+    return f"{ns:.0f}ns"
+
+
+async def main(args: argparse.Namespace) -> int:
+    selected = {
+        name: func
+        for name, func in benchmarks.items()
+        if not args.keyword or any(k in name for k in args.keyword)
+    }
+    baseline = {}
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+
+    results = {}
+    regressions = []
+    for name, func in selected.items():
+        try:
+            result = await measure(func)
+        except Exception as e:
+            print(f"{name:<40} {'skipped':>10}  {e!r}")  # noqa: T201
+            continue
+        results[name] = result
+        line = f"{name:<40} {format_ns(result['min_ns']):>10}"
+        if name in baseline:
+            ratio = result["min_ns"] / baseline[name]["min_ns"]
+            line += f"  {ratio:>6.2f}x baseline"
+            if ratio > 1 + args.threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)  # noqa: T201
+
+    if args.save:
+        Path(args.save).write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                indent=2,
+                sort_keys=True,
+            )
+            + "\n"
+        )
+
+    if regressions:
+        print(  # noqa: T201
+            f"\n{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-k", "--keyword", action="append", help="只运行名称包含该字符串的基准"
+    )
+    parser.add_argument("--save", help="将结果保存为基线文件")
+    parser.add_argument("--compare", help="与基线文件对比")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="判定为性能回退的变慢比例"
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,165 @@
+"""SAA 的启动（导入）耗时基准
+
+在全新的解释器中使用 `python -X importtime` 导入 nonebot_plugin_saa，
+并导入所有已安装适配器的实现，统计：
+
+- `nonebot_plugin_saa` 及 `registries`、`abstract_factories`、`types`
+  和每个 `adapters/*` 模块（包括对应的 NoneBot 适配器）的累计导入耗时
+- SAA 中 pydantic 模型类（PlatformTarget、MessageId、Receipt 的子类等）的构建耗时
+
+每项取多次运行的中位数。
+
+用法:
+
+    python benchmarks/startup.py                     # 输出各项耗时
+    python benchmarks/startup.py --check             # 与预算对比，超出时返回非零
+    python benchmarks/startup.py --json result.json  # 保存结果
+
+预算保存在 benchmarks/startup_budget.json，单位为毫秒，
+按开发机上测得耗时的约 3 倍设置，只用于发现明显的回退。
+"""
+
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+BUDGET_FILE = Path(__file__).parent / "startup_budget.json"
+
+CHILD_SCRIPT = """
+import sys
+import json
+import time
+
+from nonebot.compat import PYDANTIC_V2
+
+if PYDANTIC_V2:
+    from pydantic._internal._model_construction import ModelMetaclass
+else:
+    from pydantic.main import ModelMetaclass
+
+model_times = {}
+original_new = ModelMetaclass.__new__
+
+
+def timed_new(mcs, name, bases, namespace, **kwargs):
+    start = time.perf_counter()
+    cls = original_new(mcs, name, bases, namespace, **kwargs)
+    module = namespace.get("__module__", "")
+    if module.startswith("nonebot_plugin_saa"):
+        model_times[f"{module}.{name}"] = time.perf_counter() - start
+    return cls
+
+
+ModelMetaclass.__new__ = timed_new
+
+import nonebot
+
+nonebot.init(driver="~none")
+
+import nonebot_plugin_saa
+from nonebot_plugin_saa.adapters import ADAPTER_MODULES, load_adapter
+
+# importlib.import_module 导入的模块不会出现在 -X importtime 的输出中，单独计时
+adapter_times = {}
+for adapter, (module, _) in ADAPTER_MODULES.items():
+    start = time.perf_counter()
+    load_adapter(adapter)
+    if f"nonebot_plugin_saa.adapters.{module}" in sys.modules:
+        adapter_times[f"nonebot_plugin_saa.adapters.{module}"] = (
+            time.perf_counter() - start
+        )
+json.dump({"models": model_times, "adapters": adapter_times}, sys.stdout)
+"""
+
+# 从 -X importtime 的输出中统计的模块，adapters 下的模块由子进程单独计时
+TRACKED_MODULES = [
+    "nonebot_plugin_saa",
+    "nonebot_plugin_saa.registries",
+    "nonebot_plugin_saa.abstract_factories",
+    "nonebot_plugin_saa.types",
+]
+
+
+def run_once() -> tuple[dict[str, float], dict[str, float]]:
+    """返回 (模块累计导入耗时, 模型类构建耗时)，单位为毫秒"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        if name in TRACKED_MODULES:
+            modules[name] = int(cumulative) / 1000
+    child_result = json.loads(proc.stdout.splitlines()[-1])
+    for name, seconds in child_result["adapters"].items():
+        modules[name] = seconds * 1000
+    models = {name: seconds * 1000 for name, seconds in child_result["models"].items()}
+    return modules, models
+
+
+def measure(runs: int) -> dict[str, float]:
+    samples: dict[str, list[float]] = {}
+    for _ in range(runs):
+        modules, models = run_once()
+        for name, ms in modules.items():
+            samples.setdefault(f"import:{name}", []).append(ms)
+        samples.setdefault("models:total", []).append(sum(models.values()))
+        for name, ms in models.items():
+            samples.setdefault(f"model:{name}", []).append(ms)
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="运行次数，取中位数")
+    parser.add_argument("--check", action="store_true", help="与预算对比")
+    parser.add_argument("--json", help="将结果保存为 JSON 文件")
+    parser.add_argument("--top", type=int, default=10, help="输出最慢的 N 个模型类")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    budget = json.loads(BUDGET_FILE.read_text()) if args.check else {}
+
+    over_budget = []
+    for name, ms in result.items():
+        if name.startswith("model:"):
+            continue
+        line = f"{name:<60} {ms:>9.1f}ms"
+        if name in budget:
+            line += f"  / {budget[name]:.0f}ms"
+            if ms > budget[name]:
+                over_budget.append(name)
+                line += "  OVER BUDGET"
+        print(line)  # noqa: T201
+
+    models = sorted(
+        ((name, ms) for name, ms in result.items() if name.startswith("model:")),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    print(f"\nslowest {args.top} of {len(models)} model classes:")  # noqa: T201
+    for name, ms in models[: args.top]:
+        print(f"{name:<60} {ms:>9.2f}ms")  # noqa: T201
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2, sort_keys=True) + "\n")
+
+    if over_budget:
+        print(f"\nover budget: {', '.join(over_budget)}")  # noqa: T201
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
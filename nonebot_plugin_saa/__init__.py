@@ -9,30 +9,57 @@ from .types import Mention as Mention
 from .types import MentionAll as MentionAll
 from .registries import SaaTarget as SaaTarget
 from .registries import get_target as get_target
+from .template import Placeholder as Placeholder
+from .registries import revoke_many as revoke_many
+from .coalescer import SendCoalescer as SendCoalescer
+from .metrics import enable_metrics as enable_metrics
+from .scheduler import ScheduledSend as ScheduledSend
+from .scheduler import schedule_send as schedule_send
+from .image_processing import ImageLimit as ImageLimit
 from .registries import TargetQQGroup as TargetQQGroup
+from .dispatcher import SendDispatcher as SendDispatcher
 from .registries import PlatformTarget as PlatformTarget
 from .registries import extract_target as extract_target
+from .template import MessageTemplate as MessageTemplate
 from .utils import SupportedAdapters as SupportedAdapters
 from .registries import TargetQQPrivate as TargetQQPrivate
 from .registries import TargetOB12Unknow as TargetOB12Unknow
+from .idempotency import IdempotencyStore as IdempotencyStore
 from .registries import TargetDoDoChannel as TargetDoDoChannel
 from .registries import TargetDoDoPrivate as TargetDoDoPrivate
 from .registries import TargetFeishuGroup as TargetFeishuGroup
+from .circuit_breaker import CircuitBreakers as CircuitBreakers
+from .scheduler import set_schedule_store as set_schedule_store
 from .abstract_factories import MessageFactory as MessageFactory
+from .receipt_store import get_receipt_store as get_receipt_store
+from .scheduler import SqliteScheduleStore as SqliteScheduleStore
 from .registries import TargetFeishuPrivate as TargetFeishuPrivate
 from .registries import TargetQQGroupOpenId as TargetQQGroupOpenId
 from .registries import TargetQQGuildDirect as TargetQQGuildDirect
 from .registries import TargetSatoriUnknown as TargetSatoriUnknown
 from .registries import TargetTelegramForum as TargetTelegramForum
+from .receipt_store import MemoryReceiptStore as MemoryReceiptStore
+from .receipt_store import SqliteReceiptStore as SqliteReceiptStore
 from .registries import TargetDiscordChannel as TargetDiscordChannel
 from .registries import TargetQQGuildChannel as TargetQQGuildChannel
 from .registries import TargetTelegramCommon as TargetTelegramCommon
 from .registries import TargetKaiheilaChannel as TargetKaiheilaChannel
 from .registries import TargetKaiheilaPrivate as TargetKaiheilaPrivate
 from .registries import TargetQQPrivateOpenId as TargetQQPrivateOpenId
+from .idempotency import set_idempotency_store as set_idempotency_store
+from .receipt_store import enable_receipt_store as enable_receipt_store
+from .idempotency import MemoryIdempotencyStore as MemoryIdempotencyStore
+from .idempotency import SqliteIdempotencyStore as SqliteIdempotencyStore
+from .image_processing import register_image_limit as register_image_limit
+from .utils.instrumentation import register_span_hook as register_span_hook
 from .auto_select_bot import enable_auto_select_bot as enable_auto_select_bot
+from .circuit_breaker import enable_circuit_breaker as enable_circuit_breaker
 from .abstract_factories import MessageSegmentFactory as MessageSegmentFactory
+from .image_processing import enable_image_preprocess as enable_image_preprocess
+from .concurrency import AdaptiveConcurrencyLimiter as AdaptiveConcurrencyLimiter
+from .concurrency import enable_adaptive_concurrency as enable_adaptive_concurrency
 from .abstract_factories import AggregatedMessageFactory as AggregatedMessageFactory
+from .concurrency import register_overload_classifier as register_overload_classifier
 
 __plugin_meta__ = PluginMetadata(
     name="峯驰物流",
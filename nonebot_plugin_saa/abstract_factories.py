@@ -1,8 +1,9 @@
 import asyncio
 from abc import ABC
-from copy import deepcopy
+from io import BytesIO
 from warnings import warn
 from inspect import signature
+from copy import copy, deepcopy
 from typing_extensions import Self
 from collections.abc import Iterable, Awaitable
 from dataclasses import field, asdict, dataclass
@@ -24,11 +25,25 @@ from nonebot.matcher import current_bot, current_event, current_matcher
 from nonebot.exception import PausedException, FinishedException, RejectedException
 
 from .auto_select_bot import get_bot
-from .registries import Receipt, PlatformTarget, sender_map, extract_target
+from .utils.instrumentation import span
+from .idempotency import send_idempotent
+from .concurrency import concurrency_slot
+from .receipt_store import record_receipt
+from .circuit_breaker import check_circuit, circuit_guard
+from .registries import (
+    Receipt,
+    PlatformTarget,
+    AggregatedReceipt,
+    sender_map,
+    extract_target,
+    supports_platform,
+)
 from .utils import (
     FallbackToDefault,
     SupportedAdapters,
+    TargetNotSupported,
     AdapterNotInstalled,
+    SegmentNotSupported,
     extract_adapter_type,
 )
 
@@ -94,6 +109,32 @@ async def do_build_custom(builder: CustomBuildFunc, bot: Bot) -> MessageSegment:
     return cast(MessageSegment, res)
 
 
+def _payload_bytes(msg: Iterable["MessageSegmentFactory"]) -> Optional[int]:
+    """统计消息中随消息上传的内存数据（bytes / BytesIO）的字节数"""
+    total = None
+    for ms_factory in msg:
+        for value in ms_factory.data.values():
+            if isinstance(value, bytes):
+                total = (total or 0) + len(value)
+            elif isinstance(value, BytesIO):
+                total = (total or 0) + value.getbuffer().nbytes
+    return total
+
+
+class _StaticSegment:
+    """overwrite 传入的固定消息段，使用模块级的类而不是闭包，以便消息可以被 pickle"""
+
+    def __init__(self, ms: MessageSegment) -> None:
+        self.ms = ms
+
+    def __call__(self) -> MessageSegment:
+        return self.ms
+
+
+class _PrebuiltSegment(_StaticSegment):
+    """_prebuild 预先构建好的消息段，再次 build 时直接返回，不重复计时"""
+
+
 @dataclass
 class MessageSegmentFactory(ABC):
     _builders: ClassVar[
@@ -117,7 +158,7 @@ class MessageSegmentFactory(ABC):
         ms: Union[MessageSegment, CustomBuildFunc],
     ):
         if isinstance(ms, MessageSegment):
-            self._custom_builders[adapter] = lambda _: ms
+            self._custom_builders[adapter] = _StaticSegment(ms)
         else:
             self._custom_builders[adapter] = ms
 
@@ -130,6 +171,17 @@ class MessageSegmentFactory(ABC):
     def __init__(self) -> None:
         self._custom_builders = {}
 
+    def _can_build(self, adapter: SupportedAdapters) -> bool:
+        return adapter in self._custom_builders or adapter in self._builders
+
+    def _preflight(self, adapter: SupportedAdapters) -> None:
+        """在构建前同步检查能否在该 adapter 下构建，不能时抛出异常
+
+        子类可以覆盖该方法补充检查，检查应当足够廉价，不能进行 IO
+        """
+        if not self._can_build(adapter):
+            raise SegmentNotSupported(adapter, type(self).__name__)
+
     def __init_subclass__(cls) -> None:
         cls._builders = {}
         return super().__init_subclass__()
@@ -163,11 +215,25 @@ class MessageSegmentFactory(ABC):
 
     async def build(self, bot: Bot) -> MessageSegment:
         adapter_name = extract_adapter_type(bot)
-        if custom_builder := self._get_custom_builder(adapter_name):
-            return await do_build_custom(custom_builder, bot)
-        if builder := self._builders[adapter_name]:
-            return await do_build(self, builder, bot)
-        raise AdapterNotInstalled(adapter_name)
+        custom_builder = self._get_custom_builder(adapter_name)
+        if isinstance(custom_builder, _PrebuiltSegment):
+            return custom_builder.ms
+        with span("build", adapter=adapter_name, segment_type=type(self).__name__):
+            if custom_builder:
+                return await do_build_custom(custom_builder, bot)
+            if builder := self._builders[adapter_name]:
+                return await do_build(self, builder, bot)
+            raise AdapterNotInstalled(adapter_name)
+
+    async def _prebuild(self, bot: Bot) -> Self:
+        """构建消息段，返回在该 adapter 下直接使用构建结果的浅拷贝"""
+        ms = await self.build(bot)
+        prebuilt = copy(self)
+        prebuilt._custom_builders = {
+            **self._custom_builders,
+            extract_adapter_type(bot): _PrebuiltSegment(ms),
+        }
+        return prebuilt
 
     def __add__(
         self,
@@ -181,11 +247,21 @@ class MessageSegmentFactory(ABC):
     ) -> "MessageFactory":
         return MessageFactory(other) + self
 
-    async def send(self, *, at_sender=False, reply=False):
+    async def send(
+        self, *, at_sender=False, reply=False, idempotency_key: Optional[str] = None
+    ):
         "回复消息，仅能用在事件响应器中"
-        return await MessageFactory(self).send(at_sender=at_sender, reply=reply)
+        return await MessageFactory(self).send(
+            at_sender=at_sender, reply=reply, idempotency_key=idempotency_key
+        )
 
-    async def send_to(self, target: PlatformTarget, bot: Optional[Bot] = None):
+    async def send_to(
+        self,
+        target: PlatformTarget,
+        bot: Optional[Bot] = None,
+        *,
+        idempotency_key: Optional[str] = None,
+    ):
         """主动发送消息，将消息发送到 target，如果不传入 bot 将自动选择 bot
 
         此功能需要显式开启:
@@ -197,7 +273,9 @@ class MessageSegmentFactory(ABC):
 
         参见：https://send-anything-anywhere.felinae98.cn/usage/send#发送时自动选择bot
         """
-        return await MessageFactory(self).send_to(target, bot)
+        return await MessageFactory(self).send_to(
+            target, bot, idempotency_key=idempotency_key
+        )
 
     async def finish(self, *, at_sender=False, reply=False, **kwargs) -> NoReturn:
         """与 `matcher.finish()` 作用相同，仅能用在事件响应器中"""
@@ -290,6 +368,13 @@ class MessageFactory(list[MessageSegmentFactory]):
             return message_type(ms)
         raise AdapterNotInstalled(adapter_name)
 
+    async def _prebuild(self, bot: Bot) -> Self:
+        """并发构建所有消息段，返回的 MessageFactory 发送时不再重复构建"""
+        prebuilt: list[MessageSegmentFactory] = await asyncio.gather(
+            *[ms_factory._prebuild(bot) for ms_factory in self],
+        )
+        return self.__class__(prebuilt)
+
     def __init__(
         self,
         message: "str | MessageSegmentFactory | Iterable[str | MessageSegmentFactory] | None" = None,  # noqa: E501
@@ -375,8 +460,13 @@ class MessageFactory(list[MessageSegmentFactory]):
     def __str__(self) -> str:
         return "".join(str(ms_factory) for ms_factory in self)
 
-    async def send(self, *, at_sender=False, reply=False) -> "Receipt":
-        "回复消息，仅能用在事件响应器中"
+    async def send(
+        self, *, at_sender=False, reply=False, idempotency_key: Optional[str] = None
+    ) -> "Receipt":
+        """回复消息，仅能用在事件响应器中
+
+        传入 idempotency_key 时，相同的 key 重复发送到同一会话只会发送一次
+        """
         try:
             event = current_event.get()
             bot = current_bot.get()
@@ -386,10 +476,20 @@ class MessageFactory(list[MessageSegmentFactory]):
             ) from e
 
         target = extract_target(event, bot)
-        return await self._do_send(bot, target, event, at_sender, reply)
+
+        async def _send() -> Receipt:
+            receipt = await self._do_send(bot, target, event, at_sender, reply)
+            await record_receipt(target, receipt)
+            return receipt
+
+        return await send_idempotent(target, idempotency_key, _send)
 
     async def send_to(
-        self, target: PlatformTarget, bot: Optional[Bot] = None
+        self,
+        target: PlatformTarget,
+        bot: Optional[Bot] = None,
+        *,
+        idempotency_key: Optional[str] = None,
     ) -> "Receipt":
         """主动发送消息，将消息发送到 target，如果不传入 bot 将自动选择 bot
 
@@ -400,11 +500,19 @@ class MessageFactory(list[MessageSegmentFactory]):
         enable_auto_select_bot()
         ```
 
+        传入 idempotency_key 时，相同的 key 重复发送到同一 target 只会发送一次，
+        之后直接返回第一次发送的回执，参见 `set_idempotency_store`
+
         参见：https://send-anything-anywhere.felinae98.cn/usage/send#发送时自动选择bot
         """
-        if bot is None:
-            bot = get_bot(target)
-        return await self._do_send(bot, target, None, False, False)
+
+        async def _send() -> Receipt:
+            send_bot = bot if bot is not None else get_bot(target)
+            receipt = await self._do_send(send_bot, target, None, False, False)
+            await record_receipt(target, receipt)
+            return receipt
+
+        return await send_idempotent(target, idempotency_key, _send)
 
     async def finish(self, *, at_sender=False, reply=False, **kwargs) -> NoReturn:
         """与 `matcher.finish()` 作用相同，仅能用在事件响应器中"""
@@ -450,7 +558,17 @@ class MessageFactory(list[MessageSegmentFactory]):
             raise RuntimeError(
                 f"send method for {adapter} not registered",
             )  # pragma: no cover
-        return await sender(bot, self, target, event, at_sender, reply)
+        check_capability(adapter, target, [self])
+        # 熔断中立即失败；占用并发名额后再计时，send_timeout 只计算实际发送的耗时
+        check_circuit(adapter, bot)
+        async with concurrency_slot(adapter, bot), circuit_guard(adapter, bot):
+            with span(
+                "send",
+                adapter=adapter,
+                platform=target.platform_type,
+                bytes=_payload_bytes(self),
+            ):
+                return await sender(bot, self, target, event, at_sender, reply)
 
     @overload
     def __getitem__(self, args: type[MessageSegmentFactory]) -> Self:
@@ -640,7 +758,7 @@ class MessageFactory(list[MessageSegmentFactory]):
 
 AggregatedSender = Callable[
     [Bot, list[MessageFactory], PlatformTarget, Optional[Event]],
-    Awaitable[None],
+    Awaitable[Union[Receipt, list[Receipt]]],
 ]
 
 
@@ -675,22 +793,57 @@ class AggregatedMessageFactory:
         bot: Bot,
         target: PlatformTarget,
         event: Optional[Event],
-    ):
-        for msg_fac in self.message_factories:
-            await msg_fac._do_send(bot, target, event, False, False)
+    ) -> list[Receipt]:
+        # 所有消息并发构建，按顺序发送，发送前一条消息时后面的消息仍在构建
+        build_tasks = [
+            asyncio.ensure_future(msg_fac._prebuild(bot))
+            for msg_fac in self.message_factories
+        ]
+        receipts: list[Receipt] = []
+        try:
+            for build_task in build_tasks:
+                msg_fac = await build_task
+                receipts.append(
+                    await msg_fac._do_send(bot, target, event, False, False)
+                )
+            return receipts
+        finally:
+            for build_task in build_tasks:
+                build_task.cancel()
+            await asyncio.gather(*build_tasks, return_exceptions=True)
 
-    async def _do_send(self, bot: Bot, target: PlatformTarget, event: Optional[Event]):
+    async def _do_send(
+        self, bot: Bot, target: PlatformTarget, event: Optional[Event]
+    ) -> AggregatedReceipt:
         adapter = extract_adapter_type(bot)
+        check_capability(adapter, target, self.message_factories)
         if sender := self.__class__.sender.get(adapter):  # custom aggregate sender
+            check_circuit(adapter, bot)
             try:
-                return await sender(bot, self.message_factories, target, event)
+                async with concurrency_slot(adapter, bot), circuit_guard(adapter, bot):
+                    with span(
+                        "aggregated_send",
+                        adapter=adapter,
+                        platform=target.platform_type,
+                    ):
+                        receipts = await sender(
+                            bot, self.message_factories, target, event
+                        )
             except FallbackToDefault:
-                await self._send_aggregated_message_default(bot, target, event)
+                pass
+            else:
+                return AggregatedReceipt(
+                    adapter_name=adapter,
+                    bot_id=bot.self_id,
+                    receipts=receipts if isinstance(receipts, list) else [receipts],
+                )
         # fallback
-        await self._send_aggregated_message_default(bot, target, event)
-        return None
+        receipts = await self._send_aggregated_message_default(bot, target, event)
+        return AggregatedReceipt(
+            adapter_name=adapter, bot_id=bot.self_id, receipts=receipts
+        )
 
-    async def send(self):
+    async def send(self, *, idempotency_key: Optional[str] = None) -> AggregatedReceipt:
         "回复消息，仅能用在事件响应器中"
         try:
             event = current_event.get()
@@ -701,9 +854,23 @@ class AggregatedMessageFactory:
             ) from e
 
         target = extract_target(event, bot)
-        await self._do_send(bot, target, event)
 
-    async def send_to(self, target: PlatformTarget, bot: Optional[Bot] = None):
+        async def _send() -> AggregatedReceipt:
+            receipt = await self._do_send(bot, target, event)
+            await record_receipt(target, receipt)
+            return receipt
+
+        return cast(
+            AggregatedReceipt, await send_idempotent(target, idempotency_key, _send)
+        )
+
+    async def send_to(
+        self,
+        target: PlatformTarget,
+        bot: Optional[Bot] = None,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> AggregatedReceipt:
         """主动发送消息，将消息发送到 target，如果不传入 bot 将自动选择 bot
 
         此功能需要显式开启:
@@ -715,9 +882,16 @@ class AggregatedMessageFactory:
 
         参见：https://send-anything-anywhere.felinae98.cn/usage/send#发送时自动选择bot
         """
-        if bot is None:
-            bot = get_bot(target)
-        await self._do_send(bot, target, None)
+
+        async def _send() -> AggregatedReceipt:
+            send_bot = bot if bot is not None else get_bot(target)
+            receipt = await self._do_send(send_bot, target, None)
+            await record_receipt(target, receipt)
+            return receipt
+
+        return cast(
+            AggregatedReceipt, await send_idempotent(target, idempotency_key, _send)
+        )
 
     async def finish(self, **kwargs) -> NoReturn:
         """与 `matcher.finish()` 作用相同，仅能用在事件响应器中"""
@@ -747,6 +921,22 @@ class AggregatedMessageFactory:
         await matcher.reject_receive(key)
 
 
+def check_capability(
+    adapter: SupportedAdapters,
+    target: PlatformTarget,
+    message_factories: Iterable[MessageFactory],
+) -> None:
+    """在构建和上传之前检查适配器能否发送到 target，以及能否构建所有消息段
+
+    任何一个消息段不满足条件时立即失败，避免其他消息段的图片已经上传
+    """
+    if not supports_platform(adapter, target.platform_type):
+        raise TargetNotSupported(adapter, target.platform_type)
+    for message_factory in message_factories:
+        for ms in message_factory:
+            ms._preflight(adapter)
+
+
 def register_ms_adapter(
     adapter: SupportedAdapters,
     ms_factory: type[TMSF],
@@ -773,3 +963,17 @@ def assamble_message_factory(
     full_message_factory += origin_msg_factory
 
     return full_message_factory
+
+
+def merge_message_factories(
+    message_factories: Iterable[MessageFactory],
+    separator: Optional[str] = "\n",
+) -> MessageFactory:
+    """将多条消息合并为一条，消息之间以 separator 分隔，消息段不会被拷贝"""
+    merged_message_factory = MessageFactory()
+    for index, msg_fac in enumerate(message_factories):
+        if index != 0 and separator:
+            merged_message_factory.append(separator)
+        merged_message_factory.extend(msg_fac)
+
+    return merged_message_factory
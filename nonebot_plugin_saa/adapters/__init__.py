@@ -1,22 +1,66 @@
+"""各适配器的实现
+
+适配器的实现按需导入，避免导入未使用的 NoneBot 适配器：
+
+- 导入 SAA 时以及 NoneBot 启动时，导入已在驱动器中注册的适配器的实现
+- 首次从 Bot 获取适配器类型、处理适配器的事件或反序列化适配器的回执时导入
+"""
+
+import importlib
 import contextlib
 
-with contextlib.suppress(ImportError):
-    from . import qq as qq
-with contextlib.suppress(ImportError):
-    from . import red as red
-with contextlib.suppress(ImportError):
-    from . import dodo as dodo
-with contextlib.suppress(ImportError):
-    from . import feishu as feishu
-with contextlib.suppress(ImportError):
-    from . import satori as satori
-with contextlib.suppress(ImportError):
-    from . import discord as discord
-with contextlib.suppress(ImportError):
-    from . import kaiheila as kaiheila
-with contextlib.suppress(ImportError):
-    from . import telegram as telegram
-with contextlib.suppress(ImportError):
-    from . import onebot_v11 as onebot_v11
-with contextlib.suppress(ImportError):
-    from . import onebot_v12 as onebot_v12
+import nonebot
+
+from ..utils.const import SupportedAdapters
+from ..utils.helpers import loaded_adapters
+
+# SAA 适配器名称 -> (SAA 实现模块, NoneBot 适配器模块)
+ADAPTER_MODULES: dict[SupportedAdapters, tuple[str, str]] = {
+    SupportedAdapters.onebot_v11: ("onebot_v11", "nonebot.adapters.onebot.v11"),
+    SupportedAdapters.onebot_v12: ("onebot_v12", "nonebot.adapters.onebot.v12"),
+    SupportedAdapters.kaiheila: ("kaiheila", "nonebot.adapters.kaiheila"),
+    SupportedAdapters.telegram: ("telegram", "nonebot.adapters.telegram"),
+    SupportedAdapters.feishu: ("feishu", "nonebot.adapters.feishu"),
+    SupportedAdapters.red: ("red", "nonebot.adapters.red"),
+    SupportedAdapters.dodo: ("dodo", "nonebot.adapters.dodo"),
+    SupportedAdapters.qq: ("qq", "nonebot.adapters.qq"),
+    SupportedAdapters.satori: ("satori", "nonebot.adapters.satori"),
+    SupportedAdapters.discord: ("discord", "nonebot.adapters.discord"),
+}
+
+
+def load_adapter(adapter: SupportedAdapters) -> None:
+    """导入 SAA 对该适配器的实现，对应的 NoneBot 适配器未安装时忽略"""
+    if adapter in loaded_adapters:
+        return
+    loaded_adapters.add(adapter)
+    if adapter not in ADAPTER_MODULES:
+        return
+    module, _ = ADAPTER_MODULES[adapter]
+    with contextlib.suppress(ImportError):
+        importlib.import_module(f"{__name__}.{module}")
+
+
+def load_adapter_for_module(module_name: str) -> None:
+    """导入定义在 module_name 中的 NoneBot 类型（如事件）所属适配器的实现"""
+    for adapter, (_, nonebot_module) in ADAPTER_MODULES.items():
+        if module_name == nonebot_module or module_name.startswith(
+            f"{nonebot_module}."
+        ):
+            load_adapter(adapter)
+
+
+def load_all_adapters() -> None:
+    """导入所有已安装的适配器的实现"""
+    for adapter in ADAPTER_MODULES:
+        load_adapter(adapter)
+
+
+def _load_registered_adapters() -> None:
+    for adapter_name in nonebot.get_adapters():
+        if adapter_name in ADAPTER_MODULES:
+            load_adapter(SupportedAdapters(adapter_name))
+
+
+_load_registered_adapters()
+nonebot.get_driver().on_startup(_load_registered_adapters)
@@ -3,8 +3,8 @@ from pathlib import Path
 from functools import partial
 from typing import Any, Literal, Optional, cast
 
+import anyio
 from nonebot.adapters import Event
-from nonebot.drivers import Request
 from nonebot.adapters import Bot as BaseBot
 from nonebot.adapters.discord import Bot as BotDiscord
 from nonebot.adapters.discord.message import Message, MessageSegment
@@ -25,12 +25,21 @@ from nonebot.adapters.discord.api.model import (
     DirectComponent,
 )
 
+from ..utils.http import download
+from ..image_processing import preprocess_image
 from ..auto_select_bot import register_list_targets
 from ..types import Text, Image, Reply, Mention, MentionAll
-from ..utils import SupportedAdapters, SupportedPlatform, type_message_id_check
+from ..utils import (
+    FallbackToDefault,
+    SupportedAdapters,
+    SupportedPlatform,
+    type_message_id_check,
+)
 from ..abstract_factories import (
     MessageFactory,
+    AggregatedMessageFactory,
     register_ms_adapter,
+    merge_message_factories,
     assamble_message_factory,
 )
 from ..registries import (
@@ -47,6 +56,10 @@ from ..registries import (
 adapter = SupportedAdapters.discord
 register_discord = partial(register_ms_adapter, adapter)
 
+# https://discord.com/developers/docs/resources/message#create-message
+DISCORD_CONTENT_LIMIT = 2000
+DISCORD_ATTACHMENT_LIMIT = 10
+
 MessageFactory.register_adapter_message(SupportedAdapters.discord, Message)
 
 
@@ -74,23 +87,22 @@ async def _image(i: Image, bot: BaseBot) -> MessageSegment:
     image = i.data["image"]
     image_name = i.data["name"]
 
-    if isinstance(image, Path) and image.is_file():
+    if isinstance(image, Path) and await anyio.Path(image).is_file():
         if image_name == "image" and image.suffix not in [
             ".jpg",
             ".jpeg",
             ".png",
             ".gif",
         ]:
-            image_name = image.with_suffix(".png").name
+            extension = (await i.metadata(adapter)).extension or "png"
+            image_name = image.with_suffix(f".{extension}").name
         else:
             image_name = image.name
 
-        with image.open("rb") as f:
-            img_bytes = f.read()
+        img_bytes = await i.read_bytes(adapter)
 
     elif isinstance(image, str):
-        req = Request("GET", image, timeout=10)
-        resp = await bot.adapter.request(req)
+        resp = await download(image, adapter)
         if resp.status_code != 200:
             raise RuntimeError(
                 f"Error downloading image, status code: {resp.status_code}, url: {image}"  # noqa: E501
@@ -98,12 +110,10 @@ async def _image(i: Image, bot: BaseBot) -> MessageSegment:
         img_bytes = resp.content
         if not isinstance(img_bytes, bytes):
             raise TypeError(f"Expected bytes, got something else {type(img_bytes)}")
+        img_bytes = await preprocess_image(img_bytes, adapter)
 
-    elif isinstance(image, bytes):
-        img_bytes = image
-
-    elif isinstance(image, BytesIO):
-        img_bytes = image.getvalue()
+    elif isinstance(image, (bytes, BytesIO)):
+        img_bytes = await i.read_bytes(adapter)
 
     else:
         raise TypeError(f"Invalid image type {type(image)}")
@@ -246,6 +256,26 @@ async def send(
     return DiscordReceipt(message_get=resp, bot_id=bot.self_id)
 
 
+@AggregatedMessageFactory.register_aggregated_sender(adapter)
+async def aggregate_send(
+    bot: BaseBot,
+    message_factories: list[MessageFactory],
+    target: PlatformTarget,
+    event: Optional[Event],
+):
+    assert isinstance(bot, BotDiscord)
+
+    # 合并为一条带多个附件的消息，超出单条消息限制时逐条发送
+    merged_msg = merge_message_factories(message_factories)
+    if (
+        merged_msg.exclude(Text, Image, Mention, MentionAll)
+        or merged_msg.count(Image) > DISCORD_ATTACHMENT_LIMIT
+        or sum(len(text) for text in merged_msg[Text]) > DISCORD_CONTENT_LIMIT
+    ):
+        raise FallbackToDefault
+    return await merged_msg._do_send(bot, target, event, False, False)
+
+
 @register_list_targets(adapter)
 async def list_targets(bot: BaseBot) -> list[PlatformTarget]:
     assert isinstance(bot, BotDiscord)
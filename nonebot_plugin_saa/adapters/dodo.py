@@ -3,7 +3,6 @@ from typing import Any, Literal, Optional, cast
 
 from nonebot import logger
 from nonebot.adapters import Event
-from nonebot.drivers import Request
 from nonebot.compat import model_dump
 from nonebot.adapters import Bot as BaseBot
 from nonebot.adapters.dodo import Bot as BotDodo
@@ -24,6 +23,9 @@ from nonebot.adapters.dodo.event import (
     ChannelVoiceMemberLeaveEvent,
 )
 
+from ..utils.http import download
+from ..utils.image import probe_image
+from ..image_processing import preprocess_image
 from ..auto_select_bot import register_list_targets
 from ..types import Text, Image, Reply, Mention, MentionAll
 from ..utils import SupportedAdapters, SupportedPlatform, type_message_id_check
@@ -76,8 +78,7 @@ async def _image(image: Image, bot: BaseBot) -> MessageSegment:
     file = image.data["image"]
     if isinstance(file, str):
         # 要求必须是官方链接，因此需要下载一遍
-        req = Request("GET", file, timeout=10)
-        resp = await bot.adapter.request(req)
+        resp = await download(file, adapter)
         if resp.status_code != 200:
             raise RuntimeError(
                 f"Failed to download image: {resp.status_code}, url: {file}"
@@ -85,10 +86,16 @@ async def _image(image: Image, bot: BaseBot) -> MessageSegment:
         file = resp.content
         if not isinstance(file, bytes):
             raise TypeError(f"Unsupported type of file: {type(file)}, need bytes")
+        file = await preprocess_image(file, adapter)
+        meta = await probe_image(file)
+    else:
+        file = await image.read_bytes(adapter)
+        meta = await image.metadata(adapter)
 
     upload_result = await bot.set_resouce_picture_upload(
         file=file,
-        file_name=image.data["name"] + ".png",  # 上传是文件名必须携带有效后缀
+        # 上传时文件名必须携带有效后缀
+        file_name=f"{image.data['name']}.{meta.extension or 'png'}",
     )
     logger.debug(f"Uploaded result: {upload_result}")
     return MessageSegment.picture(**model_dump(upload_result))
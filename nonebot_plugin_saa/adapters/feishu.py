@@ -1,10 +1,7 @@
-from io import BytesIO
-from pathlib import Path
 from functools import partial
-from typing import Any, Literal, cast
+from typing import Any, Literal, Optional, cast
 
 from nonebot.adapters import Event
-from nonebot.drivers import Request
 from nonebot.adapters import Bot as BaseBot
 from nonebot.adapters.feishu import (
     Bot,
@@ -15,26 +12,42 @@ from nonebot.adapters.feishu import (
     PrivateMessageEvent,
 )
 
+from ..utils.http import download
+from ..image_processing import preprocess_image
 from ..types import Text, Image, Reply, Mention, MentionAll
-from ..utils import SupportedAdapters, type_message_id_check
+from ..utils import (
+    FallbackToDefault,
+    SupportedAdapters,
+    SupportedPlatform,
+    type_message_id_check,
+)
 from ..abstract_factories import (
     MessageFactory,
+    AggregatedMessageFactory,
     register_ms_adapter,
+    merge_message_factories,
     assamble_message_factory,
 )
 from ..registries import (
     Receipt,
     MessageId,
+    PlatformTarget,
     TargetFeishuGroup,
     TargetFeishuPrivate,
     register_sender,
     register_target_extractor,
+    register_target_platforms,
     register_message_id_getter,
 )
 
 adapter = SupportedAdapters.feishu
 register_feishu = partial(register_ms_adapter, adapter)
 
+# https://open.feishu.cn/document/server-docs/im-v1/message/create
+FEISHU_POST_SIZE_LIMIT = 30 * 1024
+# 估算富文本大小时，每个消息段额外占用的字节数（JSON 结构、图片 key 等）
+FEISHU_POST_ELEMENT_SIZE = 128
+
 MessageFactory.register_adapter_message(adapter, Message)
 
 
@@ -55,7 +68,7 @@ async def _image(i: Image, bot: BaseBot) -> MessageSegment:
 
     image = i.data["image"]
     if isinstance(image, str):
-        resp = await bot.adapter.request(Request("GET", image, timeout=10))
+        resp = await download(image, adapter)
         if resp.status_code != 200:
             raise RuntimeError(
                 f"Failed to download image: {resp.status_code}, url: {image}"
@@ -63,10 +76,9 @@ async def _image(i: Image, bot: BaseBot) -> MessageSegment:
         image = resp.content
         if not isinstance(image, bytes):
             raise TypeError(f"Unsupported type of file: {type(image)}, need bytes")
-    elif isinstance(image, Path):
-        image = image.read_bytes()
-    elif isinstance(image, BytesIO):
-        image = image.getvalue()
+        image = await preprocess_image(image, adapter)
+    else:
+        image = await i.read_bytes(adapter)
 
     data = {"image_type": "message"}
     files = {"image": ("file", image)}
@@ -128,6 +140,13 @@ def _(event: Event) -> FeishuMessageId:
     return FeishuMessageId(message_id=event.event.message.message_id)
 
 
+register_target_platforms(
+    adapter,
+    SupportedPlatform.feishu_private,
+    SupportedPlatform.feishu_group,
+)
+
+
 @register_sender(adapter)
 async def send(
     bot,
@@ -197,3 +216,28 @@ async def send(
         )
     message_id = resp["data"]["message_id"]
     return FeishuReceipt(bot_id=bot.self_id, message_id=message_id, data=resp)
+
+
+def _estimate_post_size(msg: MessageFactory) -> int:
+    """估算合并后的富文本消息的字节数，图片在构建前无法得知 key，按固定大小计算"""
+    text_size = sum(len(text.data["text"].encode()) for text in msg[Text])
+    return text_size + FEISHU_POST_ELEMENT_SIZE * len(msg)
+
+
+@AggregatedMessageFactory.register_aggregated_sender(adapter)
+async def aggregate_send(
+    bot: BaseBot,
+    message_factories: list[MessageFactory],
+    target: PlatformTarget,
+    event: Optional[Event],
+):
+    assert isinstance(bot, Bot)
+
+    # 文字与图片混合的消息会被序列化为一条富文本（post）消息发送
+    merged_msg = merge_message_factories(message_factories)
+    if (
+        merged_msg.exclude(Text, Image, Mention, MentionAll)
+        or _estimate_post_size(merged_msg) > FEISHU_POST_SIZE_LIMIT
+    ):
+        raise FallbackToDefault
+    return await merged_msg._do_send(bot, target, event, False, False)
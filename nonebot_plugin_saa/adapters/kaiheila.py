@@ -1,5 +1,5 @@
 from functools import partial
-from typing import Any, Literal, cast
+from typing import Any, Literal, Optional, cast
 
 from nonebot.adapters import Event
 from nonebot.adapters.kaiheila import Bot
@@ -14,10 +14,17 @@ from nonebot.adapters.kaiheila.event import (
 
 from ..auto_select_bot import register_list_targets
 from ..types import Text, Image, Reply, Mention, MentionAll
-from ..utils import SupportedAdapters, SupportedPlatform, type_message_id_check
+from ..utils import (
+    FallbackToDefault,
+    SupportedAdapters,
+    SupportedPlatform,
+    type_message_id_check,
+)
 from ..abstract_factories import (
     MessageFactory,
+    AggregatedMessageFactory,
     register_ms_adapter,
+    merge_message_factories,
     assamble_message_factory,
 )
 from ..registries import (
@@ -54,6 +61,9 @@ def _unwrap_paging_api(field: str):
 adapter = SupportedAdapters.kaiheila
 register_kaiheila = partial(register_ms_adapter, adapter)
 
+# https://developer.kookapp.cn/doc/cardmessage
+KAIHEILA_CARD_MODULE_LIMIT = 50
+
 MessageFactory.register_adapter_message(SupportedAdapters.kaiheila, Message)
 
 
@@ -72,7 +82,10 @@ async def _image(i: Image, bot: BaseBot) -> MessageSegment:
     if not isinstance(bot, Bot):
         raise TypeError(f"Unsupported type of bot: {type(bot)}")
 
-    file_key = await bot.upload_file(i.data["image"], i.data["name"])
+    image = i.data["image"]
+    if not isinstance(image, str):
+        image = await i.read_bytes(adapter)
+    file_key = await bot.upload_file(image, i.data["name"])
     return MessageSegment.image(file_key)
 
 
@@ -176,6 +189,25 @@ async def send(
     return KaiheilaReceipt(bot_id=bot.self_id, data=resp)
 
 
+@AggregatedMessageFactory.register_aggregated_sender(adapter)
+async def aggregate_send(
+    bot: BaseBot,
+    message_factories: list[MessageFactory],
+    target: PlatformTarget,
+    event: Optional[Event],
+):
+    assert isinstance(bot, Bot)
+
+    # 文字与图片混合的消息会被适配器转换为一条卡片消息发送
+    merged_msg = merge_message_factories(message_factories)
+    if (
+        merged_msg.exclude(Text, Image, Mention, MentionAll)
+        or len(merged_msg) > KAIHEILA_CARD_MODULE_LIMIT
+    ):
+        raise FallbackToDefault
+    return await merged_msg._do_send(bot, target, event, False, False)
+
+
 @register_list_targets(SupportedAdapters.kaiheila)
 async def list_targets(bot: BaseBot) -> list[PlatformTarget]:
     assert isinstance(bot, Bot)
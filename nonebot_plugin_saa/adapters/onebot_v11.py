@@ -1,4 +1,6 @@
+import asyncio
 from functools import partial
+from weakref import WeakKeyDictionary
 from typing import Any, Union, Literal, Optional, cast
 
 from nonebot.adapters import Bot, Event
@@ -49,6 +51,20 @@ register_onebot_v11 = partial(register_ms_adapter, adapter)
 
 MessageFactory.register_adapter_message(SupportedAdapters.onebot_v11, Message)
 
+# 单条合并转发消息的节点数上限，超出时拆分为多条合并转发消息
+OB11_FORWARD_NODE_LIMIT = 100
+
+# Bot 重新连接时会创建新的 Bot 对象，缓存随旧的 Bot 对象一同失效
+_login_info_cache: "WeakKeyDictionary[Bot, dict[str, Any]]" = WeakKeyDictionary()
+
+
+async def _get_login_info(bot: BotOB11) -> dict[str, Any]:
+    """获取 Bot 的登录信息，同一连接内只请求一次"""
+    if (login_info := _login_info_cache.get(bot)) is None:
+        login_info = await bot.get_login_info()
+        _login_info_cache[bot] = login_info
+    return login_info
+
 
 class OB11MessageId(MessageId):
     adapter_name: Literal[SupportedAdapters.onebot_v11] = adapter
@@ -231,36 +247,42 @@ async def aggregate_send(
     message_factories: list[MessageFactory],
     target: PlatformTarget,
     event: Optional[Event],
-):
+) -> list[Receipt]:
     assert isinstance(bot, BotOB11)
-    login_info = await bot.get_login_info()
-
-    msg_list: list[Message] = []
-    for msg_fac in message_factories:
-        msg = await msg_fac.build(bot)
-        assert isinstance(msg, Message)
-        msg_list.append(msg)
-    aggregated_message_segment = Message(
-        [
-            MessageSegment.node_custom(
-                user_id=login_info["user_id"],
-                nickname=login_info["nickname"],
-                content=msg,
-            )
-            for msg in msg_list
-        ]
-    )
+    if not isinstance(target, (TargetQQGroup, TargetQQPrivate)):  # pragma: no cover
+        raise RuntimeError(f"{target.__class__.__name__} not supported")
 
-    if isinstance(target, TargetQQGroup):
-        await bot.send_group_forward_msg(
-            group_id=target.group_id, messages=aggregated_message_segment
+    login_info, *msg_list = await asyncio.gather(
+        _get_login_info(bot),
+        *[msg_fac._build(bot) for msg_fac in message_factories],
+    )
+    nodes = [
+        MessageSegment.node_custom(
+            user_id=login_info["user_id"],
+            nickname=login_info["nickname"],
+            content=cast(Message, msg),
         )
-    elif isinstance(target, TargetQQPrivate):
-        await bot.send_private_forward_msg(
-            user_id=target.user_id, messages=aggregated_message_segment
+        for msg in msg_list
+    ]
+
+    receipts: list[Receipt] = []
+    for index in range(0, len(nodes), OB11_FORWARD_NODE_LIMIT):
+        aggregated_message_segment = Message(
+            nodes[index : index + OB11_FORWARD_NODE_LIMIT]
         )
-    else:  # pragma: no cover
-        raise RuntimeError(f"{target.__class__.__name__} not supported")
+        if isinstance(target, TargetQQGroup):
+            res_dict = await bot.send_group_forward_msg(
+                group_id=target.group_id, messages=aggregated_message_segment
+            )
+        else:
+            res_dict = await bot.send_private_forward_msg(
+                user_id=target.user_id, messages=aggregated_message_segment
+            )
+        # 部分协议端实现不返回 message_id
+        if res_dict and "message_id" in res_dict:
+            message_id = cast(int, res_dict["message_id"])
+            receipts.append(OB11Receipt(bot_id=bot.self_id, message_id=message_id))
+    return receipts
 
 
 @register_list_targets(SupportedAdapters.onebot_v11)
@@ -79,11 +79,10 @@ async def _image(i: Image, bot: BaseBot) -> MessageSegment:
         resp = await bot.upload_file(type="url", name=name, url=image)
     elif isinstance(image, Path):
         resp = await bot.upload_file(type="path", name=name, path=str(image.resolve()))
-    elif isinstance(image, BytesIO):
-        image = image.getvalue()
-        resp = await bot.upload_file(type="data", name=name, data=image)
-    elif isinstance(image, bytes):
-        resp = await bot.upload_file(type="data", name=name, data=image)
+    elif isinstance(image, (bytes, BytesIO)):
+        resp = await bot.upload_file(
+            type="data", name=name, data=await i.read_bytes(adapter)
+        )
     else:
         raise TypeError(f"Unsupported type of image: {type(image)}")
 
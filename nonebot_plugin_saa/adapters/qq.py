@@ -25,7 +25,7 @@ from nonebot.adapters.qq import (
 from ..config import plugin_config
 from ..auto_select_bot import register_list_targets
 from ..types import Text, Image, Reply, Mention, MentionAll
-from ..utils import SupportedAdapters, type_message_id_check
+from ..utils import SupportedAdapters, SupportedPlatform, type_message_id_check
 from ..abstract_factories import (
     MessageFactory,
     register_ms_adapter,
@@ -43,6 +43,7 @@ from ..registries import (
     register_sender,
     register_qqguild_dms,
     register_target_extractor,
+    register_target_platforms,
 )
 
 adapter = SupportedAdapters.qq
@@ -62,11 +63,11 @@ def _text(t: Text) -> MessageSegment:
 
 
 @register_qq(Image)
-def _image(i: Image) -> MessageSegment:
+async def _image(i: Image) -> MessageSegment:
     if isinstance(i.data["image"], str):
         return MessageSegment.image(i.data["image"])
     else:
-        return MessageSegment.file_image(i.data["image"])
+        return MessageSegment.file_image(await i.read_bytes(adapter))
 
 
 @register_qq(Mention)
@@ -159,6 +160,15 @@ class QQReceipt(Receipt):
         return QQMessageId(message_id=mid)
 
 
+register_target_platforms(
+    adapter,
+    SupportedPlatform.qq_guild_channel,
+    SupportedPlatform.qq_guild_direct,
+    SupportedPlatform.qq_private_openid,
+    SupportedPlatform.qq_group_openid,
+)
+
+
 @register_sender(SupportedAdapters.qq)
 async def send(
     bot,
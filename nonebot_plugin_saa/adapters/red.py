@@ -1,13 +1,12 @@
+import asyncio
 from datetime import datetime
 from functools import partial
 from typing import Any, Literal, Optional, cast
 
-from nonebot import get_driver
 from nonebot.adapters import Bot, Event
 from nonebot.adapters.red import Bot as BotRed
 from nonebot.adapters.red.api.model import ChatType
 from nonebot.adapters.red.message import ForwardNode
-from nonebot.drivers import Request, HTTPClientMixin
 from nonebot.adapters.red.api.model import Message as MessageModel
 from nonebot.adapters.red import (
     Message,
@@ -17,6 +16,7 @@ from nonebot.adapters.red import (
     PrivateMessageEvent,
 )
 
+from ..utils.http import download
 from ..auto_select_bot import register_list_targets
 from ..types import Text, Image, Reply, Mention, MentionAll
 from ..utils import SupportedAdapters, SupportedPlatform, type_message_id_check
@@ -42,6 +42,9 @@ register_red = partial(register_ms_adapter, adapter)
 
 MessageFactory.register_adapter_message(SupportedAdapters.red, Message)
 
+# 单条合并转发消息的节点数上限，超出时拆分为多条合并转发消息
+RED_FORWARD_NODE_LIMIT = 100
+
 
 class RedMessageId(MessageId):
     adapter_name: Literal[SupportedAdapters.red] = adapter
@@ -59,9 +62,7 @@ def _text(t: Text) -> MessageSegment:
 async def _image(i: Image) -> MessageSegment:
     image = i.data["image"]
     if isinstance(image, str):
-        driver = get_driver()
-        assert isinstance(driver, HTTPClientMixin), "driver should be ForwardDriver"
-        image_data = await driver.request(Request("GET", image))
+        image_data = await download(image, adapter)
         assert isinstance(image_data.content, bytes)
         return MessageSegment.image(image_data.content)
     return MessageSegment.image(image)
@@ -186,14 +187,14 @@ async def aggregate_send(
     message_factories: list[MessageFactory],
     target: PlatformTarget,
     event: Optional[Event],
-):
+) -> list[Receipt]:
     assert isinstance(bot, BotRed)
+    if not isinstance(target, (TargetQQGroup, TargetQQPrivate)):  # pragma: no cover
+        raise RuntimeError(f"{target.__class__.__name__} not supported")
 
-    msg_list: list[Message] = []
-    for msg_fac in message_factories:
-        msg = await msg_fac.build(bot)
-        assert isinstance(msg, Message)
-        msg_list.append(msg)
+    msg_list: list[Message] = await asyncio.gather(
+        *[msg_fac._build(bot) for msg_fac in message_factories],
+    )
     nodes = [
         ForwardNode(
             uin=bot.self_id,
@@ -204,16 +205,21 @@ async def aggregate_send(
         )
         for msg in msg_list
     ]
-    if isinstance(target, TargetQQGroup):
-        await bot.send_fake_forward(
-            nodes=nodes, chat_type=ChatType.GROUP, target=target.group_id
-        )
-    elif isinstance(target, TargetQQPrivate):
-        await bot.send_fake_forward(
-            nodes=nodes, chat_type=ChatType.FRIEND, target=target.user_id
-        )
-    else:  # pragma: no cover
-        raise RuntimeError(f"{target.__class__.__name__} not supported")
+    for index in range(0, len(nodes), RED_FORWARD_NODE_LIMIT):
+        if isinstance(target, TargetQQGroup):
+            await bot.send_fake_forward(
+                nodes=nodes[index : index + RED_FORWARD_NODE_LIMIT],
+                chat_type=ChatType.GROUP,
+                target=target.group_id,
+            )
+        else:
+            await bot.send_fake_forward(
+                nodes=nodes[index : index + RED_FORWARD_NODE_LIMIT],
+                chat_type=ChatType.FRIEND,
+                target=target.user_id,
+            )
+    # Red 协议的伪造合并转发接口不返回发送的消息，无法生成回执
+    return []
 
 
 @register_list_targets(SupportedAdapters.red)
@@ -1,3 +1,4 @@
+import asyncio
 from enum import Enum
 from io import BytesIO
 from pathlib import Path
@@ -6,7 +7,6 @@ from collections.abc import Awaitable
 from typing import Any, Generic, Literal, TypeVar, Optional, Protocol, cast
 
 from nonebot import logger
-from filetype import guess_mime
 from nonebot.adapters import Bot, Event
 
 from ..auto_select_bot import register_list_targets
@@ -63,6 +63,9 @@ register_satori = partial(register_ms_adapter, adapter)
 
 MessageFactory.register_adapter_message(SupportedAdapters.satori, Message)
 
+# 单条合并转发消息的节点数上限，超出时拆分为多条合并转发消息
+SATORI_FORWARD_NODE_LIMIT = 100
+
 
 class SatoriMessageId(MessageId):
     adapter_name: Literal[SupportedAdapters.satori] = adapter
@@ -81,15 +84,9 @@ async def _image(i: Image) -> MessageSegment:
     if isinstance(image, str):
         # URL
         return MessageSegment.image(image)
-    elif isinstance(image, bytes):
+    elif isinstance(image, (bytes, BytesIO)):
         # raw
-        if img_format := guess_mime(image):
-            return MessageSegment.image(raw=image, mime=img_format)
-        else:
-            raise ValueError("Cannot determine image format")
-    elif isinstance(image, BytesIO):
-        # raw
-        if img_format := guess_mime(image):
+        if img_format := (await i.metadata()).mime:
             return MessageSegment.image(raw=image, mime=img_format)
         else:
             raise ValueError("Cannot determine image format")
@@ -214,6 +211,9 @@ class SatoriReceipt(Receipt):
         """
         return SatoriMessageId(message_id=self.messages[index].id)
 
+    def extract_message_ids(self) -> list[MessageId]:
+        return [SatoriMessageId(message_id=message.id) for message in self.messages]
+
 
 @register_sender(SupportedAdapters.satori)
 async def send(
@@ -255,24 +255,30 @@ async def aggregate_send(
     message_factories: list[MessageFactory],
     target: PlatformTarget,
     event: Optional[Event],
-):
+) -> list[Receipt]:
     assert isinstance(bot, BotSatori)
 
-    msg_list: list[Message] = []
-    for msg_fac in message_factories:
-        msg = await msg_fac.build(bot)
-        assert isinstance(msg, Message)
-        msg_list.append(msg)
+    msg_list: list[Message] = await asyncio.gather(
+        *[msg_fac._build(bot) for msg_fac in message_factories],
+    )
 
-    message_to_send = Message()
-    for msg in msg_list:
-        message_to_send += MessageSegment.message(content=msg)
+    receipts: list[Receipt] = []
+    for index in range(0, len(msg_list), SATORI_FORWARD_NODE_LIMIT):
+        message_to_send = Message()
+        for msg in msg_list[index : index + SATORI_FORWARD_NODE_LIMIT]:
+            message_to_send += MessageSegment.message(content=msg)
 
-    if event:
-        assert isinstance(event, MessageEvent)
-        await bot.send_message(message=message_to_send, channel=event.channel)
-    else:
-        await bot.send_message(message=message_to_send, **target.arg_dict(bot))
+        if event:
+            assert isinstance(event, MessageEvent)
+            resp = await bot.send_message(
+                message=message_to_send, channel=event.channel
+            )
+        else:
+            resp = await bot.send_message(
+                message=message_to_send, **target.arg_dict(bot)
+            )
+        receipts.append(SatoriReceipt(bot_id=bot.self_id, messages=resp))
+    return receipts
 
 
 class PagedAPI(Generic[T], Protocol):
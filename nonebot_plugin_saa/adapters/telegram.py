@@ -1,17 +1,22 @@
 import asyncio
-from io import BytesIO
-from pathlib import Path
 from functools import partial
-from typing import TYPE_CHECKING, Union, Literal, Optional, cast
+from typing import TYPE_CHECKING, Any, Union, Literal, Optional, cast
 
-import anyio
 from nonebot import logger
 
+from ..concurrency import register_overload_classifier
 from ..types import Text, Image, Reply, Mention, MentionAll
-from ..utils import SupportedAdapters, type_message_id_check
+from ..utils import (
+    FallbackToDefault,
+    SupportedAdapters,
+    SupportedPlatform,
+    type_message_id_check,
+)
 from ..abstract_factories import (
     MessageFactory,
+    AggregatedMessageFactory,
     register_ms_adapter,
+    merge_message_factories,
     assamble_message_factory,
 )
 from ..registries import (
@@ -21,7 +26,9 @@ from ..registries import (
     TargetTelegramForum,
     TargetTelegramCommon,
     register_sender,
+    register_batch_revoker,
     register_target_extractor,
+    register_target_platforms,
     register_message_id_getter,
 )
 
@@ -30,6 +37,7 @@ if TYPE_CHECKING:
     from nonebot.adapters import Event as BaseEvent
 
 from nonebot.adapters.telegram import Bot as BotTG
+from nonebot.adapters.telegram.exception import ActionFailed
 from nonebot.adapters.telegram.message import File as TGFile
 from nonebot.adapters.telegram import Message, MessageSegment
 from nonebot.adapters.telegram.message import Reply as TGReply
@@ -46,6 +54,13 @@ from nonebot.adapters.telegram.event import (
 adapter = SupportedAdapters.telegram
 register_telegram = partial(register_ms_adapter, adapter)
 
+# https://core.telegram.org/bots/api#sendmediagroup
+TELEGRAM_MEDIA_GROUP_LIMIT = 10
+# https://core.telegram.org/bots/api#sendmessage
+TELEGRAM_TEXT_LIMIT = 4096
+# https://core.telegram.org/bots/api#deletemessages
+TELEGRAM_DELETE_MESSAGES_LIMIT = 100
+
 MessageFactory.register_adapter_message(SupportedAdapters.telegram, Message)
 
 
@@ -63,10 +78,8 @@ def _text(t: Text) -> MessageSegment:
 @register_telegram(Image)
 async def _image(i: Image) -> MessageSegment:
     image = i.data["image"]
-    if isinstance(image, Path):
-        image = await anyio.Path(image).read_bytes()
-    if isinstance(image, BytesIO):
-        image = image.getvalue()
+    if not isinstance(image, str):
+        image = await i.read_bytes(adapter)
     return TGFile.photo(image)
 
 
@@ -171,6 +184,47 @@ class TelegramReceipt(Receipt):
             chat_id=self.chat_id,
         )
 
+    def extract_message_ids(self) -> list[TelegramMessageId]:
+        return [
+            TelegramMessageId(message_id=message.message_id, chat_id=self.chat_id)
+            for message in self.messages
+        ]
+
+
+@register_batch_revoker(adapter)
+async def revoke_many(
+    bot: "BaseBot", receipts: list[Receipt], semaphore: asyncio.Semaphore
+) -> list[Any]:
+    assert isinstance(bot, BotTG)
+    # 按会话合并所有待删除的消息，使用 deleteMessages 批量删除
+    chats: dict[Union[int, str], list[tuple[int, int]]] = {}
+    for index, receipt in enumerate(receipts):
+        assert isinstance(receipt, TelegramReceipt)
+        chats.setdefault(receipt.chat_id, []).extend(
+            (index, message.message_id) for message in receipt.messages
+        )
+
+    results: list[Any] = [True] * len(receipts)
+
+    async def delete_chunk(chat_id: Union[int, str], chunk: list[tuple[int, int]]):
+        async with semaphore:
+            try:
+                await bot.delete_messages(
+                    chat_id=chat_id, message_ids=[message_id for _, message_id in chunk]
+                )
+            except Exception as e:
+                for index, _ in chunk:
+                    results[index] = e
+
+    await asyncio.gather(
+        *(
+            delete_chunk(chat_id, messages[i : i + TELEGRAM_DELETE_MESSAGES_LIMIT])
+            for chat_id, messages in chats.items()
+            for i in range(0, len(messages), TELEGRAM_DELETE_MESSAGES_LIMIT)
+        )
+    )
+    return results
+
 
 @register_message_id_getter(MessageEvent)
 def _(event: "BaseEvent"):
@@ -181,6 +235,19 @@ def _(event: "BaseEvent"):
     )
 
 
+register_target_platforms(
+    adapter,
+    SupportedPlatform.telegram_common,
+    SupportedPlatform.telegram_forum,
+)
+
+
+@register_overload_classifier(adapter)
+def _is_overload(e: BaseException) -> bool:
+    # https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this
+    return isinstance(e, ActionFailed) and "Too Many Requests" in (e.description or "")
+
+
 @register_sender(SupportedAdapters.telegram)
 async def send(
     bot: "BaseBot",
@@ -243,3 +310,31 @@ async def send(
         chat_id=chat_id,
         messages=message_sent if isinstance(message_sent, list) else [message_sent],
     )
+
+
+@AggregatedMessageFactory.register_aggregated_sender(adapter)
+async def aggregate_send(
+    bot: "BaseBot",
+    message_factories: list[MessageFactory],
+    target: "PlatformTarget",
+    event: Optional["BaseEvent"],
+):
+    assert isinstance(bot, BotTG)
+
+    merged_msg = merge_message_factories(message_factories)
+    if merged_msg.only(Text):
+        # 纯文本合并为一条消息
+        if sum(len(text) for text in merged_msg) > TELEGRAM_TEXT_LIMIT:
+            raise FallbackToDefault
+        return await merged_msg._do_send(bot, target, event, False, False)
+    elif all(msg_fac.only(Image) for msg_fac in message_factories):
+        # 纯图片使用 sendMediaGroup 每次发送一组
+        images = merged_msg[Image]
+        return [
+            await images[index : index + TELEGRAM_MEDIA_GROUP_LIMIT]._do_send(
+                bot, target, event, False, False
+            )
+            for index in range(0, len(images), TELEGRAM_MEDIA_GROUP_LIMIT)
+        ]
+    else:
+        raise FallbackToDefault
@@ -11,13 +11,20 @@ from nonebot.adapters import Bot
 from nonebot import logger, get_bots
 from nonebot.compat import model_dump
 
-from .registries import BotSpecifier, PlatformTarget, TargetQQGuildDirect
+from .utils.instrumentation import span
+from .circuit_breaker import bot_available
 from .utils import (
     NoBotFound,
     SupportedAdapters,
     AdapterNotSupported,
     extract_adapter_type,
 )
+from .registries import (
+    BotSpecifier,
+    PlatformTarget,
+    TargetQQGuildDirect,
+    supports_platform,
+)
 
 BOT_CACHE: dict[Bot, set[PlatformTarget]] = {}
 BOT_CACHE_LOCK = asyncio.Lock()
@@ -105,6 +112,11 @@ async def refresh_bots():
 
 def get_bot(target: PlatformTarget) -> Bot:
     """获取 Bot"""
+    with span("get_bot", platform=target.platform_type):
+        return _get_bot(target)
+
+
+def _get_bot(target: PlatformTarget) -> Bot:
     if not inited:
         raise RuntimeError(
             "\n自动选择 Bot 的功能未启用\n"
@@ -122,15 +134,19 @@ def get_bot(target: PlatformTarget) -> Bot:
     if isinstance(target, TargetQQGuildDirect):
         raise NotImplementedError("暂不支持私聊")
 
-    bots = []
-    for bot, targets in BOT_CACHE.items():
-        if target in targets:
-            bots.append(bot)
+    # 跳过适配器无法发送到该平台的 Bot
+    bots = [
+        bot
+        for bot, targets in BOT_CACHE.items()
+        if target in targets
+        and supports_platform(extract_adapter_type(bot), target.platform_type)
+    ]
     if not bots:
         _info_current()
         raise NoBotFound()
 
-    return random.choice(bots)
+    # 优先选择没有熔断的 Bot，都在熔断中时由发送时快速失败
+    return random.choice([bot for bot in bots if bot_available(bot)] or bots)
 
 
 def _info_current():
@@ -0,0 +1,281 @@
+"""按 Bot 和适配器的熔断：连续失败后暂停发送并快速失败，一段时间后试探恢复"""
+
+import time
+import asyncio
+from enum import Enum
+from typing import Optional
+from contextvars import ContextVar
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import anyio
+from nonebot import logger
+from nonebot.adapters import Bot
+from nonebot.exception import NetworkError
+
+from .utils import (
+    CircuitOpen,
+    FallbackToDefault,
+    SupportedAdapters,
+    extract_adapter_type,
+)
+
+
+class CircuitState(str, Enum):
+    closed = "closed"
+    """正常发送"""
+    open = "open"
+    """熔断中，发送立即失败"""
+    half_open = "half_open"
+    """试探恢复，只允许一次发送通过"""
+
+
+def is_failure(e: BaseException) -> bool:
+    """判断异常是否说明 Bot 或平台接口不可用
+
+    只统计超时、网络错误和平台的 5xx 错误，消息内容或目标有误等业务错误说明接口仍然可用
+    """
+    if isinstance(e, (TimeoutError, asyncio.TimeoutError, NetworkError)):
+        return True
+    status_code = getattr(e, "status_code", None)
+    return isinstance(status_code, int) and status_code >= 500
+
+
+class CircuitBreaker:
+    """单个 Bot 或适配器的熔断器
+
+    - 连续失败 failure_threshold 次后打开，打开期间发送立即失败
+    - 打开 recovery_timeout 秒后进入半开状态，允许一次试探发送：
+      成功则关闭，失败则重新打开
+
+    Args:
+        failure_threshold (int): 打开熔断所需的连续失败次数
+        recovery_timeout (float): 打开后多少秒开始试探恢复
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        """连续失败次数"""
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self.opened_at is None:
+            return CircuitState.closed
+        if time.monotonic() - self.opened_at < self.recovery_timeout:
+            return CircuitState.open
+        return CircuitState.half_open
+
+    def available(self) -> bool:
+        """当前是否可以发送，不占用半开状态的试探机会"""
+        state = self.state
+        return state is CircuitState.closed or (
+            state is CircuitState.half_open and not self._probing
+        )
+
+    def acquire(self) -> bool:
+        """请求发送，半开状态下只有第一个请求得到试探机会"""
+        if not self.available():
+            return False
+        if self.state is CircuitState.half_open:
+            self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """发送被取消或没有实际进行时，归还试探机会"""
+        self._probing = False
+
+
+class CircuitBreakers:
+    """按 Bot 和按适配器的熔断器
+
+    Bot 的熔断器用于应对单个协议端卡死或断线，适配器的熔断器用于应对平台接口整体故障，
+    发送需要两者都可用
+
+    Args:
+        failure_threshold (int): 单个 Bot 打开熔断所需的连续失败次数
+        adapter_failure_threshold (int): 适配器打开熔断所需的连续失败次数（不区分 Bot）
+        recovery_timeout (float): 打开后多少秒开始试探恢复
+        send_timeout (float, optional): 单次发送的超时时间（秒），超时计为失败，
+            为 None 时只依赖适配器自身的超时
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        adapter_failure_threshold: int = 20,
+        recovery_timeout: float = 30,
+        send_timeout: Optional[float] = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.adapter_failure_threshold = adapter_failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.send_timeout = send_timeout
+        self._bot_breakers: dict[tuple[SupportedAdapters, str], CircuitBreaker] = {}
+        self._adapter_breakers: dict[SupportedAdapters, CircuitBreaker] = {}
+
+    def bot_breaker(self, adapter: SupportedAdapters, bot_id: str) -> CircuitBreaker:
+        if (breaker := self._bot_breakers.get((adapter, bot_id))) is None:
+            breaker = self._bot_breakers[(adapter, bot_id)] = CircuitBreaker(
+                self.failure_threshold, self.recovery_timeout
+            )
+        return breaker
+
+    def adapter_breaker(self, adapter: SupportedAdapters) -> CircuitBreaker:
+        if (breaker := self._adapter_breakers.get(adapter)) is None:
+            breaker = self._adapter_breakers[adapter] = CircuitBreaker(
+                self.adapter_failure_threshold, self.recovery_timeout
+            )
+        return breaker
+
+    def available(self, adapter: SupportedAdapters, bot_id: str) -> bool:
+        """Bot 当前是否可以发送"""
+        return (
+            self.adapter_breaker(adapter).available()
+            and self.bot_breaker(adapter, bot_id).available()
+        )
+
+    def check(self, adapter: SupportedAdapters, bot_id: str) -> None:
+        """熔断器打开时抛出 CircuitOpen，不占用半开状态的试探机会"""
+        if not self.adapter_breaker(adapter).available():
+            raise CircuitOpen(adapter)
+        if not self.bot_breaker(adapter, bot_id).available():
+            raise CircuitOpen(adapter, bot_id)
+
+    @property
+    def bot_states(self) -> dict[tuple[SupportedAdapters, str], CircuitState]:
+        """所有 (适配器, Bot) 熔断器的状态"""
+        return {key: breaker.state for key, breaker in self._bot_breakers.items()}
+
+    @property
+    def adapter_states(self) -> dict[SupportedAdapters, CircuitState]:
+        """所有适配器熔断器的状态"""
+        return {key: breaker.state for key, breaker in self._adapter_breakers.items()}
+
+    @asynccontextmanager
+    async def guard(
+        self, adapter: SupportedAdapters, bot_id: str
+    ) -> AsyncIterator[None]:
+        """熔断器打开时抛出 CircuitOpen，否则执行代码块并记录结果"""
+        adapter_breaker = self.adapter_breaker(adapter)
+        bot_breaker = self.bot_breaker(adapter, bot_id)
+        if not adapter_breaker.acquire():
+            raise CircuitOpen(adapter)
+        if not bot_breaker.acquire():
+            adapter_breaker.release()
+            raise CircuitOpen(adapter, bot_id)
+
+        breakers = {
+            f"adapter {adapter}": adapter_breaker,
+            f"bot {bot_id} of adapter {adapter}": bot_breaker,
+        }
+        try:
+            if self.send_timeout is None:
+                yield
+            else:
+                with anyio.fail_after(self.send_timeout):
+                    yield
+        except (CircuitOpen, FallbackToDefault):
+            # 没有实际发送，不计入结果
+            for breaker in breakers.values():
+                breaker.release()
+            raise
+        except Exception as e:
+            for scope, breaker in breakers.items():
+                if not is_failure(e):
+                    breaker.record_success()
+                    continue
+                was_closed = breaker.state is CircuitState.closed
+                breaker.record_failure()
+                if was_closed and breaker.state is CircuitState.open:
+                    logger.warning(
+                        f"circuit breaker of {scope} opened "
+                        f"after {breaker.failures} consecutive failures: {e!r}"
+                    )
+            raise
+        except BaseException:
+            for breaker in breakers.values():
+                breaker.release()
+            raise
+        else:
+            for scope, breaker in breakers.items():
+                if breaker.state is not CircuitState.closed:
+                    logger.info(f"circuit breaker of {scope} closed")
+                breaker.record_success()
+
+
+circuit_breakers: Optional[CircuitBreakers] = None
+
+
+def enable_circuit_breaker(
+    breakers: Optional[CircuitBreakers] = None,
+) -> CircuitBreakers:
+    """启用熔断
+
+    启用后，Bot 或适配器连续发送失败（超时、网络错误、平台 5xx 错误）时会暂停发送，
+    期间发送立即抛出 CircuitOpen，自动选择 Bot 时会跳过熔断中的 Bot。
+    一段时间后允许一次试探发送，成功即恢复。不传入 breakers 时使用默认参数
+
+    ```python
+    # __init__.py(插件入口)
+    require("nonebot_plugin_saa")
+    from nonebot_plugin_saa import enable_circuit_breaker
+    enable_circuit_breaker()
+    ```
+    """
+    global circuit_breakers
+
+    circuit_breakers = breakers or CircuitBreakers()
+    return circuit_breakers
+
+
+def bot_available(bot: Bot) -> bool:
+    """熔断启用时，判断 bot 当前是否可以发送"""
+    if circuit_breakers is None:
+        return True
+    return circuit_breakers.available(extract_adapter_type(bot), bot.self_id)
+
+
+# 当前上下文已经进入熔断检查的 (适配器, Bot)
+_guarded: ContextVar[frozenset[tuple[SupportedAdapters, str]]] = ContextVar(
+    "saa_circuit_guarded", default=frozenset()
+)
+
+
+def check_circuit(adapter: SupportedAdapters, bot: Bot) -> None:
+    """熔断启用时，在等待并发名额之前检查 bot 是否可以发送，熔断中则立即失败"""
+    if circuit_breakers is None or (adapter, bot.self_id) in _guarded.get():
+        return
+    circuit_breakers.check(adapter, bot.self_id)
+
+
+@asynccontextmanager
+async def circuit_guard(adapter: SupportedAdapters, bot: Bot) -> AsyncIterator[None]:
+    """熔断启用时，检查并记录 bot 的发送结果
+
+    同一次发送只检查和记录一次：适配器的合并发送方法内部再调用 `_do_send` 时不再检查
+    """
+    key = (adapter, bot.self_id)
+    if circuit_breakers is None or key in (guarded := _guarded.get()):
+        yield
+        return
+    async with circuit_breakers.guard(adapter, bot.self_id):
+        token = _guarded.set(guarded | {key})
+        try:
+            yield
+        finally:
+            _guarded.reset(token)
@@ -0,0 +1,136 @@
+"""合并短时间内发送到同一目标的多条消息，减少调用平台接口的次数"""
+
+import asyncio
+from functools import partial
+from typing import Union, Optional
+from dataclasses import field, dataclass
+
+from nonebot.adapters import Bot
+
+from .types import Reply
+from .utils import retrieve_exception
+from .registries import Receipt, PlatformTarget
+from .abstract_factories import (
+    MessageFactory,
+    MessageSegmentFactory,
+    AggregatedMessageFactory,
+    merge_message_factories,
+)
+
+CoalesceKey = tuple[PlatformTarget, Optional[Bot]]
+
+
+@dataclass
+class _Batch:
+    future: "asyncio.Future[Receipt]"
+    messages: list[MessageFactory] = field(default_factory=list)
+    flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class SendCoalescer:
+    """在一个时间窗口内缓冲发送到同一目标的消息，合并后一次发送
+
+    - 第一条消息到达后等待 window 秒，期间发送到同一目标的消息合并为一条，
+      以 separator 分隔；消息数量超过 aggregate_threshold 时合并为聚合消息
+    - 缓冲的消息达到 max_messages 条时立即发送
+    - 同一批次的调用者得到同一个回执，发送失败时都会收到同一个异常
+    - 包含 Reply 的消息会开始新的批次，保证回复消息段位于合并后消息的开头
+
+    Args:
+        window (float): 合并的时间窗口（秒）
+        aggregate_threshold (int): 超过该数量的消息合并为 AggregatedMessageFactory
+        max_messages (int): 一个批次最多合并的消息数量
+        separator (str): 合并为一条消息时，消息之间的分隔符
+    """
+
+    def __init__(
+        self,
+        window: float = 0.5,
+        aggregate_threshold: int = 10,
+        max_messages: int = 50,
+        separator: str = "\n",
+    ) -> None:
+        self.window = window
+        self.aggregate_threshold = aggregate_threshold
+        self.max_messages = max_messages
+        self.separator = separator
+        self._batches: dict[CoalesceKey, _Batch] = {}
+        self._sending: dict[CoalesceKey, asyncio.Task] = {}
+
+    async def send_to(
+        self,
+        message: Union[str, MessageSegmentFactory, MessageFactory],
+        target: PlatformTarget,
+        bot: Optional[Bot] = None,
+    ) -> Receipt:
+        """将消息加入 target 的批次，等待批次发送完成后返回回执
+
+        不传入 bot 时，在批次发送时自动选择 bot
+        """
+        message = (
+            message if isinstance(message, MessageFactory) else MessageFactory(message)
+        )
+        key = (target, bot)
+        if Reply in message and key in self._batches:
+            self._flush(key)
+
+        if (batch := self._batches.get(key)) is None:
+            loop = asyncio.get_running_loop()
+            batch = self._batches[key] = _Batch(loop.create_future())
+            batch.future.add_done_callback(retrieve_exception)
+            batch.flush_handle = loop.call_later(self.window, self._flush, key)
+        batch.messages.append(message)
+        future = batch.future
+        if len(batch.messages) >= self.max_messages:
+            self._flush(key)
+        return await asyncio.shield(future)
+
+    def _merge(
+        self, messages: list[MessageFactory]
+    ) -> Union[MessageFactory, AggregatedMessageFactory]:
+        if len(messages) == 1:
+            return messages[0]
+        if len(messages) > self.aggregate_threshold:
+            return AggregatedMessageFactory(messages)
+        return merge_message_factories(messages, self.separator)
+
+    def _flush(self, key: CoalesceKey) -> None:
+        if (batch := self._batches.pop(key, None)) is None:
+            return
+        if batch.flush_handle is not None:
+            batch.flush_handle.cancel()
+        task = asyncio.create_task(self._send(key, batch, self._sending.get(key)))
+        self._sending[key] = task
+        task.add_done_callback(partial(self._on_sent, key))
+
+    def _on_sent(self, key: CoalesceKey, task: asyncio.Task) -> None:
+        if self._sending.get(key) is task:
+            del self._sending[key]
+
+    async def _send(
+        self, key: CoalesceKey, batch: _Batch, previous: Optional[asyncio.Task]
+    ) -> None:
+        if previous is not None:
+            # 同一目标的批次按顺序发送
+            await asyncio.wait([previous])
+        target, bot = key
+        try:
+            receipt = await self._merge(batch.messages).send_to(target, bot)
+        except asyncio.CancelledError:
+            batch.future.cancel()
+            raise
+        except Exception as e:
+            batch.future.set_exception(e)
+        else:
+            batch.future.set_result(receipt)
+        finally:
+            # 其他异常导致发送中断时，不能让调用者一直等待
+            if not batch.future.done():
+                batch.future.cancel()
+
+    async def flush(self) -> None:
+        """立即发送所有缓冲中的消息，并等待发送完成"""
+        for key in list(self._batches):
+            self._flush(key)
+        if self._sending:
+            await asyncio.wait(list(self._sending.values()))
@@ -0,0 +1,211 @@
+"""按适配器和 Bot 自适应调整发送并发数（AIMD：加性增、乘性减）"""
+
+import time
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, Optional
+from dataclasses import field, dataclass
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from nonebot import logger
+from nonebot.adapters import Bot
+
+from .utils import SupportedAdapters
+
+LimitKey = tuple[SupportedAdapters, str]
+OverloadClassifier = Callable[[BaseException], bool]
+
+overload_classifiers: dict[SupportedAdapters, OverloadClassifier] = {}
+
+
+def register_overload_classifier(adapter: SupportedAdapters):
+    """注册适配器的过载判断函数
+
+    函数接收发送时抛出的异常，返回 True 表示平台限流或过载，此时会降低并发数
+    """
+
+    def wrapper(func: OverloadClassifier):
+        overload_classifiers[adapter] = func
+        return func
+
+    return wrapper
+
+
+def is_overload(adapter: SupportedAdapters, e: BaseException) -> bool:
+    """判断异常是否是平台限流或过载的信号"""
+    if (classifier := overload_classifiers.get(adapter)) is not None and classifier(e):
+        return True
+    if isinstance(e, (TimeoutError, asyncio.TimeoutError)):
+        return True
+    # 各适配器的限流异常都叫 RateLimitException，按名称判断以免导入未使用的适配器
+    if any(cls.__name__ == "RateLimitException" for cls in type(e).__mro__):
+        return True
+    return getattr(e, "status_code", None) == 429
+
+
+@dataclass
+class _LimitState:
+    limit: float
+    inflight: int = 0
+    waiters: "deque[asyncio.Future[None]]" = field(default_factory=deque)
+    last_backoff: float = float("-inf")
+    """上次降低并发数的时间，在此之前开始的发送的失败不会再次降低并发数"""
+
+
+class AdaptiveConcurrencyLimiter:
+    """按 (适配器, Bot) 自适应调整的并发限制
+
+    - 并发数被占满时，每次耗时不超过 latency_threshold 的成功发送
+      使并发数增加 1/当前并发数，即每轮发送大约增加 1
+    - 发送因限流或超时失败时，并发数乘以 backoff_ratio；
+      降低之前已经开始的发送再失败不会重复降低
+    - 其他错误和较慢的成功发送不改变并发数
+
+    Args:
+        initial_limit (int): 初始并发数
+        min_limit (int): 并发数下限
+        max_limit (int): 并发数上限
+        backoff_ratio (float): 限流或超时时并发数的缩小比例
+        latency_threshold (float): 发送耗时超过该值（秒）时不再增加并发数
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_threshold: float = 5.0,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("require 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_threshold = latency_threshold
+        self._states: dict[LimitKey, _LimitState] = {}
+
+    def get_limit(self, adapter: SupportedAdapters, bot_id: str) -> int:
+        """获取当前的并发数"""
+        if (state := self._states.get((adapter, bot_id))) is None:
+            return self.initial_limit
+        return int(state.limit)
+
+    @property
+    def limits(self) -> dict[LimitKey, int]:
+        """所有 (适配器, Bot) 当前的并发数"""
+        return {key: int(state.limit) for key, state in self._states.items()}
+
+    @asynccontextmanager
+    async def slot(
+        self, adapter: SupportedAdapters, bot_id: str
+    ) -> AsyncIterator[None]:
+        """占用一个并发名额，并根据代码块的耗时和异常调整并发数"""
+        key = (adapter, bot_id)
+        if (state := self._states.get(key)) is None:
+            state = self._states[key] = _LimitState(float(self.initial_limit))
+        await self._acquire(state)
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self._release(key, state, start, e)
+            raise
+        else:
+            self._release(key, state, start, None)
+
+    async def _acquire(self, state: _LimitState) -> None:
+        # 按到达顺序分配名额，有空余名额时 waiter 会立即完成
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        self._wake(state)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # 已经分配到名额后才被取消时，将名额让给下一个等待者
+            if waiter.done() and not waiter.cancelled():
+                state.inflight -= 1
+                self._wake(state)
+            raise
+
+    def _wake(self, state: _LimitState) -> None:
+        while state.waiters and state.inflight < int(state.limit):
+            waiter = state.waiters.popleft()
+            if waiter.done():
+                continue
+            state.inflight += 1
+            waiter.set_result(None)
+
+    def _release(
+        self,
+        key: LimitKey,
+        state: _LimitState,
+        start: float,
+        e: Optional[BaseException],
+    ) -> None:
+        saturated = state.inflight >= int(state.limit)
+        state.inflight -= 1
+        if e is None:
+            if saturated and time.monotonic() - start <= self.latency_threshold:
+                state.limit = min(self.max_limit, state.limit + 1 / state.limit)
+        elif is_overload(key[0], e) and start >= state.last_backoff:
+            state.limit = max(self.min_limit, state.limit * self.backoff_ratio)
+            state.last_backoff = time.monotonic()
+            logger.debug(
+                f"{key[0]} bot {key[1]} overloaded ({e!r}), "
+                f"reduce send concurrency to {int(state.limit)}"
+            )
+        self._wake(state)
+
+
+adaptive_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+
+
+def enable_adaptive_concurrency(
+    limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+) -> AdaptiveConcurrencyLimiter:
+    """启用自适应并发控制
+
+    启用后，每个 Bot 同时进行的发送数量会根据平台的响应自动调整：
+    发送顺畅时逐渐增加，遇到限流或超时时减半。不传入 limiter 时使用默认参数
+
+    ```python
+    # __init__.py(插件入口)
+    require("nonebot_plugin_saa")
+    from nonebot_plugin_saa import enable_adaptive_concurrency
+    enable_adaptive_concurrency()
+    ```
+    """
+    global adaptive_limiter
+
+    adaptive_limiter = limiter or AdaptiveConcurrencyLimiter()
+    return adaptive_limiter
+
+
+# 当前上下文已经占用名额的 (适配器, Bot)
+_held_slots: ContextVar[frozenset[LimitKey]] = ContextVar(
+    "saa_held_slots", default=frozenset()
+)
+
+
+@asynccontextmanager
+async def concurrency_slot(adapter: SupportedAdapters, bot: Bot) -> AsyncIterator[None]:
+    """自适应并发控制启用时，占用 bot 的一个并发名额
+
+    同一次发送只占用一个名额：适配器的合并发送方法内部再调用 `_do_send` 时不再占用
+    """
+    key = (adapter, bot.self_id)
+    if adaptive_limiter is None or key in (held := _held_slots.get()):
+        yield
+        return
+    async with adaptive_limiter.slot(adapter, bot.self_id):
+        token = _held_slots.set(held | {key})
+        try:
+            yield
+        finally:
+            _held_slots.reset(token)
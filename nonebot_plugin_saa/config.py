@@ -11,6 +11,51 @@ class ScopedConfig(BaseModel):
     qqguild_magic_msg_id: str = Field(default="1000", description="QQ频道魔法消息ID")
     """QQ频道魔法消息ID"""
 
+    revoke_concurrency: int = Field(
+        default=8, description="批量撤回时单个 Bot 的最大并发撤回数"
+    )
+    """批量撤回时单个 Bot 的最大并发撤回数"""
+
+    qqguild_dms_cache_size: int = Field(
+        default=10000, description="QQ频道私聊 guild_id 缓存的最大数量"
+    )
+    """QQ频道私聊 guild_id 缓存的最大数量"""
+
+    qqguild_dms_cache_ttl: float = Field(
+        default=7 * 86400, description="QQ频道私聊 guild_id 缓存的有效期（秒）"
+    )
+    """QQ频道私聊 guild_id 缓存的有效期（秒）"""
+
+    http_timeout: float = Field(
+        default=10, description="SAA 下载图片等 HTTP 请求的超时时间（秒）"
+    )
+    """SAA 下载图片等 HTTP 请求的超时时间（秒）"""
+
+    http_version: str = Field(
+        default="1.1", description="SAA 发出 HTTP 请求使用的 HTTP 版本，可选 1.1、2"
+    )
+    """SAA 发出 HTTP 请求使用的 HTTP 版本，可选 1.1、2"""
+
+    http_max_connections_per_host: int = Field(
+        default=10, description="SAA 对同一主机的最大并发 HTTP 请求数"
+    )
+    """SAA 对同一主机的最大并发 HTTP 请求数"""
+
+    file_cache_size: int = Field(
+        default=32 * 1024 * 1024, description="本地图片文件缓存的总大小（字节）"
+    )
+    """本地图片文件缓存的总大小（字节）"""
+
+    file_cache_max_file_size: int = Field(
+        default=4 * 1024 * 1024, description="被缓存的本地图片文件的最大大小（字节）"
+    )
+    """被缓存的本地图片文件的最大大小（字节）"""
+
+    image_preprocess_cache_size: int = Field(
+        default=32 * 1024 * 1024, description="图片预处理结果缓存的总大小（字节）"
+    )
+    """图片预处理结果缓存的总大小（字节）"""
+
 
 class Config(BaseModel):
     saa: ScopedConfig = Field(default_factory=ScopedConfig)
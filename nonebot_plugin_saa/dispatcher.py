@@ -0,0 +1,163 @@
+"""按发送目标排队的并发发送：同一目标的消息按提交顺序逐条发送，不同目标之间并发"""
+
+import asyncio
+from collections import deque
+from typing import Union, Optional
+from dataclasses import field, dataclass
+
+import nonebot
+from nonebot.adapters import Bot
+
+from .auto_select_bot import get_bot
+from .circuit_breaker import bot_available
+from .registries import Receipt, PlatformTarget
+from .abstract_factories import MessageFactory, AggregatedMessageFactory
+
+DispatchMessage = Union[MessageFactory, AggregatedMessageFactory]
+
+
+@dataclass
+class _Item:
+    message: DispatchMessage
+    bot: Optional[Bot]
+    idempotency_key: Optional[str]
+    future: "asyncio.Future[Receipt]"
+
+
+@dataclass
+class _Lane:
+    queue: "deque[_Item]" = field(default_factory=deque)
+    bot: Optional[Bot] = None
+    """自动选择后固定使用的 Bot"""
+    worker: Optional[asyncio.Task] = None
+    expire_handle: Optional[asyncio.TimerHandle] = None
+
+
+def _is_connected(bot: Bot) -> bool:
+    return nonebot.get_bots().get(bot.self_id) is bot
+
+
+class SendDispatcher:
+    """按发送目标排队的发送器
+
+    - 同一目标的消息按提交顺序逐条发送，前一条发送完成（无论成功与否）后才发送下一条
+    - 不同目标的消息并发发送，可以通过 max_concurrency 限制同时进行的发送数量
+    - 没有指定 Bot 时，目标第一次发送时自动选择的 Bot 会在该目标的队列存在期间一直使用，
+      该 Bot 断开后重新选择
+
+    Args:
+        max_concurrency (int, optional): 所有目标同时进行的发送数量上限，
+            为 None 时不限制
+        idle_timeout (float): 目标的队列空闲多少秒后释放，释放后下次发送重新选择 Bot
+    """
+
+    def __init__(
+        self, max_concurrency: Optional[int] = None, idle_timeout: float = 60
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.idle_timeout = idle_timeout
+        self._lanes: dict[PlatformTarget, _Lane] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def submit(
+        self,
+        message: DispatchMessage,
+        target: PlatformTarget,
+        bot: Optional[Bot] = None,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> "asyncio.Future[Receipt]":
+        """将消息加入 target 的队列，返回发送完成后得到回执的 Future"""
+        future = asyncio.get_running_loop().create_future()
+        if (lane := self._lanes.get(target)) is None:
+            lane = self._lanes[target] = _Lane()
+        if lane.expire_handle is not None:
+            lane.expire_handle.cancel()
+            lane.expire_handle = None
+        lane.queue.append(_Item(message, bot, idempotency_key, future))
+        if lane.worker is None:
+            lane.worker = asyncio.create_task(self._work(target, lane))
+        return future
+
+    async def send_to(
+        self,
+        message: DispatchMessage,
+        target: PlatformTarget,
+        bot: Optional[Bot] = None,
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> Receipt:
+        """将消息加入 target 的队列，并等待发送完成"""
+        return await self.submit(message, target, bot, idempotency_key=idempotency_key)
+
+    def _get_semaphore(self) -> Optional[asyncio.Semaphore]:
+        if self.max_concurrency is not None and self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _select_bot(self, target: PlatformTarget, lane: _Lane) -> Bot:
+        if (
+            lane.bot is None
+            or not _is_connected(lane.bot)
+            or not bot_available(lane.bot)
+        ):
+            lane.bot = get_bot(target)
+        return lane.bot
+
+    async def _send(self, target: PlatformTarget, lane: _Lane, item: _Item) -> Receipt:
+        bot = item.bot or self._select_bot(target, lane)
+        if (semaphore := self._get_semaphore()) is None:
+            return await item.message.send_to(
+                target, bot, idempotency_key=item.idempotency_key
+            )
+        async with semaphore:
+            return await item.message.send_to(
+                target, bot, idempotency_key=item.idempotency_key
+            )
+
+    async def _work(self, target: PlatformTarget, lane: _Lane) -> None:
+        try:
+            while lane.queue:
+                item = lane.queue.popleft()
+                # 提交者已经取消等待时跳过
+                if item.future.cancelled():
+                    continue
+                try:
+                    receipt = await self._send(target, lane, item)
+                except asyncio.CancelledError:
+                    item.future.cancel()
+                    raise
+                except Exception as e:
+                    if not item.future.cancelled():
+                        item.future.set_exception(e)
+                else:
+                    if not item.future.cancelled():
+                        item.future.set_result(receipt)
+        finally:
+            lane.worker = None
+            while lane.queue:
+                lane.queue.popleft().future.cancel()
+        # 队列空闲一段时间后释放，之前固定的 Bot 随之失效
+        lane.expire_handle = asyncio.get_running_loop().call_later(
+            self.idle_timeout, self._expire, target, lane
+        )
+
+    def _expire(self, target: PlatformTarget, lane: _Lane) -> None:
+        if self._lanes.get(target) is lane and lane.worker is None:
+            del self._lanes[target]
+
+    async def join(self) -> None:
+        """等待所有已提交的消息发送完成"""
+        while workers := [lane.worker for lane in self._lanes.values() if lane.worker]:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def close(self) -> None:
+        """停止发送，尚未发送的消息会被取消"""
+        workers = [lane.worker for lane in self._lanes.values() if lane.worker]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for lane in self._lanes.values():
+            if lane.expire_handle is not None:
+                lane.expire_handle.cancel()
+        self._lanes.clear()
@@ -0,0 +1,210 @@
+"""幂等发送：相同的幂等键重复发送到同一目标时，直接返回第一次发送的回执"""
+
+import time
+import asyncio
+from pathlib import Path
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable
+from typing import Union, Callable, Optional
+
+from nonebot import logger
+
+from .utils import retrieve_exception
+from .registries import Receipt, PlatformTarget
+from .utils.sqlite import SqliteStoreMixin, dump_json
+
+IdempotencyKey = tuple[PlatformTarget, str]
+
+
+class IdempotencyStore(ABC):
+    """幂等键到回执的存储
+
+    Args:
+        ttl (float, optional): 幂等键的有效期（秒），为 None 时不过期
+    """
+
+    def __init__(self, ttl: Optional[float] = 86400) -> None:
+        self.ttl = ttl
+
+    def _expire_before(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    @abstractmethod
+    async def get(self, target: PlatformTarget, key: str) -> Optional[Receipt]:
+        """查询使用幂等键 key 发送到 target 的回执，不存在或过期时返回 None"""
+        ...
+
+    @abstractmethod
+    async def set(self, target: PlatformTarget, key: str, receipt: Receipt) -> None:
+        """记录使用幂等键 key 发送到 target 的回执"""
+        ...
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """保存在内存中的幂等键存储，超出 max_size 时淘汰最早写入的幂等键
+
+    Args:
+        max_size (int, optional): 最多保存的幂等键数量
+        ttl (float, optional): 幂等键的有效期（秒），为 None 时不过期
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = 86400) -> None:
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._records: OrderedDict[IdempotencyKey, tuple[Receipt, float]] = (
+            OrderedDict()
+        )
+
+    async def get(self, target: PlatformTarget, key: str) -> Optional[Receipt]:
+        if (record := self._records.get((target, key))) is None:
+            return None
+        receipt, created_at = record
+        if created_at < self._expire_before():
+            del self._records[(target, key)]
+            return None
+        return receipt
+
+    async def set(self, target: PlatformTarget, key: str, receipt: Receipt) -> None:
+        self._records[(target, key)] = (receipt, time.time())
+        self._records.move_to_end((target, key))
+        while len(self._records) > self.max_size:
+            self._records.popitem(last=False)
+
+
+class SqliteIdempotencyStore(SqliteStoreMixin, IdempotencyStore):
+    """保存在 sqlite 数据库中的幂等键存储，重启后仍然有效，数据库操作在线程池中执行
+
+    Args:
+        path (str | Path): 数据库文件路径
+        ttl (float, optional): 幂等键的有效期（秒），为 None 时不过期
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: Optional[float] = 86400) -> None:
+        super().__init__(ttl)
+        self._connect(
+            path,
+            """
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                target TEXT NOT NULL,
+                key TEXT NOT NULL,
+                receipt TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (target, key)
+            )
+            """,
+        )
+
+    def _get_sync(self, target: str, key: str, expire_before: float) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT receipt FROM idempotency_keys"
+            " WHERE target = ? AND key = ? AND created_at >= ?",
+            (target, key, expire_before),
+        ).fetchone()
+        return row[0] if row else None
+
+    async def get(self, target: PlatformTarget, key: str) -> Optional[Receipt]:
+        raw = await self._run(
+            self._get_sync, dump_json(target), key, self._expire_before()
+        )
+        return Receipt.deserialize(raw) if raw is not None else None
+
+    def _set_sync(self, target: str, key: str, receipt: str, expire_before: float):
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM idempotency_keys WHERE created_at < ?", (expire_before,)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO idempotency_keys VALUES (?, ?, ?, ?)",
+                (target, key, receipt, time.time()),
+            )
+
+    async def set(self, target: PlatformTarget, key: str, receipt: Receipt) -> None:
+        await self._run(
+            self._set_sync,
+            dump_json(target),
+            key,
+            dump_json(receipt),
+            self._expire_before(),
+        )
+
+
+idempotency_store: IdempotencyStore = MemoryIdempotencyStore()
+_inflight: dict[IdempotencyKey, "asyncio.Future[Receipt]"] = {}
+
+
+def set_idempotency_store(store: IdempotencyStore) -> None:
+    """设置幂等键存储，默认使用 MemoryIdempotencyStore
+
+    需要在重启后仍然去重时，可以使用 SqliteIdempotencyStore
+
+    ```python
+    # __init__.py(插件入口)
+    require("nonebot_plugin_saa")
+    from nonebot_plugin_saa import SqliteIdempotencyStore, set_idempotency_store
+    set_idempotency_store(SqliteIdempotencyStore("data/idempotency.db"))
+    ```
+    """
+    global idempotency_store
+
+    idempotency_store = store
+
+
+async def send_idempotent(
+    target: PlatformTarget,
+    key: Optional[str],
+    send: Callable[[], Awaitable[Receipt]],
+) -> Receipt:
+    """key 不为 None 时，同一 target 的相同 key 只发送一次
+
+    - 已经发送过时直接返回记录的回执
+    - 并发发送时等待正在进行的发送，共享它的结果
+    - 发送失败时不记录，之后可以使用相同的 key 重试
+    """
+    if key is None:
+        return await send()
+
+    while True:
+        try:
+            receipt = await idempotency_store.get(target, key)
+        except Exception as e:
+            logger.warning(f"get idempotency key {key!r} failed: {e!r}")
+            receipt = None
+        if receipt is not None:
+            return receipt
+
+        if (fut := _inflight.get((target, key))) is None:
+            break
+        # 只有当前协程被取消时才会抛出 CancelledError
+        await asyncio.wait([fut])
+        # 正在发送的协程在发送完成前被取消时，重新查询并由等待者之一发送
+        if not fut.cancelled():
+            return fut.result()
+
+    fut = asyncio.get_running_loop().create_future()
+    fut.add_done_callback(retrieve_exception)
+    _inflight[(target, key)] = fut
+    sent = False
+    try:
+        receipt = await send()
+        sent = True
+        # 记录完成前仍然处于发送中，避免记录期间到达的调用重复发送
+        try:
+            await idempotency_store.set(target, key, receipt)
+        except Exception:
+            logger.exception(f"record idempotency key {key!r} failed")
+    except asyncio.CancelledError:
+        # 已经发送成功时，等待者直接使用回执，避免重复发送
+        if sent:
+            fut.set_result(receipt)
+        else:
+            fut.cancel()
+        raise
+    except Exception as e:
+        fut.set_exception(e)
+        raise
+    else:
+        fut.set_result(receipt)
+    finally:
+        del _inflight[(target, key)]
+    return receipt
@@ -0,0 +1,212 @@
+"""按各平台的限制预处理图片：转换不支持的格式、缩小尺寸、压缩体积
+
+需要安装 Pillow，处理在线程池中进行，处理结果按图片内容的哈希缓存，
+缓存的总大小由 `image_preprocess_cache_size` 配置。
+"""
+
+from io import BytesIO
+from typing import Optional
+from collections import OrderedDict
+from dataclasses import field, dataclass
+
+import anyio
+from nonebot import logger
+
+from .config import plugin_config
+from .utils import SupportedAdapters
+from .utils.image import probe_image
+from .utils.instrumentation import span
+
+# 逐步降低 JPEG/WEBP 质量时使用的质量
+QUALITY_STEPS = (85, 70, 55, 40)
+# 缩小尺寸时的最小边长
+MIN_SIDE = 64
+
+
+@dataclass(frozen=True)
+class ImageLimit:
+    """平台对图片的限制
+
+    Args:
+        max_bytes (int, optional): 图片数据的最大字节数
+        max_side (int, optional): 图片宽高的最大像素数
+        formats (frozenset[str], optional): 支持的 Pillow 格式名，如 "PNG"、"JPEG"
+        fallback_format (str): 格式不受支持时转换成的格式
+    """
+
+    max_bytes: Optional[int] = None
+    max_side: Optional[int] = None
+    formats: Optional[frozenset[str]] = None
+    fallback_format: str = "PNG"
+    # 保存为这些格式时，可以通过降低质量减小体积
+    lossy_formats: frozenset[str] = field(
+        default=frozenset({"JPEG", "WEBP"}), repr=False
+    )
+
+
+image_limits: dict[SupportedAdapters, ImageLimit] = {}
+
+
+def register_image_limit(adapter: SupportedAdapters, limit: ImageLimit) -> None:
+    """注册（或覆盖）适配器的图片限制"""
+    image_limits[adapter] = limit
+
+
+MB = 1024 * 1024
+
+register_image_limit(
+    SupportedAdapters.telegram,
+    ImageLimit(
+        max_bytes=10 * MB,
+        # 宽高之和不能超过 10000
+        max_side=5000,
+        formats=frozenset({"JPEG", "PNG", "WEBP", "GIF"}),
+        fallback_format="JPEG",
+    ),
+)
+register_image_limit(
+    SupportedAdapters.discord,
+    ImageLimit(max_bytes=10 * MB),
+)
+register_image_limit(
+    SupportedAdapters.feishu,
+    ImageLimit(
+        max_bytes=10 * MB,
+        formats=frozenset({"JPEG", "PNG", "WEBP", "GIF", "TIFF", "BMP", "ICO"}),
+    ),
+)
+
+enabled = False
+CacheKey = tuple[str, ImageLimit]
+
+_cache: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+_cache_bytes = 0
+
+
+def _cache_set(key: CacheKey, result: bytes) -> None:
+    global _cache_bytes
+
+    if len(result) > plugin_config.image_preprocess_cache_size:
+        return
+    if (old := _cache.pop(key, None)) is not None:
+        _cache_bytes -= len(old)
+    _cache[key] = result
+    _cache_bytes += len(result)
+    while _cache_bytes > plugin_config.image_preprocess_cache_size:
+        _, evicted = _cache.popitem(last=False)
+        _cache_bytes -= len(evicted)
+
+
+def clear_cache() -> None:
+    """清空图片预处理结果的缓存"""
+    global _cache_bytes
+
+    _cache.clear()
+    _cache_bytes = 0
+
+
+def _save(image, format: str, quality: Optional[int] = None) -> bytes:
+    if format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    params = {"quality": quality} if quality is not None else {}
+    image.save(buffer, format=format, **params)
+    return buffer.getvalue()
+
+
+def _process(data: bytes, limit: ImageLimit) -> bytes:
+    from PIL import Image as PILImage
+
+    image = PILImage.open(BytesIO(data))
+    source_format = image.format or ""
+    unsupported = limit.formats is not None and source_format not in limit.formats
+    oversized = limit.max_side is not None and max(image.size) > limit.max_side
+    too_large = limit.max_bytes is not None and len(data) > limit.max_bytes
+    if not (unsupported or oversized or too_large):
+        return data
+    if getattr(image, "is_animated", False) and not unsupported:
+        # 处理动图会丢失动画，保留原图交给平台处理
+        return data
+
+    format = limit.fallback_format if unsupported else source_format
+    image.load()
+    if oversized:
+        assert limit.max_side is not None
+        image.thumbnail((limit.max_side, limit.max_side))
+
+    result = _save(image, format)
+    if limit.max_bytes is None or len(result) <= limit.max_bytes:
+        return result
+
+    if format in limit.lossy_formats:
+        for quality in QUALITY_STEPS:
+            result = _save(image, format, quality)
+            if len(result) <= limit.max_bytes:
+                return result
+
+    # 降低质量仍然过大时，逐步缩小尺寸
+    quality = QUALITY_STEPS[-1] if format in limit.lossy_formats else None
+    while len(result) > limit.max_bytes and min(image.size) > MIN_SIDE:
+        width, height = image.size
+        image = image.resize((int(width * 0.75), int(height * 0.75)))
+        result = _save(image, format, quality)
+    return result
+
+
+async def preprocess_image(
+    data: bytes, adapter: SupportedAdapters, sha256: Optional[str] = None
+) -> bytes:
+    """按适配器的限制处理图片，未启用预处理或适配器没有限制时原样返回
+
+    处理失败（如无法识别的图片）时记录日志并返回原图
+
+    Args:
+        sha256 (str, optional): 图片数据的 SHA-256，已知时（如 `Image.metadata()`）
+            传入以免重复计算
+    """
+    if not enabled or (limit := image_limits.get(adapter)) is None:
+        return data
+
+    if sha256 is None:
+        sha256 = (await probe_image(data)).sha256
+    key = (sha256, limit)
+    if (result := _cache.get(key)) is not None:
+        _cache.move_to_end(key)
+        return result
+
+    try:
+        with span("image_preprocess", adapter=adapter):
+            result = await anyio.to_thread.run_sync(_process, data, limit)
+    except Exception as e:
+        logger.warning(f"preprocess image for {adapter} failed: {e!r}")
+        return data
+
+    # 无需处理的图片不缓存，避免缓存中保留原图
+    if result is not data:
+        _cache_set(key, result)
+    return result
+
+
+def enable_image_preprocess() -> None:
+    """启用图片预处理
+
+    启用后，发送需要上传图片数据的消息时，会按平台的限制转换图片格式、缩小尺寸和压缩体积，
+    可以通过 `register_image_limit` 修改各适配器的限制。需要安装 Pillow
+
+    ```python
+    # __init__.py(插件入口)
+    require("nonebot_plugin_saa")
+    from nonebot_plugin_saa import enable_image_preprocess
+    enable_image_preprocess()
+    ```
+    """
+    global enabled
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "image preprocess requires Pillow, please install it with "
+            "`pip install pillow`"
+        ) from e
+    enabled = True
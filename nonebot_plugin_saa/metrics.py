@@ -0,0 +1,174 @@
+"""汇总发送流程埋点的指标，并可导出为 Prometheus 文本格式"""
+
+from typing import Optional
+from bisect import bisect_left
+from dataclasses import field, dataclass
+
+from nonebot import logger, get_driver
+from nonebot.drivers import URL, Request, Response, ASGIMixin, HTTPServerSetup
+
+from .utils.instrumentation import Span, register_span_hook
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelSet = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...]
+    counts: list[int] = field(init=False)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        # 最后一个位置对应 +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsAggregator:
+    """在内存中汇总 Span 的计数、耗时分布和上传字节数
+
+    Args:
+        buckets (tuple[float, ...], optional): 耗时直方图的分桶上界（秒）
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counters: dict[LabelSet, int] = {}
+        self.histograms: dict[LabelSet, Histogram] = {}
+        self.bytes: dict[LabelSet, int] = {}
+
+    def __call__(self, span: Span) -> None:
+        labels = tuple(span.labels.items())
+        counter_labels = (*labels, ("outcome", span.outcome))
+        self.counters[counter_labels] = self.counters.get(counter_labels, 0) + 1
+        if (histogram := self.histograms.get(labels)) is None:
+            histogram = self.histograms[labels] = Histogram(self.buckets)
+        histogram.observe(span.duration)
+        if span.bytes is not None:
+            self.bytes[labels] = self.bytes.get(labels, 0) + span.bytes
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.histograms.clear()
+        self.bytes.clear()
+
+    def render_prometheus(self) -> str:
+        """以 Prometheus 文本格式导出指标"""
+        lines = [
+            "# HELP saa_spans_total Number of finished SAA send spans.",
+            "# TYPE saa_spans_total counter",
+        ]
+        for labels, value in self.counters.items():
+            lines.append(f"saa_spans_total{_format_labels(labels)} {value}")
+
+        lines += [
+            "# HELP saa_span_duration_seconds Duration of SAA send spans.",
+            "# TYPE saa_span_duration_seconds histogram",
+        ]
+        for labels, histogram in self.histograms.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), histogram.counts):
+                cumulative += count
+                bucket_labels = _format_labels((*labels, ("le", str(bound))))
+                lines.append(
+                    f"saa_span_duration_seconds_bucket{bucket_labels} {cumulative}"
+                )
+            lines.append(
+                f"saa_span_duration_seconds_sum{_format_labels(labels)} {histogram.sum}"
+            )
+            lines.append(
+                f"saa_span_duration_seconds_count{_format_labels(labels)} "
+                f"{histogram.count}"
+            )
+
+        lines += [
+            "# HELP saa_uploaded_bytes_total Bytes of in-memory data sent by SAA.",
+            "# TYPE saa_uploaded_bytes_total counter",
+        ]
+        for labels, value in self.bytes.items():
+            lines.append(f"saa_uploaded_bytes_total{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelSet) -> str:
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels)
+        + "}"
+    )
+
+
+metrics: Optional[MetricsAggregator] = None
+# 已经注册的 Prometheus 路由路径，避免重复注册
+_prometheus_path: Optional[str] = None
+
+
+def enable_metrics(prometheus_path: Optional[str] = None) -> MetricsAggregator:
+    """启用发送流程的指标统计
+
+    统计消息段构建、消息发送、合并发送和自动选择 Bot 的次数、耗时和结果，
+    传入 prometheus_path 时会在 NoneBot 的 HTTP 服务器上以该路径
+    提供 Prometheus 文本格式的指标
+
+    ```python
+    # __init__.py(插件入口)
+    require("nonebot_plugin_saa")
+    from nonebot_plugin_saa import enable_metrics
+    enable_metrics(prometheus_path="/saa/metrics")
+    ```
+    """
+    global metrics, _prometheus_path
+
+    if metrics is None:
+        metrics = MetricsAggregator()
+        register_span_hook(metrics)
+
+    if prometheus_path is None:
+        return metrics
+    if _prometheus_path is not None:
+        # 路由只注册一次
+        if prometheus_path != _prometheus_path:
+            logger.warning(
+                f"prometheus exporter is already served at {_prometheus_path}, "
+                f"ignore {prometheus_path}"
+            )
+        return metrics
+
+    driver = get_driver()
+    if not isinstance(driver, ASGIMixin):
+        logger.warning(
+            f"driver {driver.type} does not support http server, "
+            "prometheus exporter is disabled"
+        )
+        return metrics
+
+    aggregator = metrics
+
+    async def handle_metrics(request: Request) -> Response:
+        return Response(
+            200,
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+            content=aggregator.render_prometheus(),
+        )
+
+    driver.setup_http_server(
+        HTTPServerSetup(
+            path=URL(prometheus_path),
+            method="GET",
+            name="saa_metrics",
+            handle_func=handle_metrics,
+        )
+    )
+    _prometheus_path = prometheus_path
+    return metrics
@@ -0,0 +1,156 @@
+"""记录发送过程中每一步的耗时，导出为 Chrome trace event 格式"""
+
+import os
+import json
+import time
+import asyncio
+from pathlib import Path
+from contextvars import ContextVar
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Union, Optional
+
+from nonebot.adapters import Bot
+
+from .utils.instrumentation import (
+    Span,
+    span_hooks,
+    register_span_hook,
+    unregister_span_hook,
+)
+
+_current_profiler: ContextVar[Optional["Profiler"]] = ContextVar(
+    "saa_profiler", default=None
+)
+_active_profiles = 0
+_api_hooks_registered = False
+_api_call_starts: dict[int, float] = {}
+
+
+class Profiler:
+    """保存一次 profile 期间记录的事件
+
+    事件按 asyncio Task 分配 tid，并发构建的消息段会显示在不同的行上
+    """
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.events: list[dict[str, Any]] = []
+        self._tids: dict[int, int] = {}
+
+    def _tid(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return self._tids.setdefault(id(task), len(self._tids) + 1)
+
+    def add(
+        self, name: str, category: str, start: float, duration: float, **args: Any
+    ) -> None:
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": os.getpid(),
+                "tid": self._tid(),
+                "args": {k: v for k, v in args.items() if v is not None},
+            }
+        )
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: Union[str, Path]) -> None:
+        """将记录的事件写入文件，可以在 chrome://tracing 或 Perfetto 中打开"""
+        Path(path).write_text(json.dumps(self.to_chrome_trace(), default=str))
+
+
+def _record_span(span: Span) -> None:
+    if profiler := _current_profiler.get():
+        profiler.add(
+            span.name,
+            "saa",
+            span.start,
+            span.duration,
+            adapter=span.adapter,
+            platform=span.platform,
+            segment_type=span.segment_type,
+            bytes=span.bytes,
+            outcome=span.outcome,
+        )
+
+
+async def _on_calling_api(bot: Bot, api: str, data: dict[str, Any]) -> None:
+    if _current_profiler.get():
+        _api_call_starts[id(data)] = time.perf_counter()
+
+
+async def _on_called_api(
+    bot: Bot,
+    exception: Optional[Exception],
+    api: str,
+    data: dict[str, Any],
+    result: Any,
+) -> None:
+    start = _api_call_starts.pop(id(data), None)
+    if start is not None and (profiler := _current_profiler.get()):
+        profiler.add(
+            api,
+            "api",
+            start,
+            time.perf_counter() - start,
+            adapter=bot.adapter.get_name(),
+            outcome="error" if exception else "ok",
+        )
+
+
+def _register_api_hooks() -> None:
+    global _api_hooks_registered
+
+    if _api_hooks_registered:
+        return
+    Bot.on_calling_api(_on_calling_api)
+    Bot.on_called_api(_on_called_api)
+    _api_hooks_registered = True
+
+
+@contextmanager
+def profile(path: Union[str, Path, None] = None) -> Iterator[Profiler]:
+    """记录代码块中发送消息的每一步耗时
+
+    包括消息段构建、图片下载、QQ 频道私聊 guild_id 获取、适配器发送，
+    以及期间 Bot 的每次 API 调用（包括上传文件）。
+    只记录当前上下文及其创建的 Task 中的事件，不影响同时进行的其他发送。
+
+    ```python
+    from nonebot_plugin_saa.profiling import profile
+
+    with profile("trace.json"):
+        await msg.send_to(target, bot)
+    ```
+
+    Args:
+        path (str | Path, optional): 退出时将 Chrome trace event JSON 写入该文件
+    """
+    global _active_profiles
+
+    _register_api_hooks()
+    if _active_profiles == 0:
+        register_span_hook(_record_span)
+    _active_profiles += 1
+
+    profiler = Profiler()
+    token = _current_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _current_profiler.reset(token)
+        _active_profiles -= 1
+        if _active_profiles == 0 and _record_span in span_hooks:
+            unregister_span_hook(_record_span)
+        if path is not None:
+            profiler.dump(path)
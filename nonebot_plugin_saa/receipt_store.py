@@ -0,0 +1,277 @@
+"""记录发送消息的回执，可通过发送目标或 MessageId 查询"""
+
+import time
+from pathlib import Path
+from itertools import count
+from typing import Union, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import field, dataclass
+
+from nonebot import logger
+
+from .utils.sqlite import SqliteStoreMixin, dump_json
+from .registries import Receipt, MessageId, PlatformTarget, AggregatedReceipt
+
+# 每记录多少条回执清理一次过期回执
+PRUNE_INTERVAL = 100
+
+
+def _message_id_keys(receipt: Receipt) -> list[str]:
+    """提取回执对应的所有消息的 MessageId 作为索引"""
+    if isinstance(receipt, AggregatedReceipt):
+        return [key for sub in receipt.receipts for key in _message_id_keys(sub)]
+    try:
+        return [dump_json(message_id) for message_id in receipt.extract_message_ids()]
+    except Exception:
+        logger.debug(f"{receipt!r} extract message id failed, skip indexing")
+        return []
+
+
+@dataclass
+class ReceiptRecord:
+    target: PlatformTarget
+    receipt: Receipt
+    created_at: float = field(default_factory=time.time)
+
+
+class ReceiptStore(ABC):
+    """回执存储
+
+    Args:
+        ttl (float, optional): 回执的保存时间（秒），为 None 时不过期
+    """
+
+    def __init__(self, ttl: Optional[float] = 86400) -> None:
+        self.ttl = ttl
+        self._add_count = 0
+
+    def _expire_before(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    async def add(self, target: PlatformTarget, receipt: Receipt) -> None:
+        """记录一条发送到 target 的回执"""
+        await self._add(ReceiptRecord(target, receipt))
+        self._add_count += 1
+        if self._add_count % PRUNE_INTERVAL == 0:
+            await self.prune()
+
+    @abstractmethod
+    async def _add(self, record: ReceiptRecord) -> None: ...
+
+    @abstractmethod
+    async def get(self, message_id: MessageId) -> Optional[Receipt]:
+        """通过 MessageId 查询回执，MessageId 可以来自 `get_message_id`"""
+        ...
+
+    @abstractmethod
+    async def last(self, target: PlatformTarget, n: int = 1) -> list[Receipt]:
+        """查询最近发送到 target 的 n 条回执，按发送时间从新到旧排列"""
+        ...
+
+    @abstractmethod
+    async def prune(self) -> None:
+        """清理过期的回执"""
+        ...
+
+
+class MemoryReceiptStore(ReceiptStore):
+    """保存在内存中的回执存储，超出 max_size 时淘汰最久未使用的回执
+
+    Args:
+        max_size (int, optional): 最多保存的回执数量
+        ttl (float, optional): 回执的保存时间（秒），为 None 时不过期
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = 86400) -> None:
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._ids = count()
+        self._records: OrderedDict[int, ReceiptRecord] = OrderedDict()
+        self._by_message_id: dict[str, int] = {}
+        self._by_target: dict[PlatformTarget, dict[int, None]] = {}
+
+    def _remove(self, record_id: int) -> None:
+        record = self._records.pop(record_id)
+        for key in _message_id_keys(record.receipt):
+            if self._by_message_id.get(key) == record_id:
+                del self._by_message_id[key]
+        target_ids = self._by_target[record.target]
+        del target_ids[record_id]
+        if not target_ids:
+            del self._by_target[record.target]
+
+    async def _add(self, record: ReceiptRecord) -> None:
+        record_id = next(self._ids)
+        self._records[record_id] = record
+        for key in _message_id_keys(record.receipt):
+            self._by_message_id[key] = record_id
+        self._by_target.setdefault(record.target, {})[record_id] = None
+        while len(self._records) > self.max_size:
+            self._remove(next(iter(self._records)))
+
+    async def get(self, message_id: MessageId) -> Optional[Receipt]:
+        record_id = self._by_message_id.get(dump_json(message_id))
+        if record_id is None:
+            return None
+        record = self._records[record_id]
+        if record.created_at < self._expire_before():
+            self._remove(record_id)
+            return None
+        self._records.move_to_end(record_id)
+        return record.receipt
+
+    async def last(self, target: PlatformTarget, n: int = 1) -> list[Receipt]:
+        expire_before = self._expire_before()
+        receipts = []
+        for record_id in reversed(self._by_target.get(target, {})):
+            if len(receipts) >= n:
+                break
+            record = self._records[record_id]
+            if record.created_at >= expire_before:
+                receipts.append(record.receipt)
+        return receipts
+
+    async def prune(self) -> None:
+        expire_before = self._expire_before()
+        expired = [
+            record_id
+            for record_id, record in self._records.items()
+            if record.created_at < expire_before
+        ]
+        for record_id in expired:
+            self._remove(record_id)
+
+
+class SqliteReceiptStore(SqliteStoreMixin, ReceiptStore):
+    """保存在 sqlite 数据库中的回执存储，数据库操作在线程池中执行
+
+    Args:
+        path (str | Path): 数据库文件路径
+        ttl (float, optional): 回执的保存时间（秒），为 None 时不过期
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: Optional[float] = 86400) -> None:
+        super().__init__(ttl)
+        self._connect(
+            path,
+            """
+            PRAGMA foreign_keys = ON;
+            CREATE TABLE IF NOT EXISTS receipts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                target TEXT NOT NULL,
+                receipt TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS receipts_target
+                ON receipts (target, id);
+            CREATE INDEX IF NOT EXISTS receipts_created_at
+                ON receipts (created_at);
+            CREATE TABLE IF NOT EXISTS receipt_message_ids (
+                message_id TEXT PRIMARY KEY,
+                receipt_id INTEGER NOT NULL
+                    REFERENCES receipts (id) ON DELETE CASCADE
+            );
+            """,
+        )
+
+    def _add_sync(self, record: ReceiptRecord) -> None:
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO receipts (target, receipt, created_at) VALUES (?, ?, ?)",
+                (
+                    dump_json(record.target),
+                    dump_json(record.receipt),
+                    record.created_at,
+                ),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO receipt_message_ids VALUES (?, ?)",
+                [(key, cursor.lastrowid) for key in _message_id_keys(record.receipt)],
+            )
+
+    async def _add(self, record: ReceiptRecord) -> None:
+        await self._run(self._add_sync, record)
+
+    def _get_sync(self, message_id: str, expire_before: float) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT receipt FROM receipts JOIN receipt_message_ids"
+            " ON receipts.id = receipt_message_ids.receipt_id"
+            " WHERE message_id = ? AND created_at >= ?",
+            (message_id, expire_before),
+        ).fetchone()
+        return row[0] if row else None
+
+    async def get(self, message_id: MessageId) -> Optional[Receipt]:
+        raw = await self._run(
+            self._get_sync, dump_json(message_id), self._expire_before()
+        )
+        return Receipt.deserialize(raw) if raw is not None else None
+
+    def _last_sync(self, target: str, n: int, expire_before: float) -> list[str]:
+        rows = self._conn.execute(
+            "SELECT receipt FROM receipts WHERE target = ? AND created_at >= ?"
+            " ORDER BY id DESC LIMIT ?",
+            (target, expire_before, n),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    async def last(self, target: PlatformTarget, n: int = 1) -> list[Receipt]:
+        raws = await self._run(
+            self._last_sync, dump_json(target), n, self._expire_before()
+        )
+        return [Receipt.deserialize(raw) for raw in raws]
+
+    def _prune_sync(self, expire_before: float) -> None:
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM receipts WHERE created_at < ?", (expire_before,)
+            )
+
+    async def prune(self) -> None:
+        await self._run(self._prune_sync, self._expire_before())
+
+
+receipt_store: Optional[ReceiptStore] = None
+
+
+def enable_receipt_store(store: Optional[ReceiptStore] = None) -> ReceiptStore:
+    """启用回执存储
+
+    启用后，每次发送消息的回执都会被记录，可以通过发送目标或 MessageId 查询，
+    不传入 store 时使用 MemoryReceiptStore
+
+    ```python
+    # __init__.py(插件入口)
+    require("nonebot_plugin_saa")
+    from nonebot_plugin_saa import enable_receipt_store
+    enable_receipt_store()
+    ```
+    """
+    global receipt_store
+
+    receipt_store = store or MemoryReceiptStore()
+    return receipt_store
+
+
+def get_receipt_store() -> ReceiptStore:
+    """获取已启用的回执存储"""
+    if receipt_store is None:
+        raise RuntimeError(
+            "\n回执存储功能未启用\n"
+            "请在 插件入口(__init__.py) 调用:\n"
+            "    require('nonebot_plugin_saa')\n"
+            "    from nonebot_plugin_saa import enable_receipt_store\n"
+            "    enable_receipt_store()\n"
+        )
+    return receipt_store
+
+
+async def record_receipt(target: PlatformTarget, receipt: Receipt) -> None:
+    """回执存储启用时记录回执，记录失败不影响发送"""
+    if receipt_store is None:
+        return
+    try:
+        await receipt_store.add(target, receipt)
+    except Exception:
+        logger.exception(f"record receipt {receipt!r} failed")
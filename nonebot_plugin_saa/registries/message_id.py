@@ -1,11 +1,14 @@
+import json
 from abc import ABC
-from typing import Callable, Optional, Annotated
+from typing_extensions import Self
+from typing import Any, Callable, Optional, Annotated
 
 from nonebot.adapters import Event
 from nonebot.params import Depends
 
 from .meta import SerializationMeta
-from ..utils import SupportedAdapters
+from ..utils import SupportedAdapters, supported_adapter_names
+from ..utils.helpers import ensure_adapter_loaded, ensure_type_adapter_loaded
 
 
 class MessageId(SerializationMeta, ABC):
@@ -13,6 +16,14 @@ class MessageId(SerializationMeta, ABC):
 
     adapter_name: SupportedAdapters
 
+    @classmethod
+    def deserialize(cls, source: Any) -> Self:
+        if isinstance(source, str):
+            source = json.loads(source)
+        if source.get("adapter_name") in supported_adapter_names:
+            ensure_adapter_loaded(SupportedAdapters(source["adapter_name"]))
+        return super().deserialize(source)
+
 
 MessageIdGetter = Callable[[Event], MessageId]
 
@@ -28,6 +39,7 @@ def register_message_id_getter(event_type: type[Event]):
 
 
 def get_message_id(event: Event) -> Optional[MessageId]:
+    ensure_type_adapter_loaded(event.__class__)
     for event_type in event.__class__.mro():
         if event_type in _get_message_id_dict:
             if not issubclass(event_type, Event):
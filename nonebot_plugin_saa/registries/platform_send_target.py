@@ -6,7 +6,6 @@ from typing import (
     Union,
     Literal,
     Callable,
-    ClassVar,
     Optional,
     Annotated,
     cast,
@@ -18,7 +17,13 @@ from nonebot.adapters import Bot, Event
 from nonebot.compat import PYDANTIC_V2, ConfigDict
 
 from .meta import SerializationMeta
-from ..utils import SupportedAdapters, SupportedPlatform, extract_adapter_type
+from ..utils.helpers import ensure_type_adapter_loaded
+from ..utils import (
+    SupportedAdapters,
+    SupportedPlatform,
+    TargetNotSupported,
+    extract_adapter_type,
+)
 
 if TYPE_CHECKING:
     from .receipt import Receipt
@@ -44,9 +49,7 @@ class PlatformTarget(SerializationMeta):
     def arg_dict(self, bot: Bot):
         adapter_type = extract_adapter_type(bot)
         if (self.platform_type, adapter_type) not in convert_to_arg_map.keys():
-            raise RuntimeError(
-                f"PlatformTarget {self.platform_type} not support {adapter_type}",
-            )
+            raise TargetNotSupported(adapter_type, self.platform_type)
         return convert_to_arg_map[(self.platform_type, adapter_type)](self)
 
     @classmethod
@@ -321,16 +324,31 @@ AllSupportedPlatformTarget = Union[
 
 ConvertToArg = Callable[[PlatformTarget], dict[str, Any]]
 convert_to_arg_map: dict[tuple[SupportedPlatform, SupportedAdapters], ConvertToArg] = {}
+# 各适配器能够发送到的平台，注册 convert_to_arg 或 register_target_platforms 时登记
+platform_capabilities: dict[SupportedAdapters, set[SupportedPlatform]] = {}
 
 
 def register_convert_to_arg(adapter: SupportedAdapters, platform: SupportedPlatform):
     def wrapper(func: ConvertToArg):
         convert_to_arg_map[(platform, adapter)] = func
+        platform_capabilities.setdefault(adapter, set()).add(platform)
         return func
 
     return wrapper
 
 
+def register_target_platforms(
+    adapter: SupportedAdapters, *platforms: SupportedPlatform
+):
+    """登记不通过 convert_to_arg 发送的适配器能够发送到的平台"""
+    platform_capabilities.setdefault(adapter, set()).update(platforms)
+
+
+def supports_platform(adapter: SupportedAdapters, platform: SupportedPlatform) -> bool:
+    """适配器是否能够发送到该平台的目标"""
+    return adapter in sender_map and platform in platform_capabilities.get(adapter, ())
+
+
 Extractor = Callable[[Event], PlatformTarget]
 ExtractorWithBotSpecifier = Callable[[Event, Bot], PlatformTarget]
 extractor_map: dict[type[Event], Union[Extractor, ExtractorWithBotSpecifier]] = {}
@@ -346,6 +364,7 @@ def register_target_extractor(event: type[Event]):
 
 def extract_target(event: Event, bot: Optional[Bot] = None) -> PlatformTarget:
     "从事件中提取出发送目标，如果不能提取就抛出错误"
+    ensure_type_adapter_loaded(event.__class__)
     for event_type in event.__class__.mro():
         if event_type in extractor_map:
             if not issubclass(event_type, Event):
@@ -387,38 +406,3 @@ def register_sender(adapter: SupportedAdapters):
 
 
 SaaTarget = Annotated[PlatformTarget, Depends(get_target)]
-
-QQGuild_DMS = Callable[[TargetQQGuildDirect, Bot], Awaitable[int]]
-qqguild_dms_map: dict[SupportedAdapters, QQGuild_DMS] = {}
-
-
-def register_qqguild_dms(adapter: SupportedAdapters):
-    def wrapper(func: QQGuild_DMS):
-        qqguild_dms_map[adapter] = func
-        return func
-
-    return wrapper
-
-
-class QQGuildDMSManager:
-    _cache: ClassVar[dict[TargetQQGuildDirect, int]] = {}
-
-    @classmethod
-    def get_guild_id(cls, target: TargetQQGuildDirect) -> int:
-        """从缓存中获取私聊所需 guild_id"""
-        return cls._cache[target]
-
-    @classmethod
-    async def aget_guild_id(cls, target: TargetQQGuildDirect, bot: Bot) -> int:
-        """获取私聊所需 guild_id"""
-        if target in cls._cache:
-            return cls._cache[target]
-
-        adapter = extract_adapter_type(bot)
-        if not (qqguild_dms := qqguild_dms_map.get(adapter)):
-            raise RuntimeError(
-                f"qqguild dms method for {adapter} not registered",
-            )  # pragma: no cover
-        guild_id = await qqguild_dms(target, bot)  # type: ignore
-        cls._cache[target] = guild_id
-        return guild_id
@@ -0,0 +1,189 @@
+"""QQ 频道私聊所需 guild_id 的获取与缓存"""
+
+import time
+import asyncio
+from pathlib import Path
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable
+from typing import Union, Callable, ClassVar, Optional
+
+from nonebot import logger
+from nonebot.adapters import Bot
+
+from ..config import plugin_config
+from ..utils.instrumentation import span
+from .platform_send_target import TargetQQGuildDirect
+from ..utils.sqlite import SqliteStoreMixin, dump_json
+from ..utils import SupportedAdapters, retrieve_exception, extract_adapter_type
+
+QQGuild_DMS = Callable[[TargetQQGuildDirect, Bot], Awaitable[int]]
+qqguild_dms_map: dict[SupportedAdapters, QQGuild_DMS] = {}
+
+
+def register_qqguild_dms(adapter: SupportedAdapters):
+    def wrapper(func: QQGuild_DMS):
+        qqguild_dms_map[adapter] = func
+        return func
+
+    return wrapper
+
+
+class QQGuildDMSBackend(ABC):
+    """QQ 频道私聊 guild_id 的持久化存储，用于在重启后复用已创建的私聊会话"""
+
+    @abstractmethod
+    async def get(self, target: TargetQQGuildDirect) -> Optional[tuple[int, float]]:
+        """返回 (guild_id, 写入时间)，不存在时返回 None"""
+        ...
+
+    @abstractmethod
+    async def set(self, target: TargetQQGuildDirect, guild_id: int) -> None: ...
+
+
+class SqliteQQGuildDMSBackend(SqliteStoreMixin, QQGuildDMSBackend):
+    """保存在 sqlite 数据库中的 guild_id，数据库操作在线程池中执行
+
+    Args:
+        path (str | Path): 数据库文件路径
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self._connect(
+            path,
+            """
+            CREATE TABLE IF NOT EXISTS qqguild_dms (
+                target TEXT PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """,
+        )
+
+    def _get_sync(self, key: str) -> Optional[tuple[int, float]]:
+        row = self._conn.execute(
+            "SELECT guild_id, created_at FROM qqguild_dms WHERE target = ?", (key,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    async def get(self, target: TargetQQGuildDirect) -> Optional[tuple[int, float]]:
+        return await self._run(self._get_sync, dump_json(target))
+
+    def _set_sync(self, key: str, guild_id: int, created_at: float) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO qqguild_dms VALUES (?, ?, ?)",
+                (key, guild_id, created_at),
+            )
+
+    async def set(self, target: TargetQQGuildDirect, guild_id: int) -> None:
+        await self._run(self._set_sync, dump_json(target), guild_id, time.time())
+
+
+class QQGuildDMSManager:
+    """缓存私聊所需的 guild_id
+
+    - 缓存按最近使用淘汰，数量和有效期由 `qqguild_dms_cache_size`、
+      `qqguild_dms_cache_ttl` 配置
+    - 同一目标的并发获取只会调用一次适配器接口
+    - 设置持久化存储后，缓存未命中时会先查询存储
+    """
+
+    _cache: ClassVar["OrderedDict[TargetQQGuildDirect, tuple[int, float]]"] = (
+        OrderedDict()
+    )
+    _inflight: ClassVar[dict[TargetQQGuildDirect, "asyncio.Future[int]"]] = {}
+    _backend: ClassVar[Optional[QQGuildDMSBackend]] = None
+
+    @classmethod
+    def set_backend(cls, backend: Optional[QQGuildDMSBackend]) -> None:
+        """设置 guild_id 的持久化存储，传入 None 时取消"""
+        cls._backend = backend
+
+    @classmethod
+    def _get_cached(cls, target: TargetQQGuildDirect) -> Optional[int]:
+        if (cached := cls._cache.get(target)) is None:
+            return None
+        guild_id, created_at = cached
+        if time.time() - created_at > plugin_config.qqguild_dms_cache_ttl:
+            del cls._cache[target]
+            return None
+        cls._cache.move_to_end(target)
+        return guild_id
+
+    @classmethod
+    def _set_cached(
+        cls, target: TargetQQGuildDirect, guild_id: int, created_at: float
+    ) -> None:
+        cls._cache[target] = (guild_id, created_at)
+        cls._cache.move_to_end(target)
+        while len(cls._cache) > plugin_config.qqguild_dms_cache_size:
+            cls._cache.popitem(last=False)
+
+    @classmethod
+    def get_guild_id(cls, target: TargetQQGuildDirect) -> int:
+        """从缓存中获取私聊所需 guild_id"""
+        if (guild_id := cls._get_cached(target)) is None:
+            raise KeyError(target)
+        return guild_id
+
+    @classmethod
+    async def aget_guild_id(cls, target: TargetQQGuildDirect, bot: Bot) -> int:
+        """获取私聊所需 guild_id"""
+        while True:
+            if (guild_id := cls._get_cached(target)) is not None:
+                return guild_id
+            if (fut := cls._inflight.get(target)) is None:
+                break
+            # 只有当前协程被取消时才会抛出 CancelledError
+            await asyncio.wait([fut])
+            # 正在获取的协程被取消时，由等待者之一重新获取
+            if not fut.cancelled():
+                return fut.result()
+
+        fut = asyncio.get_running_loop().create_future()
+        fut.add_done_callback(retrieve_exception)
+        cls._inflight[target] = fut
+        try:
+            guild_id = await cls._fetch_guild_id(target, bot)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(guild_id)
+        finally:
+            del cls._inflight[target]
+        return guild_id
+
+    @classmethod
+    async def _fetch_guild_id(cls, target: TargetQQGuildDirect, bot: Bot) -> int:
+        if cls._backend is not None:
+            try:
+                stored = await cls._backend.get(target)
+            except Exception as e:
+                logger.warning(f"get qqguild dms from backend failed: {e!r}")
+                stored = None
+            if stored is not None:
+                guild_id, created_at = stored
+                if time.time() - created_at <= plugin_config.qqguild_dms_cache_ttl:
+                    cls._set_cached(target, guild_id, created_at)
+                    return guild_id
+
+        adapter = extract_adapter_type(bot)
+        if not (qqguild_dms := qqguild_dms_map.get(adapter)):
+            raise RuntimeError(
+                f"qqguild dms method for {adapter} not registered",
+            )  # pragma: no cover
+        with span("qqguild_dms", adapter=adapter):
+            guild_id = await qqguild_dms(target, bot)  # type: ignore
+        cls._set_cached(target, guild_id, time.time())
+
+        if cls._backend is not None:
+            try:
+                await cls._backend.set(target, guild_id)
+            except Exception as e:
+                logger.warning(f"save qqguild dms to backend failed: {e!r}")
+        return guild_id
@@ -1,12 +1,25 @@
-from typing import Any
+import json
+import asyncio
 from abc import abstractmethod
+from dataclasses import dataclass
+from typing_extensions import Self
+from collections.abc import Iterable, Awaitable
+from typing import Any, Literal, Callable, ClassVar, Optional
 
 from nonebot import get_bot
 from nonebot.adapters import Bot
+from nonebot.compat import PYDANTIC_V2, type_validate_python
 
 from .message_id import MessageId
-from .meta import SerializationMeta
-from ..utils import SupportedAdapters
+from ..config import plugin_config
+from .meta import Level, SerializationMeta
+from ..utils.helpers import ensure_adapter_loaded
+from ..utils import SupportedAdapters, supported_adapter_names
+
+if PYDANTIC_V2:
+    from pydantic import SerializeAsAny, field_validator
+else:
+    from pydantic import validator
 
 
 class Receipt(SerializationMeta):
@@ -27,3 +40,198 @@ class Receipt(SerializationMeta):
     def extract_message_id(self) -> MessageId:
         """从 Receipt 中提取 MessageId"""
         raise NotImplementedError
+
+    def extract_message_ids(self) -> list[MessageId]:
+        """从 Receipt 中提取所有消息的 MessageId"""
+        return [self.extract_message_id()]
+
+    @classmethod
+    def deserialize(cls, source: Any) -> Self:
+        if isinstance(source, str):
+            source = json.loads(source)
+        if source.get("aggregated"):
+            return type_validate_python(AggregatedReceipt, source)  # type: ignore
+        if source.get("adapter_name") in supported_adapter_names:
+            ensure_adapter_loaded(SupportedAdapters(source["adapter_name"]))
+        return super().deserialize(source)
+
+
+def _deserialize_receipts(receipts: Any) -> Any:
+    if not isinstance(receipts, list):
+        return receipts
+    return [
+        receipt if isinstance(receipt, Receipt) else Receipt.deserialize(receipt)
+        for receipt in receipts
+    ]
+
+
+class AggregatedReceipt(Receipt):
+    """合并发送（AggregatedMessageFactory）的回执
+
+    适配器原生支持合并转发时只包含合并转发消息的回执，
+    否则包含逐条发送的每条消息的回执
+    """
+
+    # 合并回执不按 adapter_name 注册，由 aggregated 字段区分
+    _level: ClassVar[Level] = Level.Normal
+
+    aggregated: Literal[True] = True
+
+    if PYDANTIC_V2:
+        receipts: list[SerializeAsAny[Receipt]]
+
+        @field_validator("receipts", mode="before")
+        @classmethod
+        def validate_receipts(cls, receipts: Any) -> Any:
+            return _deserialize_receipts(receipts)
+
+    else:
+        receipts: list[Receipt]
+
+        @validator("receipts", pre=True)
+        def validate_receipts(cls, receipts: Any) -> Any:
+            return _deserialize_receipts(receipts)
+
+    async def revoke(self):
+        return [await receipt.revoke() for receipt in self.receipts]
+
+    @property
+    def raw(self) -> list[Any]:
+        return [receipt.raw for receipt in self.receipts]
+
+    def extract_message_id(self, index: int = 0) -> MessageId:
+        """从 Receipt 中提取 MessageId
+
+        Args:
+            index (int, optional): 默认为0, 即提取第一条消息的 MessageId.
+        """
+        return self.receipts[index].extract_message_id()
+
+    def extract_message_ids(self) -> list[MessageId]:
+        return [
+            message_id
+            for receipt in self.receipts
+            for message_id in receipt.extract_message_ids()
+        ]
+
+
+@dataclass
+class RevokeResult:
+    """批量撤回中单个回执的撤回结果"""
+
+    receipt: Receipt
+    """被撤回的回执"""
+    result: Any = None
+    """撤回接口的返回值"""
+    exception: Optional[BaseException] = None
+    """撤回失败时的异常"""
+
+    @property
+    def success(self) -> bool:
+        return self.exception is None
+
+
+BatchRevoker = Callable[[Bot, list[Receipt], asyncio.Semaphore], Awaitable[list[Any]]]
+"""批量撤回同一个 Bot 的回执
+
+返回与传入回执一一对应的撤回结果，撤回失败的位置为对应的异常；
+调用平台接口前需要先获取传入的 Semaphore 以限制并发
+"""
+
+batch_revoker_map: dict[SupportedAdapters, BatchRevoker] = {}
+
+
+def register_batch_revoker(adapter: SupportedAdapters):
+    def wrapper(revoker: BatchRevoker):
+        batch_revoker_map[adapter] = revoker
+        return revoker
+
+    return wrapper
+
+
+def _flatten_receipt(receipt: Receipt) -> list[Receipt]:
+    if isinstance(receipt, AggregatedReceipt):
+        return [leaf for sub in receipt.receipts for leaf in _flatten_receipt(sub)]
+    return [receipt]
+
+
+async def _revoke_one(receipt: Receipt, semaphore: asyncio.Semaphore) -> Any:
+    async with semaphore:
+        try:
+            return await receipt.revoke()
+        except Exception as e:
+            return e
+
+
+async def _revoke_bot_receipts(
+    adapter: SupportedAdapters, bot_id: str, receipts: list[Receipt], concurrency: int
+) -> list[Any]:
+    try:
+        bot = get_bot(bot_id)
+    except Exception as e:
+        return [e] * len(receipts)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    if revoker := batch_revoker_map.get(adapter):
+        return await revoker(bot, receipts, semaphore)
+    return await asyncio.gather(
+        *(_revoke_one(receipt, semaphore) for receipt in receipts)
+    )
+
+
+async def revoke_many(
+    receipts: Iterable[Receipt], concurrency: Optional[int] = None
+) -> list[RevokeResult]:
+    """批量撤回回执对应的消息
+
+    回执按 Bot 分组并发撤回，适配器支持批量撤回接口时会使用批量接口，
+    单个 Bot 同时进行的撤回请求数不超过 concurrency。
+    某个回执撤回失败不会影响其他回执，结果通过 RevokeResult 逐个报告。
+    不包含任何消息的合并发送回执视为撤回失败。
+
+    Args:
+        receipts (Iterable[Receipt]): 需要撤回的回执
+        concurrency (int, optional): 单个 Bot 的最大并发撤回数，默认使用配置项
+
+    Returns:
+        list[RevokeResult]: 与传入回执顺序一致的撤回结果
+    """
+    concurrency = concurrency or plugin_config.revoke_concurrency
+    receipts = list(receipts)
+    # 合并发送的回执展开为实际发送的消息的回执再分组
+    leaves = [_flatten_receipt(receipt) for receipt in receipts]
+
+    groups: dict[tuple[SupportedAdapters, str], list[Receipt]] = {}
+    for leaf in (leaf for receipt_leaves in leaves for leaf in receipt_leaves):
+        groups.setdefault((leaf.adapter_name, leaf.bot_id), []).append(leaf)
+
+    group_results = await asyncio.gather(
+        *(
+            _revoke_bot_receipts(adapter, bot_id, group, concurrency)
+            for (adapter, bot_id), group in groups.items()
+        )
+    )
+    leaf_results: dict[int, Any] = {
+        id(leaf): result
+        for group, results in zip(groups.values(), group_results)
+        for leaf, result in zip(group, results)
+    }
+
+    revoke_results = []
+    for receipt, receipt_leaves in zip(receipts, leaves):
+        results = [leaf_results[id(leaf)] for leaf in receipt_leaves]
+        exception = next((r for r in results if isinstance(r, BaseException)), None)
+        if exception is not None:
+            revoke_results.append(RevokeResult(receipt, exception=exception))
+        elif not receipt_leaves:
+            # 没有记录实际发送的消息（如协议端未返回消息 id），无法确认已撤回
+            revoke_results.append(
+                RevokeResult(
+                    receipt, exception=NotImplementedError("no sub-receipts to revoke")
+                )
+            )
+        elif isinstance(receipt, AggregatedReceipt):
+            revoke_results.append(RevokeResult(receipt, result=results))
+        else:
+            revoke_results.append(RevokeResult(receipt, result=results[0]))
+    return revoke_results
@@ -0,0 +1,341 @@
+"""定时发送：所有定时消息共用一个按触发时间排序的堆和一个驱动任务
+
+触发时才选择 Bot，定时期间 Bot 断开重连也不影响发送。
+"""
+
+import time
+import heapq
+import pickle
+import asyncio
+from uuid import uuid4
+from pathlib import Path
+from itertools import count
+from typing import Union, Optional
+from abc import ABC, abstractmethod
+from dataclasses import field, dataclass
+from datetime import datetime, timedelta
+
+import nonebot
+from nonebot import logger, get_driver
+
+from .registries import PlatformTarget
+from .utils.sqlite import SqliteStoreMixin, dump_json
+from .abstract_factories import MessageFactory, AggregatedMessageFactory
+
+ScheduledMessage = Union[MessageFactory, AggregatedMessageFactory]
+
+
+@dataclass(eq=False)
+class ScheduledSend:
+    """定时发送任务，可以通过 `cancel` 取消"""
+
+    id: str
+    when: float
+    """触发时间的时间戳"""
+    message: ScheduledMessage
+    target: PlatformTarget
+    bot_id: Optional[str] = None
+    """发送使用的 Bot，为 None 时在触发时自动选择"""
+    idempotency_key: Optional[str] = None
+    _scheduler: Optional["SendScheduler"] = field(default=None, repr=False)
+
+    def cancel(self) -> bool:
+        """取消发送，已经触发或已经取消时返回 False"""
+        if self._scheduler is None:
+            return False
+        return self._scheduler.cancel(self.id)
+
+
+class ScheduleStore(ABC):
+    """定时发送任务的持久化存储，用于在重启后恢复未触发的任务"""
+
+    @abstractmethod
+    async def add(self, job: ScheduledSend) -> None: ...
+
+    @abstractmethod
+    async def remove(self, job_id: str) -> None: ...
+
+    @abstractmethod
+    async def load(self) -> list[ScheduledSend]:
+        """返回所有未触发的任务"""
+        ...
+
+
+class SqliteScheduleStore(SqliteStoreMixin, ScheduleStore):
+    """保存在 sqlite 数据库中的定时发送任务，数据库操作在线程池中执行
+
+    消息使用 pickle 保存，Custom 和 overwrite 的构建函数需要是模块顶层定义的函数，
+    lambda 或局部函数无法 pickle，此时添加任务抛出 TypeError
+
+    Args:
+        path (str | Path): 数据库文件路径
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self._connect(
+            path,
+            """
+            CREATE TABLE IF NOT EXISTS scheduled_sends (
+                id TEXT PRIMARY KEY,
+                at REAL NOT NULL,
+                message BLOB NOT NULL,
+                target TEXT NOT NULL,
+                bot_id TEXT,
+                idempotency_key TEXT
+            )
+            """,
+        )
+
+    def _add_sync(self, row: tuple) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scheduled_sends VALUES (?, ?, ?, ?, ?, ?)", row
+            )
+
+    async def add(self, job: ScheduledSend) -> None:
+        try:
+            message = pickle.dumps(job.message)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise TypeError(f"scheduled message cannot be pickled: {e}") from e
+        row = (
+            job.id,
+            job.when,
+            message,
+            dump_json(job.target),
+            job.bot_id,
+            job.idempotency_key,
+        )
+        await self._run(self._add_sync, row)
+
+    def _remove_sync(self, job_id: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM scheduled_sends WHERE id = ?", (job_id,))
+
+    async def remove(self, job_id: str) -> None:
+        await self._run(self._remove_sync, job_id)
+
+    def _load_sync(self) -> list[tuple]:
+        return self._conn.execute(
+            "SELECT id, at, message, target, bot_id, idempotency_key"
+            " FROM scheduled_sends ORDER BY at"
+        ).fetchall()
+
+    async def load(self) -> list[ScheduledSend]:
+        jobs = []
+        for job_id, at, message, target, bot_id, key in await self._run(
+            self._load_sync
+        ):
+            try:
+                jobs.append(
+                    ScheduledSend(
+                        id=job_id,
+                        when=at,
+                        message=pickle.loads(message),
+                        target=PlatformTarget.deserialize(target),
+                        bot_id=bot_id,
+                        idempotency_key=key,
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"load scheduled send {job_id} failed: {e!r}")
+        return jobs
+
+
+def _to_timestamp(
+    at: Union[datetime, float, None], delay: Union[timedelta, float, None]
+) -> float:
+    if (at is None) == (delay is None):
+        raise ValueError("exactly one of `at` and `delay` must be given")
+    if isinstance(at, datetime):
+        return at.timestamp()
+    if at is not None:
+        return at
+    if isinstance(delay, timedelta):
+        delay = delay.total_seconds()
+    assert delay is not None
+    return time.time() + delay
+
+
+class SendScheduler:
+    """定时发送调度器
+
+    任务按触发时间保存在堆中，由一个驱动任务等待最早的任务到期，
+    取消的任务只从索引中删除，堆中失效的条目过多时再整体重建
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, str]] = []
+        self._jobs: dict[str, ScheduledSend] = {}
+        self._seq = count()
+        self._store: Optional[ScheduleStore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._driver_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sending: set[asyncio.Task] = set()
+
+    @property
+    def jobs(self) -> list[ScheduledSend]:
+        """所有未触发的任务，按触发时间排序"""
+        return sorted(self._jobs.values(), key=lambda job: job.when)
+
+    def set_store(self, store: Optional[ScheduleStore]) -> None:
+        self._store = store
+
+    async def schedule(
+        self,
+        message: ScheduledMessage,
+        target: PlatformTarget,
+        *,
+        at: Union[datetime, float, None] = None,
+        delay: Union[timedelta, float, None] = None,
+        bot_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> ScheduledSend:
+        job = ScheduledSend(
+            id=uuid4().hex,
+            when=_to_timestamp(at, delay),
+            message=message,
+            target=target,
+            bot_id=bot_id,
+            idempotency_key=idempotency_key,
+        )
+        if self._store is not None:
+            await self._store.add(job)
+        self._push(job)
+        return job
+
+    def _push(self, job: ScheduledSend) -> None:
+        job._scheduler = self
+        self._jobs[job.id] = job
+        heapq.heappush(self._heap, (job.when, next(self._seq), job.id))
+        self._ensure_driver()
+
+    def cancel(self, job_id: str) -> bool:
+        if self._jobs.pop(job_id, None) is None:
+            return False
+        if len(self._heap) > 2 * len(self._jobs) + 64:
+            self._heap = [entry for entry in self._heap if entry[2] in self._jobs]
+            heapq.heapify(self._heap)
+        if self._store is not None:
+            self._spawn(self._store.remove(job_id))
+        return True
+
+    async def load(self) -> None:
+        """从持久化存储中恢复任务，已经过期的任务会立即发送"""
+        if self._store is None:
+            return
+        for job in await self._store.load():
+            if job.id not in self._jobs:
+                self._push(job)
+
+    def _ensure_driver(self) -> None:
+        loop = asyncio.get_running_loop()
+        if (
+            self._driver_task is None
+            or self._driver_task.done()
+            or self._loop is not loop
+        ):
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._driver_task = loop.create_task(self._drive())
+        else:
+            assert self._wakeup is not None
+            self._wakeup.set()
+
+    async def _drive(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, job_id = heapq.heappop(self._heap)
+                if (job := self._jobs.pop(job_id, None)) is not None:
+                    self._spawn(self._fire(job))
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _fire(self, job: ScheduledSend) -> None:
+        try:
+            bot = nonebot.get_bot(job.bot_id) if job.bot_id is not None else None
+            await job.message.send_to(
+                job.target, bot, idempotency_key=job.idempotency_key
+            )
+        except Exception:
+            logger.exception(f"scheduled send {job.id} to {job.target} failed")
+        # 发送完成（无论成功与否）后才从存储中移除，被 close 取消的任务在重启后重新发送
+        if self._store is not None:
+            try:
+                await self._store.remove(job.id)
+            except Exception as e:
+                logger.warning(f"remove scheduled send {job.id} failed: {e!r}")
+
+    async def close(self) -> None:
+        """停止驱动任务，未触发的任务保留在持久化存储中"""
+        tasks = list(self._sending)
+        if self._driver_task is not None:
+            tasks.append(self._driver_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._driver_task = None
+        self._jobs.clear()
+        self._heap.clear()
+
+
+send_scheduler = SendScheduler()
+
+
+async def schedule_send(
+    message: ScheduledMessage,
+    target: PlatformTarget,
+    *,
+    at: Union[datetime, float, None] = None,
+    delay: Union[timedelta, float, None] = None,
+    bot_id: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+) -> ScheduledSend:
+    """在 at 时刻或 delay 秒后将消息发送到 target
+
+    不传入 bot_id 时，在触发时通过自动选择 Bot 功能选择 Bot，
+    参见 `enable_auto_select_bot`
+
+    ```python
+    job = await schedule_send(MessageFactory("该起床了"), target, at=tomorrow_8am)
+    job.cancel()
+    ```
+    """
+    return await send_scheduler.schedule(
+        message,
+        target,
+        at=at,
+        delay=delay,
+        bot_id=bot_id,
+        idempotency_key=idempotency_key,
+    )
+
+
+def set_schedule_store(store: ScheduleStore) -> None:
+    """设置定时发送任务的持久化存储，NoneBot 启动时恢复未触发的任务
+
+    需要在插件加载时调用，NoneBot 启动后设置的存储不会自动恢复任务
+
+    ```python
+    # __init__.py(插件入口)
+    require("nonebot_plugin_saa")
+    from nonebot_plugin_saa import SqliteScheduleStore, set_schedule_store
+    set_schedule_store(SqliteScheduleStore("data/scheduled_sends.db"))
+    ```
+    """
+    send_scheduler.set_store(store)
+
+
+get_driver().on_startup(send_scheduler.load)
+get_driver().on_shutdown(send_scheduler.close)
@@ -0,0 +1,174 @@
+"""消息模板：静态部分按 Bot 预先构建一次，每次发送只构建占位符部分"""
+
+import asyncio
+from dataclasses import dataclass
+from collections.abc import Iterable
+from weakref import WeakKeyDictionary
+from typing import Any, Union, Optional
+
+from nonebot.adapters import Bot
+from nonebot.matcher import current_bot
+
+from .auto_select_bot import get_bot
+from .utils import extract_adapter_type
+from .registries import Receipt, PlatformTarget
+from .abstract_factories import MessageFactory, MessageSegmentFactory
+
+PlaceholderValue = Union[str, MessageSegmentFactory, Iterable[MessageSegmentFactory]]
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    """消息模板中的占位符
+
+    Args:
+        name (str): 占位符的名字，发送时通过同名关键字参数传入内容
+        segment_type (type[MessageSegmentFactory], optional): 限制传入的消息段类型，
+            为 None 时可以传入字符串、消息段或 MessageFactory
+    """
+
+    name: str
+    segment_type: Optional[type[MessageSegmentFactory]] = None
+
+    def render(self, value: Any) -> list[MessageSegmentFactory]:
+        if self.segment_type is not None:
+            if not isinstance(value, self.segment_type):
+                raise TypeError(
+                    f"placeholder {self.name!r} expects {self.segment_type.__name__}, "
+                    f"got {type(value).__name__}"
+                )
+            return [value]
+        if isinstance(value, (MessageSegmentFactory, Iterable)):
+            return list(MessageFactory(value))
+        raise TypeError(
+            f"placeholder {self.name!r} got unsupported value {type(value).__name__}"
+        )
+
+
+TemplateSegment = Union[str, MessageSegmentFactory, Placeholder]
+
+
+class MessageTemplate:
+    """带占位符的消息模板
+
+    模板中的静态消息段（包括需要上传的图片）对每个 Bot 只构建一次，
+    之后的发送只构建占位符中的消息段，适合向大量目标发送只有少量差异的消息
+
+    ```python
+    template = MessageTemplate(
+        [Placeholder("user", Mention), "今天的日报：", Image(path)]
+    )
+    for user_id, target in subscribers:
+        await template.send_to(target, user=Mention(user_id))
+    ```
+    """
+
+    def __init__(self, segments: Iterable[TemplateSegment]) -> None:
+        self.segments: list[Union[MessageSegmentFactory, Placeholder]] = []
+        for segment in segments:
+            if isinstance(segment, str):
+                self.segments.append(MessageFactory.get_text_factory()(segment))
+            else:
+                self.segments.append(segment)
+        self._prebuilt: "WeakKeyDictionary[Bot, asyncio.Task[list[Any]]]" = (
+            WeakKeyDictionary()
+        )
+
+    @property
+    def placeholders(self) -> list[Placeholder]:
+        return [seg for seg in self.segments if isinstance(seg, Placeholder)]
+
+    def render(self, **values: PlaceholderValue) -> MessageFactory:
+        """用 values 填充占位符，返回不含预构建结果的 MessageFactory"""
+        return self._fill(self.segments, values)
+
+    def _fill(
+        self,
+        segments: list[Union[MessageSegmentFactory, Placeholder]],
+        values: dict[str, Any],
+    ) -> MessageFactory:
+        if missing := {p.name for p in self.placeholders} - values.keys():
+            raise ValueError(f"missing values for placeholders: {sorted(missing)}")
+        message = MessageFactory()
+        for segment in segments:
+            if isinstance(segment, Placeholder):
+                message.extend(segment.render(values[segment.name]))
+            else:
+                message.append(segment)
+        return message
+
+    async def _prebuild_static(
+        self, bot: Bot
+    ) -> list[Union[MessageSegmentFactory, Placeholder]]:
+        adapter = extract_adapter_type(bot)
+        static = [seg for seg in self.segments if not isinstance(seg, Placeholder)]
+        # 在上传任何图片之前检查所有静态消息段
+        for segment in static:
+            segment._preflight(adapter)
+        prebuilt = iter(
+            await asyncio.gather(*[segment._prebuild(bot) for segment in static])
+        )
+        return [
+            seg if isinstance(seg, Placeholder) else next(prebuilt)
+            for seg in self.segments
+        ]
+
+    async def _get_prebuilt(
+        self, bot: Bot
+    ) -> list[Union[MessageSegmentFactory, Placeholder]]:
+        """同一 Bot 并发发送时只预构建一次，失败时下次发送重新构建"""
+        task = self._prebuilt.get(bot)
+        if task is None:
+            task = asyncio.ensure_future(self._prebuild_static(bot))
+            self._prebuilt[bot] = task
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            if self._prebuilt.get(bot) is task:
+                del self._prebuilt[bot]
+            raise
+
+    def invalidate(self, bot: Optional[Bot] = None) -> None:
+        """丢弃预构建的结果，如图片已在平台上过期时；不传入 bot 时丢弃所有 Bot 的结果"""
+        if bot is None:
+            self._prebuilt.clear()
+        else:
+            self._prebuilt.pop(bot, None)
+
+    async def build(self, bot: Bot, **values: PlaceholderValue) -> MessageFactory:
+        """返回填充后的 MessageFactory，其中的静态消息段已为 bot 预先构建"""
+        return self._fill(await self._get_prebuilt(bot), values)
+
+    async def send(
+        self,
+        *,
+        at_sender=False,
+        reply=False,
+        idempotency_key: Optional[str] = None,
+        **values: PlaceholderValue,
+    ) -> Receipt:
+        "回复消息，仅能用在事件响应器中"
+        try:
+            bot = current_bot.get()
+        except LookupError as e:
+            raise RuntimeError(
+                "send() 仅能在事件响应器中使用，主动发送消息请使用 send_to"
+            ) from e
+        message = await self.build(bot, **values)
+        return await message.send(
+            at_sender=at_sender, reply=reply, idempotency_key=idempotency_key
+        )
+
+    async def send_to(
+        self,
+        target: PlatformTarget,
+        bot: Optional[Bot] = None,
+        *,
+        idempotency_key: Optional[str] = None,
+        **values: PlaceholderValue,
+    ) -> Receipt:
+        """主动发送消息，将填充后的消息发送到 target，如果不传入 bot 将自动选择 bot"""
+        if bot is None:
+            bot = get_bot(target)
+        message = await self.build(bot, **values)
+        return await message.send_to(target, bot, idempotency_key=idempotency_key)
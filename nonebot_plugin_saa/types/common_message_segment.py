@@ -1,10 +1,13 @@
 from io import BytesIO
 from pathlib import Path
 from typing_extensions import NotRequired
-from typing import Union, TypedDict, overload
+from typing import Union, Optional, TypedDict, overload
 
+from .. import image_processing
 from ..registries import MessageId
-from ..utils import SupportedAdapters
+from ..utils.files import read_file
+from ..utils.image import ImageMeta, probe_image
+from ..utils import SupportedAdapters, UnexpectedMessageIdType
 from ..abstract_factories import MessageFactory, MessageSegmentFactory
 
 
@@ -63,6 +66,64 @@ class Image(MessageSegmentFactory):
         """
         super().__init__()
         self.data = {"image": image, "name": name}
+        self._bytes: Optional[bytes] = None
+        self._processed: dict[SupportedAdapters, bytes] = {}
+        self._meta: Optional[ImageMeta] = None
+        self._processed_meta: dict[SupportedAdapters, ImageMeta] = {}
+
+    async def read_bytes(self, adapter: Optional[SupportedAdapters] = None) -> bytes:
+        """读取图片数据，供需要上传完整图片数据的适配器使用
+
+        Path 在线程池中读取，不阻塞事件循环。
+        Path 和 BytesIO 只在第一次调用时读取，之后同一消息段的每次构建
+        （如发送到多个目标）共享同一份数据，不再复制。
+        可以直接使用 Path 的适配器应直接使用路径，而不是调用此方法读取。
+
+        传入 adapter 并启用了图片预处理时，返回按该适配器的限制处理后的图片
+        """
+        data = await self._read_raw()
+        if adapter is None or not image_processing.enabled:
+            return data
+        if (processed := self._processed.get(adapter)) is None:
+            meta = await self.metadata()
+            processed = await image_processing.preprocess_image(
+                data, adapter, meta.sha256
+            )
+            self._processed[adapter] = processed
+        return processed
+
+    async def metadata(self, adapter: Optional[SupportedAdapters] = None) -> ImageMeta:
+        """图片的 MIME 类型、扩展名、大小、SHA-256 和尺寸
+
+        第一次调用时读取并探测图片数据，之后直接返回结果，URL 图片会抛出 TypeError。
+        传入 adapter 时返回 `read_bytes(adapter)` 返回的（可能经过预处理的）图片的信息
+        """
+        if self._meta is None:
+            self._meta = await probe_image(await self._read_raw())
+        if adapter is None:
+            return self._meta
+
+        data = await self.read_bytes(adapter)
+        if data is await self._read_raw():
+            return self._meta
+        if (meta := self._processed_meta.get(adapter)) is None:
+            meta = self._processed_meta[adapter] = await probe_image(data)
+        return meta
+
+    async def _read_raw(self) -> bytes:
+        if self._bytes is not None:
+            return self._bytes
+
+        image = self.data["image"]
+        if isinstance(image, bytes):
+            return image
+        if isinstance(image, Path):
+            self._bytes = await read_file(image)
+        elif isinstance(image, BytesIO):
+            self._bytes = image.getvalue()
+        else:
+            raise TypeError(f"Unsupported type of image: {type(image)}, need data")
+        return self._bytes
 
     def __str__(self) -> str:
         image = self.data["image"]
@@ -195,3 +256,13 @@ class Reply(MessageSegmentFactory):
         """
         super().__init__()
         self.data = {"message_id": message_id}
+
+    def _preflight(self, adapter: SupportedAdapters) -> None:
+        super()._preflight(adapter)
+        if adapter in self._custom_builders:
+            return
+        message_id = self.data["message_id"]
+        if message_id.adapter_name != adapter and (
+            expected_type := MessageId._deserializer_dict.get(adapter)
+        ):
+            raise UnexpectedMessageIdType(expected_type, message_id)
@@ -1,9 +1,14 @@
 from .exceptions import NoBotFound as NoBotFound
+from .exceptions import CircuitOpen as CircuitOpen
 from .const import SupportedAdapters as SupportedAdapters
 from .const import SupportedPlatform as SupportedPlatform
+from .helpers import retrieve_exception as retrieve_exception
 from .exceptions import FallbackToDefault as FallbackToDefault
+from .exceptions import TargetNotSupported as TargetNotSupported
 from .helpers import extract_adapter_type as extract_adapter_type
 from .exceptions import AdapterNotInstalled as AdapterNotInstalled
 from .exceptions import AdapterNotSupported as AdapterNotSupported
+from .exceptions import SegmentNotSupported as SegmentNotSupported
 from .helpers import type_message_id_check as type_message_id_check
 from .const import supported_adapter_names as supported_adapter_names
+from .exceptions import UnexpectedMessageIdType as UnexpectedMessageIdType
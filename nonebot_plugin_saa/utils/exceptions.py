@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from nonebot_plugin_saa.registries.message_id import MessageId
@@ -16,10 +16,31 @@ class AdapterNotSupported(Exception):
         super().__init__(self, message)
 
 
+class SegmentNotSupported(AdapterNotSupported):
+    def __init__(self, adapter_name: str, segment_type: str) -> None:
+        super().__init__(adapter_name)
+        self.segment_type = segment_type
+
+
+class TargetNotSupported(RuntimeError):
+    def __init__(self, adapter_name: str, platform: str) -> None:
+        super().__init__(f'adapter "{adapter_name}" cannot send to "{platform}"')
+
+
 class NoBotFound(RuntimeError):
     pass
 
 
+class CircuitOpen(RuntimeError):
+    def __init__(self, adapter_name: str, bot_id: Optional[str] = None) -> None:
+        scope = f'adapter "{adapter_name}"'
+        if bot_id is not None:
+            scope = f'bot "{bot_id}" of {scope}'
+        super().__init__(f"circuit breaker of {scope} is open")
+        self.adapter_name = adapter_name
+        self.bot_id = bot_id
+
+
 class FallbackToDefault(Exception):
     pass
 
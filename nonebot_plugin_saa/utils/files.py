@@ -0,0 +1,63 @@
+"""在线程池中读取本地文件，并缓存较小的文件
+
+缓存按 (路径, 修改时间, 文件大小) 索引，文件被修改后会重新读取。
+"""
+
+from pathlib import Path
+from typing import Union
+from collections import OrderedDict
+
+import anyio
+
+from ..config import plugin_config
+
+FileKey = tuple[str, int, int]
+
+_file_cache: "OrderedDict[FileKey, bytes]" = OrderedDict()
+_file_cache_bytes = 0
+
+
+def _cache_get(key: FileKey) -> Union[bytes, None]:
+    if (data := _file_cache.get(key)) is not None:
+        _file_cache.move_to_end(key)
+    return data
+
+
+def _cache_set(key: FileKey, data: bytes) -> None:
+    global _file_cache_bytes
+
+    if len(data) > plugin_config.file_cache_max_file_size:
+        return
+    if (old := _file_cache.pop(key, None)) is not None:
+        _file_cache_bytes -= len(old)
+    _file_cache[key] = data
+    _file_cache_bytes += len(data)
+    while _file_cache_bytes > plugin_config.file_cache_size:
+        _, evicted = _file_cache.popitem(last=False)
+        _file_cache_bytes -= len(evicted)
+
+
+def _file_key(path: Path) -> FileKey:
+    stat = path.stat()
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def clear_file_cache() -> None:
+    global _file_cache_bytes
+
+    _file_cache.clear()
+    _file_cache_bytes = 0
+
+
+async def read_file(path: Union[str, Path]) -> bytes:
+    """在线程池中读取文件，不阻塞事件循环
+
+    不超过 `file_cache_max_file_size` 的文件会被缓存，
+    缓存总大小不超过 `file_cache_size`
+    """
+    key = await anyio.to_thread.run_sync(_file_key, Path(path))
+    if (data := _cache_get(key)) is not None:
+        return data
+    data = await anyio.Path(path).read_bytes()
+    _cache_set(key, data)
+    return data
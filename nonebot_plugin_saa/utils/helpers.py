@@ -1,4 +1,5 @@
-from typing import TYPE_CHECKING, TypeVar, cast
+import asyncio
+from typing import TYPE_CHECKING, Any, TypeVar, cast
 
 from nonebot.internal.adapter.bot import Bot
 
@@ -11,12 +12,35 @@ if TYPE_CHECKING:
 TMessageId = TypeVar("TMessageId", bound="type[MessageId]")
 
 
+# 已导入实现的适配器，见 nonebot_plugin_saa.adapters
+loaded_adapters: set[SupportedAdapters] = set()
+_checked_types: set[type] = set()
+
+
+def ensure_adapter_loaded(adapter: SupportedAdapters) -> None:
+    """确保 SAA 对该适配器的实现已导入"""
+    if adapter not in loaded_adapters:
+        from ..adapters import load_adapter
+
+        load_adapter(adapter)
+
+
+def ensure_type_adapter_loaded(type_: type) -> None:
+    """确保 NoneBot 类型（如事件）所属适配器的实现已导入"""
+    if type_ not in _checked_types:
+        from ..adapters import load_adapter_for_module
+
+        load_adapter_for_module(type_.__module__)
+        _checked_types.add(type_)
+
+
 def extract_adapter_type(bot: Bot) -> SupportedAdapters:
     adapter_name = bot.adapter.get_name()
     if adapter_name not in supported_adapter_names:
         raise AdapterNotSupported(adapter_name)
 
     adapter_name = SupportedAdapters(adapter_name)
+    ensure_adapter_loaded(adapter_name)
     return cast(SupportedAdapters, adapter_name)
 
 
@@ -26,3 +50,9 @@ def type_message_id_check(
     if not isinstance(message_id, expected_type):
         raise UnexpectedMessageIdType(expected_type, message_id)
     return cast(TMessageId, message_id)
+
+
+def retrieve_exception(fut: "asyncio.Future[Any]") -> None:
+    """共享 Future 的回调，避免没有协程等待时 asyncio 报告未获取的异常"""
+    if not fut.cancelled():
+        fut.exception()
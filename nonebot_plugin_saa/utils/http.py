@@ -0,0 +1,100 @@
+"""SAA 自身发出的 HTTP 请求（如下载图片）共用的客户端
+
+所有请求复用同一个 NoneBot 驱动器会话，保持长连接，避免每次下载都重新建立 TLS 连接。
+会话在首次请求时创建，NoneBot 关闭时关闭。
+"""
+
+import asyncio
+from typing import Optional
+
+from nonebot import logger, get_driver
+from nonebot.drivers import (
+    URL,
+    Request,
+    Response,
+    HTTPVersion,
+    HTTPClientMixin,
+    HTTPClientSession,
+)
+
+from .instrumentation import span
+from ..config import plugin_config
+
+_session: Optional[HTTPClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_session_lock: Optional[asyncio.Lock] = None
+_host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+async def _get_session() -> HTTPClientSession:
+    global _session, _session_loop, _session_lock
+
+    loop = asyncio.get_running_loop()
+    if _session_loop is not loop:
+        # 会话与事件循环绑定，事件循环改变（如测试中）时关闭旧会话并重新创建
+        stale, _session = _session, None
+        _session_loop = loop
+        _session_lock = asyncio.Lock()
+        _host_semaphores.clear()
+        if stale is not None:
+            try:
+                await stale.close()
+            except Exception as e:
+                logger.debug(f"close stale http session failed: {e!r}")
+
+    # 会话已经存在时不需要加锁
+    if _session is not None:
+        return _session
+    assert _session_lock is not None
+    async with _session_lock:
+        if _session is None:
+            driver = get_driver()
+            if not isinstance(driver, HTTPClientMixin):
+                raise RuntimeError(
+                    f"driver {driver.type} does not support http client, "
+                    "please use a forward driver such as ~httpx or ~aiohttp"
+                )
+            session = driver.get_session(
+                version=HTTPVersion(plugin_config.http_version),
+                timeout=plugin_config.http_timeout,
+            )
+            await session.setup()
+            _session = session
+    return _session
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = URL(url).host or ""
+    if (semaphore := _host_semaphores.get(host)) is None:
+        semaphore = _host_semaphores[host] = asyncio.Semaphore(
+            plugin_config.http_max_connections_per_host
+        )
+    return semaphore
+
+
+async def request(setup: Request) -> Response:
+    """使用共享会话发送请求
+
+    同一主机的并发请求数受 `http_max_connections_per_host` 限制
+    """
+    session = await _get_session()
+    async with _host_semaphore(str(setup.url)):
+        return await session.request(setup)
+
+
+async def download(url: str, adapter: Optional[str] = None) -> Response:
+    """使用共享会话下载文件，记录为 download 埋点"""
+    with span("download", adapter=adapter):
+        return await request(Request("GET", url, timeout=plugin_config.http_timeout))
+
+
+async def close_session() -> None:
+    """关闭共享会话，之后的请求会重新创建会话"""
+    global _session
+
+    session, _session = _session, None
+    if session is not None and _session_loop is asyncio.get_running_loop():
+        await session.close()
+
+
+get_driver().on_shutdown(close_session)
@@ -0,0 +1,61 @@
+"""从图片数据中探测 MIME 类型、扩展名、大小、哈希和尺寸"""
+
+import hashlib
+from io import BytesIO
+from typing import Optional
+from dataclasses import dataclass
+
+import anyio
+import filetype
+
+# 超过该大小的图片在线程池中计算哈希
+THREAD_THRESHOLD = 256 * 1024
+
+
+@dataclass(frozen=True)
+class ImageMeta:
+    size: int
+    """图片数据的字节数"""
+    sha256: str
+    """图片数据的 SHA-256，可用作上传、构建结果等缓存的键"""
+    mime: Optional[str] = None
+    """MIME 类型，无法识别时为 None"""
+    extension: Optional[str] = None
+    """不带点的扩展名，无法识别时为 None"""
+    width: Optional[int] = None
+    """宽度，只在安装了 Pillow 时探测"""
+    height: Optional[int] = None
+    """高度，只在安装了 Pillow 时探测"""
+
+
+def _probe_size(data: bytes) -> tuple[Optional[int], Optional[int]]:
+    try:
+        from PIL import Image as PILImage
+    except ImportError:
+        return None, None
+    try:
+        # 只读取文件头，不解码图片
+        with PILImage.open(BytesIO(data)) as image:
+            return image.size
+    except Exception:
+        return None, None
+
+
+def probe_image_sync(data: bytes) -> ImageMeta:
+    kind = filetype.guess(data)
+    width, height = _probe_size(data)
+    return ImageMeta(
+        size=len(data),
+        sha256=hashlib.sha256(data).hexdigest(),
+        mime=kind.mime if kind else None,
+        extension=kind.extension if kind else None,
+        width=width,
+        height=height,
+    )
+
+
+async def probe_image(data: bytes) -> ImageMeta:
+    """探测图片信息，较大的图片在线程池中处理"""
+    if len(data) > THREAD_THRESHOLD:
+        return await anyio.to_thread.run_sync(probe_image_sync, data)
+    return probe_image_sync(data)
@@ -0,0 +1,96 @@
+"""发送流程的计时埋点"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Callable, Optional
+from dataclasses import field, dataclass
+
+from nonebot import logger
+
+from .exceptions import FallbackToDefault
+
+
+@dataclass
+class Span:
+    """一段被计时的发送流程
+
+    name 目前有:
+    - build: 构建单个消息段
+    - send: 发送一条消息（调用适配器的 sender）
+    - aggregated_send: 使用适配器的合并发送方法发送
+    - get_bot: 自动选择 Bot
+    - download: 构建消息段时下载图片等文件
+    - qqguild_dms: 获取 QQ 频道私聊所需的 guild_id
+    - image_preprocess: 按平台限制预处理图片
+    """
+
+    name: str
+    adapter: Optional[str] = None
+    platform: Optional[str] = None
+    segment_type: Optional[str] = None
+    bytes: Optional[int] = None
+    """发送的内存中图片等数据的字节数"""
+    outcome: str = "ok"
+    """ok / fallback / error"""
+    exception: Optional[BaseException] = None
+    start: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+
+    @property
+    def labels(self) -> dict[str, str]:
+        labels = {"span": self.name}
+        for key in ("adapter", "platform", "segment_type"):
+            if (value := getattr(self, key)) is not None:
+                labels[key] = str(value)
+        return labels
+
+
+SpanHook = Callable[[Span], None]
+
+span_hooks: list[SpanHook] = []
+
+
+def register_span_hook(hook: SpanHook) -> SpanHook:
+    """注册埋点回调，每段流程结束时会以对应的 Span 调用
+
+    回调在发送流程中同步执行，不应进行耗时操作
+    """
+    if hook not in span_hooks:
+        span_hooks.append(hook)
+    return hook
+
+
+def unregister_span_hook(hook: SpanHook) -> None:
+    if hook in span_hooks:
+        span_hooks.remove(hook)
+
+
+def _emit(span: Span) -> None:
+    for hook in span_hooks:
+        try:
+            hook(span)
+        except Exception:
+            logger.exception(f"span hook {hook} failed")
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """记录一段流程的耗时与结果，没有注册回调时只有创建 Span 的开销"""
+    current = Span(name, **attrs)
+    if not span_hooks:
+        yield current
+        return
+    try:
+        yield current
+    except FallbackToDefault as e:
+        current.outcome = "fallback"
+        current.exception = e
+        raise
+    except BaseException as e:
+        current.outcome = "error"
+        current.exception = e
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _emit(current)
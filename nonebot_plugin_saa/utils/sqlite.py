@@ -0,0 +1,38 @@
+"""基于 sqlite 的持久化存储共用的工具"""
+
+import sqlite3
+from pathlib import Path
+from typing import Union
+
+import anyio
+from pydantic import BaseModel
+from nonebot.compat import PYDANTIC_V2
+
+
+def dump_json(obj: BaseModel) -> str:
+    """将 PlatformTarget、Receipt 等序列化为 JSON，作为存储中的键或值"""
+    if PYDANTIC_V2:
+        return obj.model_dump_json()
+    return obj.json()
+
+
+class SqliteStoreMixin:
+    """sqlite 存储的连接管理，数据库操作在线程池中依次执行"""
+
+    _conn: sqlite3.Connection
+    _lock: anyio.Lock
+
+    def _connect(self, path: Union[str, Path], schema: str) -> None:
+        """连接数据库，并执行建表语句"""
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = anyio.Lock()
+        with self._conn:
+            self._conn.executescript(schema)
+
+    async def _run(self, func, *args):
+        async with self._lock:
+            return await anyio.to_thread.run_sync(func, *args)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self._conn.close()
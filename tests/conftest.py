@@ -10,11 +10,19 @@ def pytest_configure(config: pytest.Config) -> None:
 @pytest.fixture
 def app(app: App):
     from nonebot_plugin_saa.registries import PlatformTarget, QQGuildDMSManager
+    from nonebot_plugin_saa.idempotency import (
+        MemoryIdempotencyStore,
+        set_idempotency_store,
+    )
 
     yield app
 
+    set_idempotency_store(MemoryIdempotencyStore())
+
     PlatformTarget._deserializer_dict.clear()
     QQGuildDMSManager._cache.clear()
+    QQGuildDMSManager._inflight.clear()
+    QQGuildDMSManager.set_backend(None)
 
 
 @pytest.fixture(scope="session", autouse=True)
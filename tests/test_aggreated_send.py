@@ -49,6 +49,7 @@ async def test_send_active(app: App):
     from nonebot import get_driver
     from nonebot.adapters.onebot.v12 import Bot, Message
 
+    from nonebot_plugin_saa.adapters.onebot_v12 import OB12MessageId
     from nonebot_plugin_saa import (
         Text,
         MessageFactory,
@@ -89,6 +90,8 @@ async def test_send_active(app: App):
         target = TargetOB12Unknow(
             platform="banana", detail_type="private", user_id="2233"
         )
-        await AggregatedMessageFactory(
+        receipt = await AggregatedMessageFactory(
             [Text("123"), MessageFactory(Text("456"))]
         ).send_to(target, bot)
+        assert len(receipt.receipts) == 2
+        assert receipt.extract_message_id(1) == OB12MessageId(message_id="12451")
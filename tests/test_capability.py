@@ -0,0 +1,133 @@
+import pytest
+
+pytest.importorskip("nonebot.adapters.onebot")
+from nonebug import App
+from nonebot import get_adapter
+from pytest_mock import MockerFixture
+from nonebot.adapters.onebot.v11 import Bot as V11Bot
+from nonebot.adapters.onebot.v12 import Bot as V12Bot
+from nonebot.adapters.onebot.v11 import Adapter as V11Adapter
+from nonebot.adapters.onebot.v11 import Message as V11Message
+from nonebot.adapters.onebot.v12 import Adapter as V12Adapter
+from nonebot.adapters.onebot.v11 import MessageSegment as V11MessageSegment
+
+from tests.utils import ob12_kwargs
+
+
+def test_capability_matrix(app: App):
+    from nonebot_plugin_saa import SupportedAdapters
+    from nonebot_plugin_saa.utils import SupportedPlatform
+    from nonebot_plugin_saa.registries import supports_platform
+
+    assert supports_platform(SupportedAdapters.onebot_v11, SupportedPlatform.qq_group)
+    assert not supports_platform(
+        SupportedAdapters.onebot_v11, SupportedPlatform.qq_guild_channel
+    )
+    assert supports_platform(SupportedAdapters.qq, SupportedPlatform.qq_guild_direct)
+    assert supports_platform(
+        SupportedAdapters.telegram, SupportedPlatform.telegram_forum
+    )
+
+
+async def test_send_unsupported(app: App):
+    from nonebot_plugin_saa.utils import TargetNotSupported, SegmentNotSupported
+    from nonebot_plugin_saa import (
+        Image,
+        Custom,
+        TargetQQGroup,
+        MessageFactory,
+        SupportedAdapters,
+        TargetQQGuildChannel,
+        AggregatedMessageFactory,
+    )
+
+    async with app.test_api() as ctx:
+        v11_bot = ctx.create_bot(base=V11Bot, adapter=get_adapter(V11Adapter))
+        v12_bot = ctx.create_bot(
+            base=V12Bot,
+            adapter=get_adapter(V12Adapter),
+            self_id="v12",
+            **ob12_kwargs(),
+        )
+
+        # 在调用任何 API 前失败
+        with pytest.raises(TargetNotSupported):
+            await MessageFactory("123").send_to(
+                TargetQQGuildChannel(channel_id=2233), v11_bot
+            )
+
+        msg = MessageFactory(
+            [
+                Image(b"123"),
+                Custom({SupportedAdapters.onebot_v11: V11MessageSegment.text("1")}),
+            ]
+        )
+        with pytest.raises(SegmentNotSupported):
+            await msg.send_to(TargetQQGroup(group_id=2233), v12_bot)
+        with pytest.raises(SegmentNotSupported):
+            await AggregatedMessageFactory([msg]).send_to(
+                TargetQQGroup(group_id=2233), v12_bot
+            )
+
+
+async def test_get_bot_skips_unsupported(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGuildChannel
+    from nonebot_plugin_saa.auto_select_bot import get_bot
+
+    mocker.patch("nonebot_plugin_saa.auto_select_bot.inited", True)
+
+    async with app.test_api() as ctx:
+        v11_bot = ctx.create_bot(base=V11Bot, adapter=get_adapter(V11Adapter))
+        v12_bot = ctx.create_bot(
+            base=V12Bot,
+            adapter=get_adapter(V12Adapter),
+            self_id="v12",
+            **ob12_kwargs(),
+        )
+        target = TargetQQGuildChannel(channel_id=2233)
+        mocker.patch.dict(
+            "nonebot_plugin_saa.auto_select_bot.BOT_CACHE",
+            {v11_bot: {target}, v12_bot: {target}},
+            clear=True,
+        )
+        for _ in range(10):
+            assert get_bot(target) is v12_bot
+
+
+async def test_reply_message_id_preflight(app: App):
+    from nonebot_plugin_saa.utils import UnexpectedMessageIdType
+    from nonebot_plugin_saa.adapters.onebot_v12 import OB12MessageId
+    from nonebot_plugin_saa import (
+        Image,
+        Reply,
+        TargetQQGroup,
+        MessageFactory,
+        SupportedAdapters,
+    )
+
+    async with app.test_api() as ctx:
+        v11_bot = ctx.create_bot(base=V11Bot, adapter=get_adapter(V11Adapter))
+
+        # 图片不会被上传
+        msg = MessageFactory([Image(b"123"), Reply(OB12MessageId(message_id="1"))])
+        with pytest.raises(UnexpectedMessageIdType):
+            await msg.send_to(TargetQQGroup(group_id=2233), v11_bot)
+
+        # 重写了构建方法的 Reply 不检查
+        msg = MessageFactory(
+            [
+                Reply(OB12MessageId(message_id="1")).overwrite(
+                    SupportedAdapters.onebot_v11, V11MessageSegment.reply(1)
+                )
+            ]
+        )
+        ctx.should_call_api(
+            "send_msg",
+            data={
+                "message_type": "group",
+                "group_id": 2233,
+                "message": V11Message(V11MessageSegment.reply(1)),
+            },
+            result={"message_id": 1},
+        )
+        await msg.send_to(TargetQQGroup(group_id=2233), v11_bot)
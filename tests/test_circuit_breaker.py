@@ -0,0 +1,271 @@
+import asyncio
+
+import pytest
+from nonebug import App
+from nonebot import get_adapter
+from pytest_mock import MockerFixture
+from nonebot.adapters.onebot.v11 import Bot, Adapter
+from nonebot.adapters.onebot.v11.exception import NetworkError
+
+
+async def call(breakers, error=None, delay: float = 0, bot_id: str = "1"):
+    from nonebot_plugin_saa import SupportedAdapters
+
+    async with breakers.guard(SupportedAdapters.onebot_v11, bot_id):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+
+
+async def test_open_and_recover(app: App):
+    from nonebot_plugin_saa.utils import CircuitOpen
+    from nonebot_plugin_saa.circuit_breaker import CircuitState
+    from nonebot_plugin_saa import CircuitBreakers, SupportedAdapters
+
+    breakers = CircuitBreakers(failure_threshold=2, recovery_timeout=0.05)
+    key = (SupportedAdapters.onebot_v11, "1")
+
+    # 业务错误不计为失败，并重置连续失败次数
+    with pytest.raises(NetworkError):
+        await call(breakers, NetworkError())
+    with pytest.raises(ValueError, match="bad"):
+        await call(breakers, ValueError("bad"))
+    with pytest.raises(NetworkError):
+        await call(breakers, NetworkError())
+    assert breakers.bot_states[key] is CircuitState.closed
+
+    with pytest.raises(NetworkError):
+        await call(breakers, NetworkError())
+    assert breakers.bot_states[key] is CircuitState.open
+    assert not breakers.available(*key)
+    with pytest.raises(CircuitOpen):
+        await call(breakers)
+    # 其他 Bot 不受影响
+    await call(breakers, bot_id="2")
+
+    # 半开状态只允许一次试探，试探失败重新打开
+    await asyncio.sleep(0.06)
+    assert breakers.bot_states[key] is CircuitState.half_open
+    probe = asyncio.create_task(call(breakers, NetworkError(), delay=0.01))
+    await asyncio.sleep(0)
+    with pytest.raises(CircuitOpen):
+        await call(breakers)
+    with pytest.raises(NetworkError):
+        await probe
+    assert breakers.bot_states[key] is CircuitState.open
+
+    # 试探成功后关闭
+    await asyncio.sleep(0.06)
+    await call(breakers)
+    assert breakers.bot_states[key] is CircuitState.closed
+
+
+async def test_adapter_breaker_and_timeout(app: App):
+    from nonebot_plugin_saa.utils import CircuitOpen
+    from nonebot_plugin_saa.circuit_breaker import CircuitState
+    from nonebot_plugin_saa import CircuitBreakers, SupportedAdapters
+
+    breakers = CircuitBreakers(
+        failure_threshold=10, adapter_failure_threshold=2, send_timeout=0.01
+    )
+    for bot_id in ("1", "2"):
+        with pytest.raises(TimeoutError):
+            await call(breakers, delay=1, bot_id=bot_id)
+    assert breakers.adapter_states == {SupportedAdapters.onebot_v11: CircuitState.open}
+    with pytest.raises(CircuitOpen, match="adapter"):
+        await call(breakers, bot_id="3")
+
+
+async def test_get_bot_skips_open_bot(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa.auto_select_bot import get_bot
+    from nonebot_plugin_saa import (
+        TargetQQGroup,
+        CircuitBreakers,
+        SupportedAdapters,
+        enable_circuit_breaker,
+    )
+
+    mocker.patch("nonebot_plugin_saa.auto_select_bot.inited", True)
+    mocker.patch("nonebot_plugin_saa.circuit_breaker.circuit_breakers", None)
+    breakers = enable_circuit_breaker(CircuitBreakers(failure_threshold=1))
+    target = TargetQQGroup(group_id=1)
+
+    async with app.test_api() as ctx:
+        bot1 = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="1")
+        bot2 = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="2")
+        mocker.patch.dict(
+            "nonebot_plugin_saa.auto_select_bot.BOT_CACHE",
+            {bot1: {target}, bot2: {target}},
+            clear=True,
+        )
+        breakers.bot_breaker(SupportedAdapters.onebot_v11, "1").record_failure()
+        assert {get_bot(target) for _ in range(20)} == {bot2}
+
+        # 所有 Bot 都在熔断中时仍然选择一个，由发送时快速失败
+        breakers.bot_breaker(SupportedAdapters.onebot_v11, "2").record_failure()
+        assert get_bot(target) in (bot1, bot2)
+
+
+async def test_send_fails_fast(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa.utils import CircuitOpen
+    from nonebot_plugin_saa import (
+        TargetQQGroup,
+        MessageFactory,
+        CircuitBreakers,
+        SupportedAdapters,
+        enable_circuit_breaker,
+    )
+
+    mocker.patch("nonebot_plugin_saa.circuit_breaker.circuit_breakers", None)
+    breakers = enable_circuit_breaker(CircuitBreakers(failure_threshold=1))
+    breakers.bot_breaker(SupportedAdapters.onebot_v11, "42").record_failure()
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="42")
+        with pytest.raises(CircuitOpen, match='bot "42"'):
+            await MessageFactory("123").send_to(TargetQQGroup(group_id=1), bot)
+
+
+async def test_not_sent_is_not_recorded(app: App):
+    from nonebot_plugin_saa.circuit_breaker import CircuitState
+    from nonebot_plugin_saa import CircuitBreakers, SupportedAdapters
+    from nonebot_plugin_saa.utils import CircuitOpen, FallbackToDefault
+
+    breakers = CircuitBreakers(failure_threshold=1, recovery_timeout=0.01)
+    key = (SupportedAdapters.onebot_v11, "1")
+    breakers.bot_breaker(*key).record_failure()
+    await asyncio.sleep(0.02)
+
+    # 没有实际发送时归还试探机会，不计为成功或失败
+    for error in (FallbackToDefault(), CircuitOpen(SupportedAdapters.onebot_v11)):
+        with pytest.raises(type(error)):
+            await call(breakers, error)
+        assert breakers.bot_states[key] is CircuitState.half_open
+        assert breakers.available(*key)
+
+
+async def test_aggregated_send_probes_once(app: App, mocker: MockerFixture):
+    from nonebot import get_driver
+    from nonebot.adapters.telegram import Bot as TGBot
+
+    from nonebot_plugin_saa.circuit_breaker import CircuitState
+    from tests.test_telegram import (
+        CHAT_ID,
+        BOT_CONFIG,
+        FAKE_MESSAGE_RETURN,
+        SEND_MESSAGE_PARAMS,
+    )
+    from nonebot_plugin_saa import (
+        Text,
+        CircuitBreakers,
+        SupportedAdapters,
+        TargetTelegramCommon,
+        AggregatedMessageFactory,
+        enable_circuit_breaker,
+    )
+
+    mocker.patch("nonebot_plugin_saa.circuit_breaker.circuit_breakers", None)
+    breakers = enable_circuit_breaker(
+        CircuitBreakers(failure_threshold=1, recovery_timeout=0.01)
+    )
+
+    async with app.test_api() as ctx:
+        adapter_obj = get_driver()._adapters[str(SupportedAdapters.telegram)]
+        bot = ctx.create_bot(base=TGBot, adapter=adapter_obj, config=BOT_CONFIG)
+        key = (SupportedAdapters.telegram, bot.self_id)
+        breakers.bot_breaker(*key).record_failure()
+        await asyncio.sleep(0.02)
+        assert breakers.bot_states[key] is CircuitState.half_open
+
+        # 适配器的合并发送方法内部调用 _do_send，试探机会只占用一次
+        ctx.should_call_api(
+            "send_message",
+            {**SEND_MESSAGE_PARAMS, "text": "123\n456"},
+            FAKE_MESSAGE_RETURN,
+        )
+        await AggregatedMessageFactory([Text("123"), Text("456")]).send_to(
+            TargetTelegramCommon(chat_id=CHAT_ID), bot
+        )
+
+    assert breakers.bot_states[key] is CircuitState.closed
+
+
+async def test_timeout_excludes_slot_wait(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa.circuit_breaker import CircuitState
+    from nonebot_plugin_saa import (
+        TargetQQGroup,
+        MessageFactory,
+        CircuitBreakers,
+        SupportedAdapters,
+        AdaptiveConcurrencyLimiter,
+        enable_circuit_breaker,
+        enable_adaptive_concurrency,
+    )
+
+    mocker.patch("nonebot_plugin_saa.circuit_breaker.circuit_breakers", None)
+    mocker.patch("nonebot_plugin_saa.concurrency.adaptive_limiter", None)
+    breakers = enable_circuit_breaker(
+        CircuitBreakers(failure_threshold=1, send_timeout=0.1)
+    )
+    enable_adaptive_concurrency(AdaptiveConcurrencyLimiter(initial_limit=1))
+
+    async def slow_sender(*args):
+        await asyncio.sleep(0.06)
+
+    mocker.patch.dict(
+        "nonebot_plugin_saa.registries.platform_send_target.sender_map",
+        {SupportedAdapters.onebot_v11: slow_sender},
+    )
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="42")
+        # 排队等待并发名额的时间不计入 send_timeout
+        await asyncio.gather(
+            *(
+                MessageFactory("123").send_to(TargetQQGroup(group_id=1), bot)
+                for _ in range(3)
+            )
+        )
+
+    assert breakers.bot_states == {
+        (SupportedAdapters.onebot_v11, "42"): CircuitState.closed
+    }
+
+
+async def test_open_circuit_skips_slot_queue(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa.utils import CircuitOpen
+    from nonebot_plugin_saa import (
+        TargetQQGroup,
+        MessageFactory,
+        CircuitBreakers,
+        SupportedAdapters,
+        AdaptiveConcurrencyLimiter,
+        enable_circuit_breaker,
+        enable_adaptive_concurrency,
+    )
+
+    mocker.patch("nonebot_plugin_saa.circuit_breaker.circuit_breakers", None)
+    mocker.patch("nonebot_plugin_saa.concurrency.adaptive_limiter", None)
+    breakers = enable_circuit_breaker(CircuitBreakers(failure_threshold=1))
+    enable_adaptive_concurrency(AdaptiveConcurrencyLimiter(initial_limit=1))
+    release = asyncio.Event()
+
+    async def hanging_sender(*args):
+        await release.wait()
+
+    mocker.patch.dict(
+        "nonebot_plugin_saa.registries.platform_send_target.sender_map",
+        {SupportedAdapters.onebot_v11: hanging_sender},
+    )
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="42")
+        target = TargetQQGroup(group_id=1)
+        hanging = asyncio.create_task(MessageFactory("123").send_to(target, bot))
+        await asyncio.sleep(0)
+        breakers.bot_breaker(SupportedAdapters.onebot_v11, "42").record_failure()
+        # 熔断中不排队等待并发名额，立即失败
+        with pytest.raises(CircuitOpen):
+            await asyncio.wait_for(MessageFactory("123").send_to(target, bot), 1)
+        release.set()
+        await hanging
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from nonebug import App
+from nonebot import get_adapter
+from pytest_mock import MockerFixture
+from nonebot.adapters.onebot.v11 import Bot, Adapter, Message, MessageSegment
+
+
+async def test_merge_into_one_message(app: App):
+    from nonebot_plugin_saa import Text, SendCoalescer, TargetQQGroup
+
+    coalescer = SendCoalescer(window=0.05)
+    target = TargetQQGroup(group_id=1)
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter))
+        ctx.should_call_api(
+            "send_msg",
+            data={
+                "message": Message(
+                    [
+                        MessageSegment.text("1"),
+                        MessageSegment.text("\n"),
+                        MessageSegment.text("2"),
+                        MessageSegment.text("\n"),
+                        MessageSegment.text("3"),
+                    ]
+                ),
+                "group_id": 1,
+                "message_type": "group",
+            },
+            result={"message_id": 10},
+        )
+        receipts = await asyncio.gather(
+            coalescer.send_to("1", target, bot),
+            coalescer.send_to(Text("2"), target, bot),
+            coalescer.send_to("3", target, bot),
+        )
+        assert all(receipt is receipts[0] for receipt in receipts)
+
+
+@pytest.fixture
+def sent(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa import MessageFactory, AggregatedMessageFactory
+
+    records = []
+
+    async def send_to(self, target, bot=None, *, idempotency_key=None):
+        if "fail" in str(self):
+            raise RuntimeError("fail")
+        records.append(self)
+        return len(records)
+
+    mocker.patch.object(MessageFactory, "send_to", send_to)
+    mocker.patch.object(AggregatedMessageFactory, "send_to", send_to)
+    return records
+
+
+async def test_batches(sent):
+    from nonebot_plugin_saa.adapters.onebot_v11 import OB11MessageId
+    from nonebot_plugin_saa import (
+        Text,
+        Reply,
+        SendCoalescer,
+        TargetQQGroup,
+        MessageFactory,
+        AggregatedMessageFactory,
+    )
+
+    target = TargetQQGroup(group_id=1)
+
+    # 超过阈值时合并为聚合消息，达到上限时立即发送
+    coalescer = SendCoalescer(window=10, aggregate_threshold=2, max_messages=3)
+    await asyncio.gather(*[coalescer.send_to(str(i), target) for i in range(3)])
+    assert sent == [
+        AggregatedMessageFactory([MessageFactory(str(i)) for i in range(3)])
+    ]
+
+    # 包含 Reply 的消息开始新的批次，不同目标分别合并
+    sent.clear()
+    coalescer = SendCoalescer(window=0.05)
+    reply = MessageFactory([Reply(OB11MessageId(message_id=1)), Text("b")])
+    results = await asyncio.gather(
+        coalescer.send_to("a", target),
+        coalescer.send_to(reply, target),
+        coalescer.send_to("c", target),
+        coalescer.send_to("d", TargetQQGroup(group_id=2)),
+    )
+    assert results == [1, 2, 2, 3]
+    assert sent == [
+        MessageFactory("a"),
+        MessageFactory(
+            [Reply(OB11MessageId(message_id=1)), Text("b"), Text("\n"), Text("c")]
+        ),
+        MessageFactory("d"),
+    ]
+
+
+async def test_flush_and_failure(sent):
+    from nonebot_plugin_saa import SendCoalescer, TargetQQGroup
+
+    target = TargetQQGroup(group_id=1)
+    coalescer = SendCoalescer(window=10)
+    first = asyncio.ensure_future(coalescer.send_to("fail", target))
+    second = asyncio.ensure_future(coalescer.send_to("ok", target))
+    await asyncio.sleep(0)
+    await coalescer.flush()
+    for task in (first, second):
+        with pytest.raises(RuntimeError, match="fail"):
+            await task
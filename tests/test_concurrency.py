@@ -0,0 +1,197 @@
+import asyncio
+
+import pytest
+from nonebug import App
+from nonebot import get_adapter
+from pytest_mock import MockerFixture
+from nonebot.adapters.onebot.v11 import Bot, Adapter, Message
+
+
+class RateLimitException(Exception):
+    pass
+
+
+async def run(limiter, n: int, delay: float = 0, error=None) -> int:
+    """同时进行 n 次发送，返回同时进行的最大发送数量"""
+    from nonebot_plugin_saa import SupportedAdapters
+
+    running = max_running = 0
+
+    async def send():
+        nonlocal running, max_running
+        async with limiter.slot(SupportedAdapters.onebot_v11, "1"):
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(delay)
+            running -= 1
+            if error is not None:
+                raise error
+
+    await asyncio.gather(*(send() for _ in range(n)), return_exceptions=True)
+    return max_running
+
+
+async def test_increase_and_backoff(app: App):
+    from nonebot_plugin_saa import SupportedAdapters, AdaptiveConcurrencyLimiter
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+    adapter = SupportedAdapters.onebot_v11
+
+    assert await run(limiter, 10, 0.01) <= 4
+    assert limiter.get_limit(adapter, "1") == 4
+    # 不超过上限
+    assert await run(limiter, 40, 0.001) == 4
+    assert limiter.get_limit(adapter, "1") == 4
+
+    # 同一轮发送的多次限流只降低一次
+    await run(limiter, 4, error=RateLimitException())
+    assert limiter.get_limit(adapter, "1") == 2
+    await run(limiter, 4, error=asyncio.TimeoutError())
+    assert limiter.get_limit(adapter, "1") == 1
+
+    # 其他错误不改变并发数
+    await run(limiter, 4, error=RuntimeError())
+    assert limiter.limits == {(adapter, "1"): 1}
+
+
+async def test_slow_send_does_not_increase(app: App):
+    from nonebot_plugin_saa import SupportedAdapters, AdaptiveConcurrencyLimiter
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, latency_threshold=0.01)
+    assert await run(limiter, 4, 0.02) == 2
+    assert limiter.get_limit(SupportedAdapters.onebot_v11, "1") == 2
+
+
+async def test_cancel_waiter(app: App):
+    from nonebot_plugin_saa import SupportedAdapters, AdaptiveConcurrencyLimiter
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    adapter = SupportedAdapters.onebot_v11
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot(adapter, "1"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await holder
+    # 取消的等待者不占用名额
+    async with limiter.slot(adapter, "1"):
+        pass
+
+
+def test_invalid_arguments():
+    from nonebot_plugin_saa import AdaptiveConcurrencyLimiter
+
+    with pytest.raises(ValueError, match="min_limit"):
+        AdaptiveConcurrencyLimiter(initial_limit=0)
+    with pytest.raises(ValueError, match="backoff_ratio"):
+        AdaptiveConcurrencyLimiter(backoff_ratio=1)
+
+
+async def test_overload_classifier(app: App):
+    from nonebot.adapters.telegram.exception import ActionFailed
+
+    from nonebot_plugin_saa.concurrency import is_overload
+    from nonebot_plugin_saa import SupportedAdapters, register_overload_classifier
+
+    class Response(Exception):
+        status_code = 429
+
+    assert is_overload(SupportedAdapters.qq, Response())
+    assert is_overload(SupportedAdapters.onebot_v11, TimeoutError())
+    assert not is_overload(SupportedAdapters.onebot_v11, RuntimeError())
+
+    import nonebot_plugin_saa.adapters.telegram  # noqa: F401
+
+    assert is_overload(
+        SupportedAdapters.telegram,
+        ActionFailed("Too Many Requests: retry after 5"),
+    )
+    assert not is_overload(SupportedAdapters.telegram, ActionFailed("Bad Request"))
+
+    register_overload_classifier(SupportedAdapters.onebot_v11)(
+        lambda e: "busy" in str(e)
+    )
+    try:
+        assert is_overload(SupportedAdapters.onebot_v11, RuntimeError("busy"))
+    finally:
+        from nonebot_plugin_saa.concurrency import overload_classifiers
+
+        del overload_classifiers[SupportedAdapters.onebot_v11]
+
+
+async def test_send_with_limiter(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa import (
+        TargetQQGroup,
+        MessageFactory,
+        SupportedAdapters,
+        AdaptiveConcurrencyLimiter,
+        enable_adaptive_concurrency,
+    )
+
+    mocker.patch("nonebot_plugin_saa.concurrency.adaptive_limiter", None)
+    limiter = enable_adaptive_concurrency(AdaptiveConcurrencyLimiter(initial_limit=1))
+    spy = mocker.spy(limiter, "_release")
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="42")
+        ctx.should_call_api(
+            "send_msg",
+            data={
+                "message": Message("123"),
+                "group_id": 1,
+                "message_type": "group",
+            },
+            result={"message_id": 1},
+        )
+        await MessageFactory("123").send_to(TargetQQGroup(group_id=1), bot)
+
+    spy.assert_called_once()
+    assert limiter.get_limit(SupportedAdapters.onebot_v11, "42") == 2
+
+
+async def test_aggregated_send_takes_one_slot(app: App, mocker: MockerFixture):
+    from nonebot import get_driver
+    from nonebot.adapters.telegram import Bot as TGBot
+
+    from tests.test_telegram import (
+        CHAT_ID,
+        BOT_CONFIG,
+        FAKE_MESSAGE_RETURN,
+        SEND_MESSAGE_PARAMS,
+    )
+    from nonebot_plugin_saa import (
+        Text,
+        SupportedAdapters,
+        TargetTelegramCommon,
+        AggregatedMessageFactory,
+        AdaptiveConcurrencyLimiter,
+        enable_adaptive_concurrency,
+    )
+
+    mocker.patch("nonebot_plugin_saa.concurrency.adaptive_limiter", None)
+    limiter = enable_adaptive_concurrency(AdaptiveConcurrencyLimiter(initial_limit=1))
+    spy = mocker.spy(limiter, "_release")
+
+    async with app.test_api() as ctx:
+        adapter_obj = get_driver()._adapters[str(SupportedAdapters.telegram)]
+        bot = ctx.create_bot(base=TGBot, adapter=adapter_obj, config=BOT_CONFIG)
+        ctx.should_call_api(
+            "send_message",
+            {**SEND_MESSAGE_PARAMS, "text": "123\n456"},
+            FAKE_MESSAGE_RETURN,
+        )
+        # 适配器的合并发送方法内部调用 _do_send，不能再次占用名额
+        await asyncio.wait_for(
+            AggregatedMessageFactory([Text("123"), Text("456")]).send_to(
+                TargetTelegramCommon(chat_id=CHAT_ID), bot
+            ),
+            5,
+        )
+
+    spy.assert_called_once()
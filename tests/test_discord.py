@@ -526,3 +526,62 @@ async def test_list_targets(app: App, mocker: MockerFixture):
         await refresh_bots()
 
         assert get_bot(TargetDiscordChannel(channel_id=4321)) == bot
+
+
+async def test_send_aggregated(app: App):
+    from nonebot import get_driver
+    from nonebot.adapters.discord.api.model import (
+        User,
+        Snowflake,
+        MessageGet,
+        MessageType,
+    )
+
+    from nonebot_plugin_saa import (
+        Text,
+        SupportedAdapters,
+        TargetDiscordChannel,
+        AggregatedMessageFactory,
+    )
+
+    async with app.test_api() as ctx:
+        adapter_obj = get_driver()._adapters[SupportedAdapters.discord]
+        bot = ctx.create_bot(base=Bot, adapter=adapter_obj, **discord_kwargs)
+
+        send_target = TargetDiscordChannel(channel_id=4321)
+
+        ctx.should_call_api(
+            "create_message",
+            data={
+                "channel_id": 4321,
+                "nonce": None,
+                "tts": False,
+                "allowed_mentions": None,
+                "content": "123\n456",
+            },
+            result=MessageGet(
+                id=Snowflake(1234),
+                channel_id=Snowflake(4321),
+                author=User(
+                    id=Snowflake(1234),
+                    username="canxin121",
+                    discriminator="0",
+                    avatar=None,
+                    global_name=None,
+                ),
+                content="123\n456",
+                timestamp=datetime(year=1999, month=9, day=9),
+                edited_timestamp=None,
+                tts=False,
+                mention_everyone=False,
+                mentions=[],
+                mention_roles=[],
+                attachments=[],
+                embeds=[],
+                pinned=False,
+                type=MessageType(0),
+            ),
+        )
+        await AggregatedMessageFactory([Text("123"), Text("456")]).send_to(
+            send_target, bot
+        )
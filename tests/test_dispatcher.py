@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from nonebug import App
+from nonebot import get_adapter
+from pytest_mock import MockerFixture
+from nonebot.adapters.onebot.v11 import Bot, Adapter
+
+
+class Recorder(list):
+    running = 0
+    max_running = 0
+
+
+@pytest.fixture
+def sent(app: App, mocker: MockerFixture):
+    """替换 MessageFactory.send_to，记录每次发送，消息内容为发送耗时"""
+    from nonebot_plugin_saa import MessageFactory
+
+    records = Recorder()
+
+    async def send_to(self, target, bot=None, *, idempotency_key=None):
+        if str(self) == "fail":
+            raise RuntimeError("fail")
+        records.running += 1
+        records.max_running = max(records.max_running, records.running)
+        await asyncio.sleep(float(str(self)))
+        records.running -= 1
+        records.append((target, str(self), bot))
+        return str(self)
+
+    mocker.patch.object(MessageFactory, "send_to", send_to)
+    return records
+
+
+async def test_per_target_order(sent):
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory, SendDispatcher
+
+    dispatcher = SendDispatcher()
+    a, b = TargetQQGroup(group_id=1), TargetQQGroup(group_id=2)
+    bot = object()
+    futures = [
+        dispatcher.submit(MessageFactory("0.05"), a, bot),
+        dispatcher.submit(MessageFactory("0"), a, bot),
+        dispatcher.submit(MessageFactory("0.01"), b, bot),
+    ]
+    assert await asyncio.gather(*futures) == ["0.05", "0", "0.01"]
+    # 同一目标按提交顺序，不同目标并发
+    assert [(target, text) for target, text, _ in sent] == [
+        (b, "0.01"),
+        (a, "0.05"),
+        (a, "0"),
+    ]
+    await dispatcher.close()
+
+
+async def test_failure_does_not_block(sent):
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory, SendDispatcher
+
+    dispatcher = SendDispatcher()
+    target = TargetQQGroup(group_id=1)
+    bot = object()
+    failed = dispatcher.submit(MessageFactory("fail"), target, bot)
+    assert await dispatcher.send_to(MessageFactory("0"), target, bot) == "0"
+    with pytest.raises(RuntimeError, match="fail"):
+        await failed
+    await dispatcher.close()
+
+
+async def test_max_concurrency(sent):
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory, SendDispatcher
+
+    dispatcher = SendDispatcher(max_concurrency=2)
+    for group_id in range(5):
+        dispatcher.submit(MessageFactory("0.01"), TargetQQGroup(group_id=group_id), 1)
+    await dispatcher.join()
+    assert len(sent) == 5
+    assert sent.max_running == 2
+    await dispatcher.close()
+
+
+async def test_close_cancels_pending(sent):
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory, SendDispatcher
+
+    dispatcher = SendDispatcher()
+    target = TargetQQGroup(group_id=1)
+    first = dispatcher.submit(MessageFactory("1"), target, 1)
+    second = dispatcher.submit(MessageFactory("0"), target, 1)
+    await asyncio.sleep(0)
+    await dispatcher.close()
+    assert first.cancelled()
+    assert second.cancelled()
+    assert not sent
+
+
+async def test_pin_bot(app: App, sent, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory, SendDispatcher
+
+    mocker.patch("nonebot_plugin_saa.auto_select_bot.inited", True)
+    target = TargetQQGroup(group_id=1)
+
+    async with app.test_api() as ctx:
+        bot1 = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="1")
+        bot2 = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="2")
+        mocker.patch.dict(
+            "nonebot_plugin_saa.auto_select_bot.BOT_CACHE",
+            {bot1: {target}, bot2: {target}},
+            clear=True,
+        )
+
+        dispatcher = SendDispatcher()
+        for _ in range(20):
+            dispatcher.submit(MessageFactory("0"), target)
+        await dispatcher.join()
+        assert len({bot for _, _, bot in sent}) == 1
+
+        # 固定的 Bot 断开后重新选择
+        pinned = sent[0][2]
+        mocker.patch(
+            "nonebot_plugin_saa.dispatcher._is_connected",
+            lambda bot: bot is not pinned,
+        )
+        mocker.patch.dict(
+            "nonebot_plugin_saa.auto_select_bot.BOT_CACHE",
+            {bot: {target} for bot in (bot1, bot2) if bot is not pinned},
+            clear=True,
+        )
+        await dispatcher.send_to(MessageFactory("0"), target)
+        assert sent[-1][2] is not pinned
+        await dispatcher.close()
@@ -81,6 +81,16 @@ async def test_image(app: App):
             url="https://im.dodo.com/amiya.png", width=191, height=223
         )
 
+        # 根据图片内容确定文件后缀
+        ctx.should_call_api(
+            "set_resouce_picture_upload",
+            data={"file": b"\xff\xd8\xff", "file_name": "amiya.jpg"},
+            result=PictureInfo(
+                url="https://im.dodo.com/amiya.jpg", width=191, height=223
+            ),
+        )
+        await Image(b"\xff\xd8\xff", name="amiya").build(bot)
+
     image_route.mock(return_value=Response(400, content=b"amiya"))
     with pytest.raises(RuntimeError):
         await Image("https://example.com/amiya.png").build(bot)
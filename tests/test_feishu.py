@@ -404,3 +404,85 @@ async def test_send_active(app: App):
             {"code": 0, "msg": "success", "data": {"message_id": "114514"}},
         )
         await MessageFactory("114514").send_to(target_group, bot)
+
+
+async def test_send_aggregated(app: App):
+    from nonebot import get_driver
+    from nonebot.adapters.feishu import Bot, Message, MessageSegment
+
+    from nonebot_plugin_saa import (
+        Text,
+        Mention,
+        SupportedAdapters,
+        TargetFeishuGroup,
+        AggregatedMessageFactory,
+    )
+
+    async with app.test_api() as ctx:
+        adapter_obj = get_driver()._adapters[str(SupportedAdapters.feishu)]
+        bot = ctx.create_bot(base=Bot, adapter=adapter_obj, **feishu_kwargs)
+
+        msg_type, content = Message(
+            [
+                MessageSegment.text("114514"),
+                MessageSegment.text("\n"),
+                MessageSegment.at("ou_1919810"),
+            ]
+        ).serialize()
+        assert msg_type == "post"
+
+        target_group = TargetFeishuGroup(chat_id="chat_id")
+        ctx.should_call_api(
+            "im/v1/messages",
+            {
+                "method": "POST",
+                "query": {"receive_id_type": "chat_id"},
+                "body": {
+                    "receive_id": "chat_id",
+                    "content": content,
+                    "msg_type": msg_type,
+                },
+            },
+            {"code": 0, "msg": "success", "data": {"message_id": "114514"}},
+        )
+        await AggregatedMessageFactory([Text("114514"), Mention("ou_1919810")]).send_to(
+            target_group, bot
+        )
+
+
+async def test_send_aggregated_too_large(app: App):
+    from nonebot import get_driver
+    from nonebot.adapters.feishu import Bot, Message, MessageSegment
+
+    from nonebot_plugin_saa.adapters.feishu import FEISHU_POST_SIZE_LIMIT
+    from nonebot_plugin_saa import (
+        Text,
+        SupportedAdapters,
+        TargetFeishuGroup,
+        AggregatedMessageFactory,
+    )
+
+    # 超过富文本大小上限时逐条发送
+    texts = ["a" * (FEISHU_POST_SIZE_LIMIT // 2)] * 2
+    async with app.test_api() as ctx:
+        adapter_obj = get_driver()._adapters[str(SupportedAdapters.feishu)]
+        bot = ctx.create_bot(base=Bot, adapter=adapter_obj, **feishu_kwargs)
+
+        for i, text in enumerate(texts):
+            msg_type, content = Message(MessageSegment.text(text)).serialize()
+            ctx.should_call_api(
+                "im/v1/messages",
+                {
+                    "method": "POST",
+                    "query": {"receive_id_type": "chat_id"},
+                    "body": {
+                        "receive_id": "chat_id",
+                        "content": content,
+                        "msg_type": msg_type,
+                    },
+                },
+                {"code": 0, "msg": "success", "data": {"message_id": str(i)}},
+            )
+        await AggregatedMessageFactory([Text(text) for text in texts]).send_to(
+            TargetFeishuGroup(chat_id="chat_id"), bot
+        )
@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+
+from nonebug import App
+from pytest_mock import MockerFixture
+
+
+async def test_read_file_cache(app: App, tmp_path: Path):
+    from nonebot_plugin_saa.utils.files import read_file
+
+    path = tmp_path / "image.png"
+    path.write_bytes(b"123")
+    data = await read_file(path)
+    assert data == b"123"
+    assert await read_file(str(path)) is data
+
+    # 修改文件后重新读取
+    path.write_bytes(b"4567")
+    os.utime(path, ns=(0, 1))
+    assert await read_file(path) == b"4567"
+
+
+async def test_read_file_cache_limit(app: App, tmp_path: Path, mocker: MockerFixture):
+    from nonebot_plugin_saa.utils import files
+
+    mocker.patch("nonebot_plugin_saa.config.plugin_config.file_cache_size", 8)
+    mocker.patch("nonebot_plugin_saa.config.plugin_config.file_cache_max_file_size", 4)
+    files.clear_file_cache()
+
+    large = tmp_path / "large.png"
+    large.write_bytes(b"12345")
+    await files.read_file(large)
+    assert not files._file_cache
+
+    small = [tmp_path / f"{i}.png" for i in range(3)]
+    for path in small:
+        path.write_bytes(b"123")
+        await files.read_file(path)
+    assert [key[0] for key in files._file_cache] == [
+        str(path.resolve()) for path in small[1:]
+    ]
+    assert files._file_cache_bytes == 6
+    files.clear_file_cache()
@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import respx
+from nonebug import App
+from pytest_mock import MockerFixture
+
+
+@respx.mock
+async def test_download_reuses_session(app: App):
+    from nonebot_plugin_saa.utils import http
+
+    route = respx.get("https://example.com/amiya.png")
+    route.mock(return_value=httpx.Response(200, content=b"amiya"))
+
+    resp = await http.download("https://example.com/amiya.png")
+    assert resp.status_code == 200
+    assert resp.content == b"amiya"
+    session = http._session
+    assert session is not None
+
+    await http.download("https://example.com/amiya.png")
+    assert http._session is session
+    assert route.call_count == 2
+
+    await http.close_session()
+    assert http._session is None
+
+
+@respx.mock
+async def test_download_host_limit(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa.utils import http
+
+    mocker.patch(
+        "nonebot_plugin_saa.config.plugin_config.http_max_connections_per_host", 2
+    )
+    await http.close_session()
+    http._host_semaphores.clear()
+
+    running = 0
+    max_running = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return httpx.Response(200, content=b"amiya")
+
+    respx.get("https://example.com/amiya.png").mock(side_effect=handler)
+
+    await asyncio.gather(
+        *(http.download("https://example.com/amiya.png") for _ in range(6))
+    )
+    assert max_running == 2
+    await http.close_session()
+
+
+@respx.mock
+async def test_session_replaced_on_new_loop(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa.utils import http
+
+    respx.get("https://example.com/amiya.png").mock(
+        return_value=httpx.Response(200, content=b"amiya")
+    )
+    # 事件循环改变时关闭旧的会话
+    stale = mocker.AsyncMock()
+    mocker.patch.object(http, "_session", stale)
+    mocker.patch.object(http, "_session_loop", object())
+    await http.download("https://example.com/amiya.png")
+    stale.close.assert_awaited_once()
+    assert http._session is not stale
+
+    # 会话已经存在时不再获取锁
+    mocker.patch.object(http, "_session_lock", mocker.MagicMock())
+    await http.download("https://example.com/amiya.png")
+    http._session_lock.__aenter__.assert_not_called()
+    await http.close_session()
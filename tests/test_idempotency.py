@@ -0,0 +1,146 @@
+import asyncio
+from pathlib import Path
+from functools import partial
+
+import pytest
+from nonebug import App
+from nonebot import get_adapter
+from pytest_mock import MockerFixture
+from nonebot.adapters.onebot.v11 import Bot, Adapter, Message
+from nonebot.adapters.onebot.v11.exception import ActionFailed
+
+
+def expect_send(ctx, group_id: int, message_id: int, exception=None):
+    ctx.should_call_api(
+        "send_msg",
+        data={
+            "message": Message("123"),
+            "group_id": group_id,
+            "message_type": "group",
+        },
+        result=None if exception else {"message_id": message_id},
+        exception=exception,
+    )
+
+
+async def test_send_to_idempotent(app: App):
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter))
+        send = partial(MessageFactory("123").send_to, bot=bot)
+
+        expect_send(ctx, 1, 10)
+        receipt = await send(TargetQQGroup(group_id=1), idempotency_key="k")
+        # 重复发送直接返回第一次的回执
+        assert await send(TargetQQGroup(group_id=1), idempotency_key="k") is receipt
+
+        # 不同的目标、不同的 key 或不传入 key 时正常发送
+        expect_send(ctx, 2, 20)
+        await send(TargetQQGroup(group_id=2), idempotency_key="k")
+        expect_send(ctx, 1, 11)
+        await send(TargetQQGroup(group_id=1), idempotency_key="k2")
+        expect_send(ctx, 1, 12)
+        await send(TargetQQGroup(group_id=1))
+
+        # 发送失败时不记录，可以重试
+        expect_send(ctx, 3, 0, ActionFailed(retcode=100))
+        with pytest.raises(ActionFailed):
+            await send(TargetQQGroup(group_id=3), idempotency_key="k")
+        expect_send(ctx, 3, 30)
+        receipt = await send(TargetQQGroup(group_id=3), idempotency_key="k")
+        assert receipt.message_id == 30
+
+
+async def test_concurrent_send(app: App):
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter))
+        expect_send(ctx, 1, 10)
+        receipts = await asyncio.gather(
+            *[
+                MessageFactory("123").send_to(
+                    TargetQQGroup(group_id=1), bot, idempotency_key="k"
+                )
+                for _ in range(5)
+            ]
+        )
+        assert all(receipt is receipts[0] for receipt in receipts)
+
+
+async def test_leader_cancelled(app: App):
+    from nonebot_plugin_saa import TargetQQGroup
+    from nonebot_plugin_saa.idempotency import send_idempotent
+
+    target = TargetQQGroup(group_id=1)
+    calls = []
+
+    async def send():
+        calls.append(len(calls))
+        await asyncio.sleep(0.01)
+        return calls[-1]
+
+    leader = asyncio.create_task(send_idempotent(target, "k", send))
+    await asyncio.sleep(0)
+    followers = [
+        asyncio.create_task(send_idempotent(target, "k", send)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    # 只有被取消的协程收到 CancelledError，由等待者之一重新发送
+    assert await asyncio.gather(*followers) == [1, 1, 1]
+    assert leader.cancelled()
+    assert calls == [0, 1]
+
+
+async def test_leader_cancelled_while_recording(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa.idempotency import send_idempotent
+    from nonebot_plugin_saa import TargetQQGroup, MemoryIdempotencyStore
+
+    class SlowStore(MemoryIdempotencyStore):
+        async def set(self, target, key, receipt):
+            await asyncio.sleep(0.01)
+            await super().set(target, key, receipt)
+
+    mocker.patch("nonebot_plugin_saa.idempotency.idempotency_store", SlowStore())
+    target = TargetQQGroup(group_id=1)
+    calls = []
+
+    async def send():
+        calls.append(len(calls))
+        return calls[-1]
+
+    leader = asyncio.create_task(send_idempotent(target, "k", send))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(send_idempotent(target, "k", send))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    # 已经发送成功，等待者直接使用回执
+    assert await follower == 0
+    assert calls == [0]
+
+
+async def test_sqlite_store(app: App, tmp_path: Path, mocker: MockerFixture):
+    from nonebot_plugin_saa.adapters.onebot_v11 import OB11Receipt
+    from nonebot_plugin_saa import TargetQQGroup, SqliteIdempotencyStore
+
+    path = tmp_path / "idempotency.db"
+    target = TargetQQGroup(group_id=1)
+    receipt = OB11Receipt(bot_id="1", message_id=10)
+
+    store = SqliteIdempotencyStore(path, ttl=60)
+    await store.set(target, "k", receipt)
+    store.close()
+
+    # 重启后仍然有效
+    store = SqliteIdempotencyStore(path, ttl=60)
+    assert await store.get(target, "k") == receipt
+    assert await store.get(target, "k2") is None
+    assert await store.get(TargetQQGroup(group_id=2), "k") is None
+
+    mocker.patch("time.time", return_value=10**10)
+    assert await store.get(target, "k") is None
+    store.close()
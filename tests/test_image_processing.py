@@ -0,0 +1,135 @@
+from io import BytesIO
+
+import pytest
+
+pytest.importorskip("PIL")
+from nonebug import App
+from PIL import Image as PILImage
+from pytest_mock import MockerFixture
+
+
+def make_image(format: str, size: tuple[int, int] = (100, 100), noise=False) -> bytes:
+    if noise:
+        image = PILImage.effect_noise(size, 100).convert("RGB")
+    else:
+        image = PILImage.new("RGB", size, (255, 0, 0))
+    buffer = BytesIO()
+    image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def _enable_preprocess(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa import image_processing
+
+    mocker.patch.object(image_processing, "enabled", True)
+    mocker.patch.dict(image_processing.image_limits)
+    image_processing.clear_cache()
+    yield
+    image_processing.clear_cache()
+
+
+async def test_disabled(app: App):
+    from nonebot_plugin_saa import Image, SupportedAdapters
+
+    data = make_image("BMP")
+    image = Image(data)
+    assert await image.read_bytes(SupportedAdapters.telegram) is data
+
+
+@pytest.mark.usefixtures("_enable_preprocess")
+async def test_convert_format():
+    from nonebot_plugin_saa.image_processing import _cache
+    from nonebot_plugin_saa import Image, SupportedAdapters
+
+    image = Image(make_image("BMP"))
+    result = await image.read_bytes(SupportedAdapters.telegram)
+    assert PILImage.open(BytesIO(result)).format == "JPEG"
+    # 同一张图片的处理结果会被缓存
+    cached = await Image(make_image("BMP")).read_bytes(SupportedAdapters.telegram)
+    assert cached is result
+    assert len(_cache) == 1
+
+    # 没有限制的适配器不处理
+    data = make_image("BMP")
+    assert await Image(data).read_bytes(SupportedAdapters.onebot_v12) is data
+
+
+@pytest.mark.usefixtures("_enable_preprocess")
+async def test_resize_and_compress():
+    from nonebot_plugin_saa.image_processing import preprocess_image
+    from nonebot_plugin_saa import ImageLimit, SupportedAdapters, register_image_limit
+
+    register_image_limit(SupportedAdapters.telegram, ImageLimit(max_side=50))
+    result = await preprocess_image(make_image("PNG"), SupportedAdapters.telegram)
+    image = PILImage.open(BytesIO(result))
+    assert image.format == "PNG"
+    assert max(image.size) == 50
+
+    data = make_image("JPEG", (500, 500), noise=True)
+    register_image_limit(
+        SupportedAdapters.telegram, ImageLimit(max_bytes=len(data) // 4)
+    )
+    result = await preprocess_image(data, SupportedAdapters.telegram)
+    assert len(result) <= len(data) // 4
+    assert PILImage.open(BytesIO(result)).format == "JPEG"
+
+    data = make_image("PNG", (500, 500), noise=True)
+    register_image_limit(
+        SupportedAdapters.telegram, ImageLimit(max_bytes=len(data) // 4)
+    )
+    result = await preprocess_image(data, SupportedAdapters.telegram)
+    assert len(result) <= len(data) // 4
+    assert PILImage.open(BytesIO(result)).format == "PNG"
+
+
+@pytest.mark.usefixtures("_enable_preprocess")
+async def test_invalid_image():
+    from nonebot_plugin_saa import SupportedAdapters
+    from nonebot_plugin_saa.image_processing import preprocess_image
+
+    data = b"not an image"
+    assert await preprocess_image(data, SupportedAdapters.telegram) is data
+
+
+@pytest.mark.usefixtures("_enable_preprocess")
+async def test_cache_size(mocker: MockerFixture):
+    from nonebot_plugin_saa import (
+        ImageLimit,
+        SupportedAdapters,
+        image_processing,
+        register_image_limit,
+    )
+
+    register_image_limit(SupportedAdapters.telegram, ImageLimit(max_side=50))
+    # 无需处理的图片不缓存
+    data = make_image("PNG", (10, 10))
+    assert (
+        await image_processing.preprocess_image(data, SupportedAdapters.telegram)
+        is data
+    )
+    assert not image_processing._cache
+
+    results = [
+        await image_processing.preprocess_image(
+            make_image("PNG", (100 + i, 100)), SupportedAdapters.telegram
+        )
+        for i in range(3)
+    ]
+    assert len(image_processing._cache) == 3
+    assert image_processing._cache_bytes == sum(len(result) for result in results)
+
+    # 缓存按总大小淘汰最久未使用的结果
+    mocker.patch(
+        "nonebot_plugin_saa.config.plugin_config.image_preprocess_cache_size",
+        len(results[1]) + len(results[2]),
+    )
+    await image_processing.preprocess_image(
+        make_image("PNG", (200, 100)), SupportedAdapters.telegram
+    )
+    assert len(image_processing._cache) <= 2
+    assert (
+        image_processing._cache_bytes
+        == sum(len(result) for result in image_processing._cache.values())
+        <= len(results[1]) + len(results[2])
+    )
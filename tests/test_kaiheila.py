@@ -400,3 +400,56 @@ async def test_list_targets(app: App, mocker: MockerFixture):
 
         send_target_private = TargetKaiheilaPrivate(user_id="1122")
         assert bot is get_bot(send_target_private)
+
+
+async def test_send_aggregated(app: App):
+    from nonebot import get_driver
+
+    from nonebot_plugin_saa.adapters.kaiheila import KaiheilaMessageId
+    from nonebot_plugin_saa import (
+        Text,
+        Reply,
+        SupportedAdapters,
+        TargetKaiheilaPrivate,
+        AggregatedMessageFactory,
+    )
+
+    async with app.test_api() as ctx:
+        adapter_obj = get_driver()._adapters[str(SupportedAdapters.kaiheila)]
+        bot = ctx.create_bot(base=Bot, adapter=adapter_obj, **kaiheila_kwargs())
+
+        send_target_private = TargetKaiheilaPrivate(user_id="3344")
+        ctx.should_call_api(
+            "directMessage_create",
+            data={"type": 1, "content": "123\n456", "target_id": "3344"},
+            result=MessageCreateReturn(
+                msg_id="adfadf", msg_timestamp=98190, nonce="12adjf"
+            ),
+        )
+        await AggregatedMessageFactory([Text("123"), Text("456")]).send_to(
+            send_target_private, bot
+        )
+
+        # 含有回复的消息无法合并，逐条发送
+        ctx.should_call_api(
+            "directMessage_create",
+            data={"type": 1, "content": "123", "target_id": "3344"},
+            result=MessageCreateReturn(
+                msg_id="adfadf", msg_timestamp=98190, nonce="12adjf"
+            ),
+        )
+        ctx.should_call_api(
+            "directMessage_create",
+            data={
+                "type": 1,
+                "content": "456",
+                "quote": "abcd",
+                "target_id": "3344",
+            },
+            result=MessageCreateReturn(
+                msg_id="adfadf", msg_timestamp=98190, nonce="12adjf"
+            ),
+        )
+        await AggregatedMessageFactory(
+            [Text("123"), Reply(KaiheilaMessageId(message_id="abcd")) + "456"]
+        ).send_to(send_target_private, bot)
@@ -0,0 +1,35 @@
+import sys
+import subprocess
+from pathlib import Path
+
+SCRIPT = """
+import sys
+import nonebot
+
+nonebot.init(driver="~fastapi")
+from nonebot.adapters.onebot.v11 import Adapter
+
+nonebot.get_driver().register_adapter(Adapter)
+
+import nonebot_plugin_saa
+from nonebot_plugin_saa.registries import MessageId
+
+assert "nonebot_plugin_saa.adapters.onebot_v11" in sys.modules
+assert "nonebot.adapters.telegram" not in sys.modules
+assert "nonebot_plugin_saa.adapters.telegram" not in sys.modules
+
+message_id = MessageId.deserialize(
+    {"adapter_name": "Telegram", "message_id": 1, "chat_id": 2}
+)
+assert type(message_id).__name__ == "TelegramMessageId"
+assert "nonebot_plugin_saa.adapters.telegram" in sys.modules
+"""
+
+
+def test_adapters_loaded_lazily():
+    # 需要全新的解释器来检查导入了哪些模块
+    subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=Path(__file__).parent.parent,
+        check=True,
+    )
@@ -1,4 +1,5 @@
 from io import BytesIO
+from pathlib import Path
 
 import pytest
 
@@ -63,6 +64,59 @@ def test_message_segment_to_str(app: App):
     )
 
 
+async def test_image_read_bytes(app: App, tmp_path: Path):
+    from nonebot_plugin_saa import Image
+
+    image_path = tmp_path / "image.png"
+    image_path.write_bytes(b"123")
+    i_path = Image(image_path)
+    data = await i_path.read_bytes()
+    assert data == b"123"
+    # 文件只读取一次，之后的构建共享同一份数据
+    image_path.write_bytes(b"456")
+    assert await i_path.read_bytes() is data
+
+    i_bytesio = Image(BytesIO(b"123"))
+    assert await i_path.read_bytes() == await i_bytesio.read_bytes()
+    assert await i_bytesio.read_bytes() is await i_bytesio.read_bytes()
+
+    raw = b"123"
+    assert await Image(raw).read_bytes() is raw
+
+    with pytest.raises(TypeError):
+        await Image("http://example.com/abc.png").read_bytes()
+
+
+async def test_image_metadata(app: App):
+    import hashlib
+    import importlib.util
+
+    from nonebot_plugin_saa import Image
+
+    # 2x1 的 PNG 图片
+    png = bytes.fromhex(
+        "89504e470d0a1a0a0000000d4948445200000002000000010802000000"
+        "7b40e8dd0000000f49444154789c6360606060606000000007000157"
+        "2162190000000049454e44ae426082"
+    )
+    image = Image(BytesIO(png))
+    meta = await image.metadata()
+    assert meta.mime == "image/png"
+    assert meta.extension == "png"
+    assert meta.size == len(png)
+    assert meta.sha256 == hashlib.sha256(png).hexdigest()
+    if importlib.util.find_spec("PIL"):
+        assert (meta.width, meta.height) == (2, 1)
+    assert await image.metadata() is meta
+
+    meta = await Image(b"123").metadata()
+    assert meta.mime is None
+    assert meta.extension is None
+
+    with pytest.raises(TypeError):
+        await Image("http://example.com/abc.png").metadata()
+
+
 def test_message_assamble():
     from nonebot_plugin_saa import Text, MessageFactory
 
@@ -0,0 +1,113 @@
+import pytest
+from nonebug import App
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def _reset_metrics():
+    import nonebot_plugin_saa.metrics as metrics
+    from nonebot_plugin_saa.utils.instrumentation import span_hooks
+
+    yield
+    span_hooks.clear()
+    metrics.metrics = None
+    metrics._prometheus_path = None
+
+
+@pytest.mark.usefixtures("_reset_metrics")
+async def test_send_spans(app: App):
+    from nonebot import get_adapter
+    from nonebot.adapters.onebot.v11 import Bot, Adapter, Message, MessageSegment
+
+    from nonebot_plugin_saa import (
+        Text,
+        Image,
+        TargetQQGroup,
+        MessageFactory,
+        enable_metrics,
+        register_span_hook,
+    )
+
+    spans = []
+    register_span_hook(spans.append)
+    metrics = enable_metrics()
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter))
+        ctx.should_call_api(
+            "send_msg",
+            data={
+                "message": Message(
+                    [MessageSegment.text("123"), MessageSegment.image(b"abcd")]
+                ),
+                "group_id": 2233,
+                "message_type": "group",
+            },
+            result={"message_id": 1},
+        )
+        await MessageFactory([Text("123"), Image(b"abcd")]).send_to(
+            TargetQQGroup(group_id=2233), bot
+        )
+
+    assert [(span.name, span.segment_type) for span in spans] == [
+        ("build", "Text"),
+        ("build", "Image"),
+        ("send", None),
+    ]
+    send_span = spans[-1]
+    assert send_span.adapter == "OneBot V11"
+    assert send_span.platform == "QQ Group"
+    assert send_span.bytes == 4
+    assert send_span.outcome == "ok"
+
+    text = metrics.render_prometheus()
+    assert (
+        'saa_spans_total{span="send",adapter="OneBot V11",platform="QQ Group",'
+        'outcome="ok"} 1'
+    ) in text
+    assert (
+        'saa_span_duration_seconds_count{span="build",adapter="OneBot V11",'
+        'segment_type="Image"} 1'
+    ) in text
+    assert (
+        'saa_uploaded_bytes_total{span="send",adapter="OneBot V11",'
+        'platform="QQ Group"} 4'
+    ) in text
+
+
+@pytest.mark.usefixtures("_reset_metrics")
+async def test_error_span(app: App):
+    from nonebot_plugin_saa.auto_select_bot import get_bot
+    from nonebot_plugin_saa import TargetQQGroup, register_span_hook
+
+    spans = []
+    register_span_hook(spans.append)
+
+    with pytest.raises(RuntimeError):
+        get_bot(TargetQQGroup(group_id=2233))
+
+    assert len(spans) == 1
+    assert spans[0].name == "get_bot"
+    assert spans[0].outcome == "error"
+    assert isinstance(spans[0].exception, RuntimeError)
+
+
+@pytest.mark.usefixtures("_reset_metrics")
+async def test_prometheus_exporter(app: App, mocker: MockerFixture):
+    from nonebot import get_driver
+
+    from nonebot_plugin_saa import enable_metrics
+
+    setup_http_server = mocker.spy(get_driver(), "setup_http_server")
+    metrics = enable_metrics(prometheus_path="/saa/metrics")
+    # 重复调用不会重复注册路由
+    assert enable_metrics(prometheus_path="/saa/metrics") is metrics
+    assert enable_metrics(prometheus_path="/saa/other") is metrics
+    setup_http_server.assert_called_once()
+
+    async with app.test_server() as ctx:
+        client = ctx.get_client()
+        resp = await client.get("/saa/metrics")
+        assert resp.status_code == 200
+        assert resp.text == metrics.render_prometheus()
+        assert (await client.get("/saa/other")).status_code == 404
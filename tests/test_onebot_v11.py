@@ -285,6 +285,60 @@ async def test_send_aggreted_ob11(app: App):
         ctx.receive_event(bot, msg_event)
 
 
+async def test_send_aggreted_ob11_split(app: App):
+    from nonebot.adapters.onebot.v11 import Message, MessageSegment
+
+    from nonebot_plugin_saa.adapters.onebot_v11 import OB11_FORWARD_NODE_LIMIT
+    from nonebot_plugin_saa import Text, TargetQQGroup, AggregatedMessageFactory
+
+    texts = [str(i) for i in range(OB11_FORWARD_NODE_LIMIT + 1)]
+
+    def nodes(contents: list[str]) -> Message:
+        return Message(
+            [
+                MessageSegment.node_custom(
+                    user_id=9988, nickname="potato", content=Message(content)
+                )
+                for content in contents
+            ]
+        )
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="9988")
+        target = TargetQQGroup(group_id=3344)
+
+        # 同一连接内只获取一次登录信息
+        ctx.should_call_api(
+            "get_login_info",
+            data={},
+            result={"user_id": 9988, "nickname": "potato"},
+        )
+        ctx.should_call_api(
+            "send_group_forward_msg",
+            data={"messages": nodes(texts[:2]), "group_id": 3344},
+            result=None,
+        )
+        await AggregatedMessageFactory([Text(t) for t in texts[:2]]).send_to(
+            target, bot
+        )
+
+        # 超出节点数上限时拆分为多条合并转发消息
+        ctx.should_call_api(
+            "send_group_forward_msg",
+            data={"messages": nodes(texts[:-1]), "group_id": 3344},
+            result={"message_id": 1, "forward_id": "abc"},
+        )
+        ctx.should_call_api(
+            "send_group_forward_msg",
+            data={"messages": nodes(texts[-1:]), "group_id": 3344},
+            result={"message_id": 2, "forward_id": "def"},
+        )
+        receipt = await AggregatedMessageFactory([Text(t) for t in texts]).send_to(
+            target, bot
+        )
+        assert receipt.raw == [1, 2]
+
+
 async def test_list_targets(app: App, mocker: MockerFixture):
     from nonebot_plugin_saa import TargetQQGroup, TargetQQPrivate
     from nonebot_plugin_saa.auto_select_bot import BOT_CACHE, get_bot, refresh_bots
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+from nonebug import App
+
+
+async def test_profile_send(app: App, tmp_path: Path):
+    from nonebot import get_adapter
+    from nonebot.adapters.onebot.v11 import Bot, Adapter, Message, MessageSegment
+
+    from nonebot_plugin_saa.profiling import profile
+    from nonebot_plugin_saa.utils.instrumentation import span_hooks
+    from nonebot_plugin_saa import Text, Image, TargetQQGroup, MessageFactory
+
+    trace_file = tmp_path / "trace.json"
+    target = TargetQQGroup(group_id=2233)
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter))
+        ctx.should_call_api(
+            "send_msg",
+            data={
+                "message": Message(
+                    [MessageSegment.text("123"), MessageSegment.image(b"abcd")]
+                ),
+                "group_id": 2233,
+                "message_type": "group",
+            },
+            result={"message_id": 1},
+        )
+        with profile(trace_file) as profiler:
+            await MessageFactory([Text("123"), Image(b"abcd")]).send_to(target, bot)
+
+        # 退出 profile 后的发送不再记录
+        ctx.should_call_api(
+            "send_msg",
+            data={
+                "message": Message("123"),
+                "group_id": 2233,
+                "message_type": "group",
+            },
+            result={"message_id": 2},
+        )
+        await MessageFactory(Text("123")).send_to(target, bot)
+
+    assert not span_hooks
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    assert events == profiler.events
+    assert [(e["cat"], e["name"]) for e in events] == [
+        ("saa", "build"),
+        ("saa", "build"),
+        ("api", "send_msg"),
+        ("saa", "send"),
+    ]
+    send_event = events[-1]
+    api_event = events[-2]
+    assert send_event["ph"] == "X"
+    assert send_event["args"]["bytes"] == 4
+    # API 调用的时间段包含在发送的时间段内
+    assert send_event["ts"] <= api_event["ts"]
+    assert api_event["ts"] + api_event["dur"] <= send_event["ts"] + send_event["dur"]
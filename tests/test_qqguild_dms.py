@@ -0,0 +1,164 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from nonebug import App
+from nonebot import get_adapter
+from pytest_mock import MockerFixture
+from nonebot.adapters.qq import Bot, Adapter
+from nonebot.adapters.qq.config import BotInfo
+
+
+@pytest.fixture
+def mock_dms(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa.utils import SupportedAdapters
+    from nonebot_plugin_saa.registries.qqguild_dms import qqguild_dms_map
+
+    calls = []
+
+    async def qqguild_dms(target, bot):
+        calls.append(target)
+        await asyncio.sleep(0.01)
+        return 3333
+
+    mocker.patch.dict(qqguild_dms_map, {SupportedAdapters.qq: qqguild_dms})
+    return calls
+
+
+async def test_single_flight(app: App, mock_dms: list):
+    from nonebot_plugin_saa import TargetQQGuildDirect
+    from nonebot_plugin_saa.registries import QQGuildDMSManager
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(
+            base=Bot,
+            adapter=get_adapter(Adapter),
+            bot_info=BotInfo(id="3344", token="", secret=""),
+        )
+        target = TargetQQGuildDirect(recipient_id=1111, source_guild_id=2222)
+        guild_ids = await asyncio.gather(
+            *(QQGuildDMSManager.aget_guild_id(target, bot) for _ in range(10))
+        )
+
+    assert guild_ids == [3333] * 10
+    assert mock_dms == [target]
+    assert QQGuildDMSManager.get_guild_id(target) == 3333
+    assert not QQGuildDMSManager._inflight
+
+
+async def test_single_flight_exception(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGuildDirect
+    from nonebot_plugin_saa.utils import SupportedAdapters
+    from nonebot_plugin_saa.registries import QQGuildDMSManager
+    from nonebot_plugin_saa.registries.qqguild_dms import qqguild_dms_map
+
+    async def qqguild_dms(target, bot):
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    mocker.patch.dict(qqguild_dms_map, {SupportedAdapters.qq: qqguild_dms})
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(
+            base=Bot,
+            adapter=get_adapter(Adapter),
+            bot_info=BotInfo(id="3344", token="", secret=""),
+        )
+        target = TargetQQGuildDirect(recipient_id=1111, source_guild_id=2222)
+        results = await asyncio.gather(
+            *(QQGuildDMSManager.aget_guild_id(target, bot) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not QQGuildDMSManager._inflight
+    with pytest.raises(KeyError):
+        QQGuildDMSManager.get_guild_id(target)
+
+
+async def test_single_flight_leader_cancelled(app: App, mock_dms: list):
+    from nonebot_plugin_saa import TargetQQGuildDirect
+    from nonebot_plugin_saa.registries import QQGuildDMSManager
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(
+            base=Bot,
+            adapter=get_adapter(Adapter),
+            bot_info=BotInfo(id="3344", token="", secret=""),
+        )
+        target = TargetQQGuildDirect(recipient_id=1111, source_guild_id=2222)
+        leader = asyncio.create_task(QQGuildDMSManager.aget_guild_id(target, bot))
+        await asyncio.sleep(0)
+        followers = [
+            asyncio.create_task(QQGuildDMSManager.aget_guild_id(target, bot))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        # 只有被取消的协程收到 CancelledError，其余协程重新获取
+        assert await asyncio.gather(*followers) == [3333] * 3
+        assert leader.cancelled()
+        assert mock_dms == [target, target]
+    assert not QQGuildDMSManager._inflight
+
+
+async def test_cache_ttl_and_size(app: App, mock_dms: list, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGuildDirect
+    from nonebot_plugin_saa.registries import QQGuildDMSManager
+
+    mocker.patch("nonebot_plugin_saa.config.plugin_config.qqguild_dms_cache_size", 2)
+    mocker.patch("nonebot_plugin_saa.config.plugin_config.qqguild_dms_cache_ttl", 60)
+    mocked_time = mocker.patch(
+        "nonebot_plugin_saa.registries.qqguild_dms.time.time", return_value=1000
+    )
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(
+            base=Bot,
+            adapter=get_adapter(Adapter),
+            bot_info=BotInfo(id="3344", token="", secret=""),
+        )
+        targets = [
+            TargetQQGuildDirect(recipient_id=i, source_guild_id=2222) for i in range(3)
+        ]
+        for target in targets:
+            await QQGuildDMSManager.aget_guild_id(target, bot)
+        assert list(QQGuildDMSManager._cache) == targets[1:]
+
+        await QQGuildDMSManager.aget_guild_id(targets[1], bot)
+        assert len(mock_dms) == 3
+
+        mocked_time.return_value = 1061
+        with pytest.raises(KeyError):
+            QQGuildDMSManager.get_guild_id(targets[1])
+        await QQGuildDMSManager.aget_guild_id(targets[1], bot)
+        assert len(mock_dms) == 4
+
+
+async def test_sqlite_backend(app: App, mock_dms: list, tmp_path: Path):
+    from nonebot_plugin_saa import TargetQQGuildDirect
+    from nonebot_plugin_saa.registries import QQGuildDMSManager, SqliteQQGuildDMSBackend
+
+    backend = SqliteQQGuildDMSBackend(tmp_path / "dms.db")
+    QQGuildDMSManager.set_backend(backend)
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(
+            base=Bot,
+            adapter=get_adapter(Adapter),
+            bot_info=BotInfo(id="3344", token="", secret=""),
+        )
+        target = TargetQQGuildDirect(recipient_id=1111, source_guild_id=2222)
+        assert await QQGuildDMSManager.aget_guild_id(target, bot) == 3333
+        assert len(mock_dms) == 1
+
+        # 模拟重启后内存缓存为空
+        QQGuildDMSManager._cache.clear()
+        assert await QQGuildDMSManager.aget_guild_id(target, bot) == 3333
+        assert len(mock_dms) == 1
+
+    stored = await backend.get(target)
+    assert stored is not None
+    assert stored[0] == 3333
+    backend.close()
@@ -1,3 +1,6 @@
+from nonebug import App
+
+
 async def test_deserialize_receipt():
     from nonebot_plugin_saa.registries import Receipt
     from nonebot_plugin_saa.utils import SupportedAdapters
@@ -8,3 +11,82 @@ async def test_deserialize_receipt():
         "adapter_name": SupportedAdapters.onebot_v11,
     }
     assert type(Receipt.deserialize(data)).__name__ == "OB11Receipt"
+
+
+async def test_deserialize_aggregated_receipt():
+    from nonebot.compat import model_dump
+
+    from nonebot_plugin_saa.utils import SupportedAdapters
+    from nonebot_plugin_saa.registries import Receipt, AggregatedReceipt
+
+    data = {
+        "bot_id": "123",
+        "adapter_name": SupportedAdapters.onebot_v11,
+        "aggregated": True,
+        "receipts": [
+            {
+                "bot_id": "123",
+                "message_id": 1238771,
+                "adapter_name": SupportedAdapters.onebot_v11,
+            },
+            {
+                "bot_id": "123",
+                "message_id": 1238772,
+                "adapter_name": SupportedAdapters.onebot_v11,
+            },
+        ],
+    }
+    receipt = Receipt.deserialize(data)
+    assert isinstance(receipt, AggregatedReceipt)
+    assert [type(r).__name__ for r in receipt.receipts] == ["OB11Receipt"] * 2
+    assert receipt.raw == [1238771, 1238772]
+    assert Receipt.deserialize(model_dump(receipt)) == receipt
+
+
+async def test_revoke_many(app: App):
+    from nonebot import get_adapter
+    from nonebot.adapters.onebot.v11 import Bot, Adapter, ActionFailed
+
+    from nonebot_plugin_saa.utils import SupportedAdapters
+    from nonebot_plugin_saa.adapters.onebot_v11 import OB11Receipt
+    from nonebot_plugin_saa.registries import AggregatedReceipt, revoke_many
+
+    async with app.test_api() as ctx:
+        ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="123")
+        receipt1 = OB11Receipt(bot_id="123", message_id=1)
+        receipt2 = OB11Receipt(bot_id="123", message_id=2)
+        receipt3 = AggregatedReceipt(
+            adapter_name=SupportedAdapters.onebot_v11,
+            bot_id="123",
+            receipts=[
+                OB11Receipt(bot_id="123", message_id=3),
+                OB11Receipt(bot_id="123", message_id=4),
+            ],
+        )
+        receipt4 = OB11Receipt(bot_id="456", message_id=5)
+        # 协议端没有返回消息 id 时，合并发送的回执为空
+        receipt5 = AggregatedReceipt(
+            adapter_name=SupportedAdapters.onebot_v11, bot_id="123", receipts=[]
+        )
+
+        ctx.should_call_api("delete_msg", data={"message_id": 1}, result=None)
+        ctx.should_call_api(
+            "delete_msg", data={"message_id": 2}, exception=ActionFailed()
+        )
+        ctx.should_call_api("delete_msg", data={"message_id": 3}, result=None)
+        ctx.should_call_api("delete_msg", data={"message_id": 4}, result=None)
+        results = await revoke_many(
+            [receipt1, receipt2, receipt3, receipt4, receipt5], concurrency=2
+        )
+
+    assert [result.receipt for result in results] == [
+        receipt1,
+        receipt2,
+        receipt3,
+        receipt4,
+        receipt5,
+    ]
+    assert [result.success for result in results] == [True, False, True, False, False]
+    assert isinstance(results[4].exception, NotImplementedError)
+    assert isinstance(results[1].exception, ActionFailed)
+    assert results[2].result == [None, None]
@@ -0,0 +1,139 @@
+import time
+from pathlib import Path
+
+import pytest
+from nonebug import App
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def _disable_receipt_store():
+    import nonebot_plugin_saa.receipt_store as receipt_store
+
+    yield
+    receipt_store.receipt_store = None
+
+
+@pytest.mark.usefixtures("_disable_receipt_store")
+async def test_record_send_receipt(app: App):
+    from nonebot import get_adapter
+    from nonebot.adapters.onebot.v11 import Bot, Adapter, Message
+
+    from nonebot_plugin_saa.adapters.onebot_v11 import OB11MessageId
+    from nonebot_plugin_saa import (
+        Text,
+        TargetQQGroup,
+        MessageFactory,
+        enable_receipt_store,
+    )
+
+    store = enable_receipt_store()
+    target = TargetQQGroup(group_id=2233)
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter))
+        for message_id in (1, 2, 3):
+            ctx.should_call_api(
+                "send_msg",
+                data={
+                    "message": Message("123"),
+                    "group_id": 2233,
+                    "message_type": "group",
+                },
+                result={"message_id": message_id},
+            )
+            await MessageFactory(Text("123")).send_to(target, bot)
+
+    receipt = await store.get(OB11MessageId(message_id=2))
+    assert receipt
+    assert receipt.raw == 2
+    assert await store.get(OB11MessageId(message_id=4)) is None
+    assert [r.raw for r in await store.last(target, 2)] == [3, 2]
+    assert await store.last(TargetQQGroup(group_id=3344)) == []
+
+
+async def test_memory_store_lru_and_ttl(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup, MemoryReceiptStore
+    from nonebot_plugin_saa.adapters.onebot_v11 import OB11Receipt, OB11MessageId
+
+    store = MemoryReceiptStore(max_size=2, ttl=10)
+    target = TargetQQGroup(group_id=2233)
+    for message_id in (1, 2):
+        await store.add(target, OB11Receipt(bot_id="1", message_id=message_id))
+    # 访问过的回执不会被优先淘汰
+    assert await store.get(OB11MessageId(message_id=1))
+    await store.add(target, OB11Receipt(bot_id="1", message_id=3))
+    assert await store.get(OB11MessageId(message_id=2)) is None
+    assert [r.raw for r in await store.last(target, 5)] == [3, 1]
+
+    mocker.patch(
+        "nonebot_plugin_saa.receipt_store.time.time", return_value=time.time() + 20
+    )
+    assert await store.last(target, 5) == []
+    assert await store.get(OB11MessageId(message_id=3)) is None
+
+
+async def test_sqlite_store(app: App, tmp_path: Path):
+    from nonebot_plugin_saa.utils import SupportedAdapters
+    from nonebot_plugin_saa.registries import AggregatedReceipt
+    from nonebot_plugin_saa import TargetQQGroup, SqliteReceiptStore
+    from nonebot_plugin_saa.adapters.onebot_v11 import OB11Receipt, OB11MessageId
+
+    db = tmp_path / "receipts.db"
+    target = TargetQQGroup(group_id=2233)
+    store = SqliteReceiptStore(db, ttl=None)
+    await store.add(target, OB11Receipt(bot_id="1", message_id=1))
+    await store.add(
+        target,
+        AggregatedReceipt(
+            adapter_name=SupportedAdapters.onebot_v11,
+            bot_id="1",
+            receipts=[
+                OB11Receipt(bot_id="1", message_id=2),
+                OB11Receipt(bot_id="1", message_id=3),
+            ],
+        ),
+    )
+    store.close()
+
+    store = SqliteReceiptStore(db, ttl=None)
+    receipt = await store.get(OB11MessageId(message_id=3))
+    assert isinstance(receipt, AggregatedReceipt)
+    assert receipt.raw == [2, 3]
+    assert [r.raw for r in await store.last(target, 5)] == [[2, 3], 1]
+
+    store.ttl = -1
+    await store.prune()
+    store.ttl = None
+    assert await store.last(target, 5) == []
+    assert await store.get(OB11MessageId(message_id=1)) is None
+    store.close()
+
+
+async def test_index_all_message_ids(app: App):
+    pytest.importorskip("nonebot.adapters.telegram")
+    from nonebot.compat import type_validate_python
+    from nonebot.adapters.telegram.model import Message as MessageModel
+
+    from tests.test_telegram import CHAT_ID, FAKE_MESSAGE_RETURN
+    from nonebot_plugin_saa import MemoryReceiptStore, TargetTelegramCommon
+    from nonebot_plugin_saa.adapters.telegram import TelegramReceipt, TelegramMessageId
+
+    store = MemoryReceiptStore()
+    # 媒体组等包含多条消息的回执，每条消息都可以找到回执
+    receipt = TelegramReceipt(
+        bot_id="1",
+        chat_id=CHAT_ID,
+        messages=[
+            type_validate_python(
+                MessageModel, {**FAKE_MESSAGE_RETURN, "message_id": message_id}
+            )
+            for message_id in (1, 2)
+        ],
+    )
+    await store.add(TargetTelegramCommon(chat_id=CHAT_ID), receipt)
+    for message_id in (1, 2):
+        assert (
+            await store.get(TelegramMessageId(message_id=message_id, chat_id=CHAT_ID))
+            == receipt
+        )
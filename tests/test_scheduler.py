@@ -0,0 +1,232 @@
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+from nonebug import App
+from nonebot import get_adapter
+from pytest_mock import MockerFixture
+from nonebot.adapters.onebot.v11 import Bot, Adapter, Message
+
+
+async def test_schedule_order_and_cancel(app: App, mocker: MockerFixture):
+    from nonebot_plugin_saa.scheduler import SendScheduler
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory
+
+    sent = []
+
+    async def send_to(self, target, bot=None, *, idempotency_key=None):
+        # 触发时才选择 Bot
+        assert bot is None
+        sent.append(str(self))
+
+    mocker.patch.object(MessageFactory, "send_to", send_to)
+    scheduler = SendScheduler()
+    target = TargetQQGroup(group_id=1)
+
+    await scheduler.schedule(MessageFactory("a"), target, delay=0.15)
+    await scheduler.schedule(MessageFactory("b"), target, delay=0.05)
+    job = await scheduler.schedule(MessageFactory("c"), target, delay=0.1)
+    assert [job.message for job in scheduler.jobs] == [
+        MessageFactory("b"),
+        MessageFactory("c"),
+        MessageFactory("a"),
+    ]
+    assert job.cancel()
+    assert not job.cancel()
+
+    await asyncio.sleep(0.3)
+    assert sent == ["b", "a"]
+    assert not scheduler.jobs
+    await scheduler.close()
+
+
+async def test_schedule_arguments(app: App):
+    from nonebot_plugin_saa.scheduler import SendScheduler
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory
+
+    scheduler = SendScheduler()
+    target = TargetQQGroup(group_id=1)
+    with pytest.raises(ValueError, match="exactly one"):
+        await scheduler.schedule(MessageFactory("a"), target)
+    with pytest.raises(ValueError, match="exactly one"):
+        await scheduler.schedule(MessageFactory("a"), target, at=1.0, delay=1.0)
+
+
+async def test_fire_with_bot_id(app: App):
+    from nonebot_plugin_saa.scheduler import send_scheduler
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory, schedule_send
+
+    async with app.test_api() as ctx:
+        ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), self_id="42")
+        ctx.should_call_api(
+            "send_msg",
+            data={
+                "message": Message("123"),
+                "group_id": 1,
+                "message_type": "group",
+            },
+            result={"message_id": 1},
+        )
+        await schedule_send(
+            MessageFactory("123"), TargetQQGroup(group_id=1), delay=0, bot_id="42"
+        )
+        await asyncio.sleep(0.05)
+    await send_scheduler.close()
+
+
+async def test_sqlite_store(app: App, tmp_path: Path, mocker: MockerFixture):
+    from nonebot_plugin_saa.utils import SupportedPlatform
+    from nonebot_plugin_saa.registries import PlatformTarget
+    from nonebot_plugin_saa.scheduler import ScheduledSend, SendScheduler
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory, SqliteScheduleStore
+
+    sent = []
+
+    async def send_to(self, target, bot=None, *, idempotency_key=None):
+        sent.append((str(self), target, idempotency_key))
+
+    mocker.patch.object(MessageFactory, "send_to", send_to)
+    # 其他测试可能清空或覆盖了反序列化的注册表
+    mocker.patch.dict(
+        PlatformTarget._deserializer_dict,
+        {SupportedPlatform.qq_group: TargetQQGroup},
+    )
+    path = tmp_path / "scheduled.db"
+    target = TargetQQGroup(group_id=1)
+
+    store = SqliteScheduleStore(path)
+    scheduler = SendScheduler()
+    scheduler.set_store(store)
+    job = await scheduler.schedule(
+        MessageFactory("later"), target, at=time.time() + 3600, idempotency_key="k"
+    )
+    cancelled = await scheduler.schedule(MessageFactory("x"), target, delay=3600)
+    cancelled.cancel()
+    await asyncio.sleep(0.05)
+    await scheduler.close()
+
+    # 重启前已经到期的任务，恢复后立即发送
+    await store.add(
+        ScheduledSend(
+            id="past",
+            when=time.time() - 10,
+            message=MessageFactory("now"),
+            target=target,
+        )
+    )
+
+    scheduler = SendScheduler()
+    scheduler.set_store(store)
+    await scheduler.load()
+    assert [(j.id, j.message, j.idempotency_key) for j in scheduler.jobs] == [
+        ("past", MessageFactory("now"), None),
+        (job.id, MessageFactory("later"), "k"),
+    ]
+    await asyncio.sleep(0.05)
+    assert sent == [("now", target, None)]
+    assert [j.id for j in await store.load()] == [job.id]
+    await scheduler.close()
+    store.close()
+
+
+async def test_close_keeps_inflight_job(
+    app: App, tmp_path: Path, mocker: MockerFixture
+):
+    from nonebot_plugin_saa.scheduler import SendScheduler
+    from nonebot_plugin_saa.utils import SupportedPlatform
+    from nonebot_plugin_saa.registries import PlatformTarget
+    from nonebot_plugin_saa import TargetQQGroup, MessageFactory, SqliteScheduleStore
+
+    started = asyncio.Event()
+
+    async def send_to(self, target, bot=None, *, idempotency_key=None):
+        started.set()
+        await asyncio.sleep(10)
+
+    mocker.patch.object(MessageFactory, "send_to", send_to)
+    mocker.patch.dict(
+        PlatformTarget._deserializer_dict,
+        {SupportedPlatform.qq_group: TargetQQGroup},
+    )
+    store = SqliteScheduleStore(tmp_path / "scheduled.db")
+    scheduler = SendScheduler()
+    scheduler.set_store(store)
+    job = await scheduler.schedule(
+        MessageFactory("now"), TargetQQGroup(group_id=1), delay=0
+    )
+    await started.wait()
+    await scheduler.close()
+
+    # 关闭时正在发送的任务保留在存储中，重启后重新发送
+    assert [j.id for j in await store.load()] == [job.id]
+    store.close()
+
+
+async def test_sqlite_store_custom_segment(
+    app: App, tmp_path: Path, mocker: MockerFixture
+):
+    from nonebot.adapters.onebot.v11 import MessageSegment
+
+    from nonebot_plugin_saa.scheduler import SendScheduler
+    from nonebot_plugin_saa.utils import SupportedPlatform
+    from nonebot_plugin_saa.registries import PlatformTarget
+    from nonebot_plugin_saa import (
+        Text,
+        Custom,
+        TargetQQGroup,
+        MessageFactory,
+        SupportedAdapters,
+        SqliteScheduleStore,
+    )
+
+    mocker.patch.dict(
+        PlatformTarget._deserializer_dict,
+        {SupportedPlatform.qq_group: TargetQQGroup},
+    )
+    store = SqliteScheduleStore(tmp_path / "scheduled.db")
+    scheduler = SendScheduler()
+    scheduler.set_store(store)
+    target = TargetQQGroup(group_id=1)
+    adapter = SupportedAdapters.onebot_v11
+
+    # 固定的消息段可以保存
+    message = MessageFactory(
+        [
+            Custom({adapter: MessageSegment.text("custom")}),
+            Text("text").overwrite(adapter, MessageSegment.face(1)),
+        ]
+    )
+    await scheduler.schedule(message, target, delay=3600)
+    (job,) = await store.load()
+    custom, text = job.message
+    assert custom._custom_builders[adapter]() == MessageSegment.text("custom")
+    assert text._custom_builders[adapter]() == MessageSegment.face(1)
+
+    # 无法保存时不添加任务
+    with pytest.raises(TypeError, match="pickle"):
+        await scheduler.schedule(
+            MessageFactory(Custom({adapter: lambda: MessageSegment.text("x")})),
+            target,
+            delay=3600,
+        )
+    assert len(scheduler.jobs) == 1
+    assert len(await store.load()) == 1
+    await scheduler.close()
+    store.close()
+
+
+async def test_set_schedule_store_registers_no_hook(app: App, mocker: MockerFixture):
+    from nonebot import get_driver
+
+    from nonebot_plugin_saa import set_schedule_store
+    from nonebot_plugin_saa.scheduler import ScheduleStore, send_scheduler
+
+    mocker.patch.object(send_scheduler, "_store", None)
+    on_startup = mocker.spy(get_driver(), "on_startup")
+    store = mocker.MagicMock(spec=ScheduleStore)
+    # 多次设置存储不会重复注册启动时恢复任务的钩子
+    set_schedule_store(store)
+    set_schedule_store(store)
+    on_startup.assert_not_called()
+    assert send_scheduler._store is store
@@ -429,3 +429,96 @@ async def test_receipt(app: App):
             result=True,
         )
         await receipt.revoke()
+
+
+async def test_send_aggregated(app: App):
+    from nonebot import get_driver
+    from nonebot.adapters.telegram import Bot
+    from nonebot.adapters.telegram.model import InputMediaPhoto
+
+    from nonebot_plugin_saa import (
+        Text,
+        Image,
+        SupportedAdapters,
+        TargetTelegramCommon,
+        AggregatedMessageFactory,
+    )
+
+    async with app.test_api() as ctx:
+        adapter_obj = get_driver()._adapters[str(SupportedAdapters.telegram)]
+        bot = ctx.create_bot(base=Bot, adapter=adapter_obj, config=BOT_CONFIG)
+        target_common = TargetTelegramCommon(chat_id=CHAT_ID)
+
+        ctx.should_call_api(
+            "send_message",
+            {**SEND_MESSAGE_PARAMS, "text": "123\n456"},
+            FAKE_MESSAGE_RETURN,
+        )
+        await AggregatedMessageFactory([Text("123"), Text("456")]).send_to(
+            target_common, bot
+        )
+
+        ctx.should_call_api(
+            "send_media_group",
+            {
+                **SEND_MEDIA_GROUP_PARAMS,
+                "media": [
+                    InputMediaPhoto(media="114514"),
+                    InputMediaPhoto(media="1919810"),
+                ],
+            },
+            [FAKE_MESSAGE_RETURN, FAKE_MESSAGE_RETURN],
+        )
+        await AggregatedMessageFactory([Image("114514"), Image("1919810")]).send_to(
+            target_common, bot
+        )
+
+        # 超出单条消息长度限制时逐条发送
+        long_text = "1" * 4096
+        ctx.should_call_api(
+            "send_message",
+            {**SEND_MESSAGE_PARAMS, "text": long_text},
+            FAKE_MESSAGE_RETURN,
+        )
+        ctx.should_call_api(
+            "send_message",
+            {**SEND_MESSAGE_PARAMS, "text": "456"},
+            FAKE_MESSAGE_RETURN,
+        )
+        await AggregatedMessageFactory([Text(long_text), Text("456")]).send_to(
+            target_common, bot
+        )
+
+
+async def test_revoke_many(app: App):
+    from nonebot import get_driver
+    from nonebot.adapters.telegram import Bot
+
+    from nonebot_plugin_saa import (
+        MessageFactory,
+        SupportedAdapters,
+        TargetTelegramCommon,
+        revoke_many,
+    )
+
+    async with app.test_api() as ctx:
+        adapter_obj = get_driver()._adapters[str(SupportedAdapters.telegram)]
+        bot = ctx.create_bot(base=Bot, adapter=adapter_obj, config=BOT_CONFIG)
+        target_common = TargetTelegramCommon(chat_id=CHAT_ID)
+
+        receipts = []
+        for message_id in (MESSAGE_ID, MESSAGE_ID + 1):
+            ctx.should_call_api(
+                "send_message",
+                {**SEND_MESSAGE_PARAMS, "text": "114514"},
+                {**FAKE_MESSAGE_RETURN, "message_id": message_id},
+            )
+            receipts.append(await MessageFactory("114514").send_to(target_common, bot))
+
+        ctx.should_call_api(
+            "delete_messages",
+            {"chat_id": CHAT_ID, "message_ids": [MESSAGE_ID, MESSAGE_ID + 1]},
+            result=True,
+        )
+        results = await revoke_many(receipts)
+        assert [result.success for result in results] == [True, True]
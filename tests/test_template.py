@@ -0,0 +1,85 @@
+import pytest
+from nonebug import App
+from nonebot import get_adapter
+from nonebot.adapters.onebot.v12 import Bot, Adapter, Message, MessageSegment
+
+from tests.utils import ob12_kwargs
+
+
+def test_render(app: App):
+    from nonebot_plugin_saa import (
+        Text,
+        Mention,
+        Placeholder,
+        MessageFactory,
+        MessageTemplate,
+    )
+
+    template = MessageTemplate(
+        [Placeholder("user", Mention), " 你好，", Placeholder("name")]
+    )
+    assert template.render(user=Mention("1"), name="Alice") == MessageFactory(
+        [Mention("1"), Text(" 你好，"), Text("Alice")]
+    )
+    assert template.render(
+        user=Mention("1"), name=MessageFactory([Text("A"), Text("B")])
+    ) == MessageFactory([Mention("1"), Text(" 你好，"), Text("A"), Text("B")])
+
+    with pytest.raises(ValueError, match="name"):
+        template.render(user=Mention("1"))
+    with pytest.raises(TypeError, match="Mention"):
+        template.render(user="1", name="Alice")
+
+
+async def test_static_segments_built_once(app: App):
+    from nonebot_plugin_saa import (
+        Image,
+        Mention,
+        Placeholder,
+        TargetQQGroup,
+        MessageTemplate,
+    )
+
+    template = MessageTemplate([Placeholder("user", Mention), Image(b"\x89PNG\r")])
+    target = TargetQQGroup(group_id=2233)
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter), **ob12_kwargs())
+        ctx.should_call_api(
+            "upload_file",
+            {"type": "data", "name": "image", "data": b"\x89PNG\r"},
+            {"file_id": "123"},
+        )
+        for user_id in ("1", "2"):
+            ctx.should_call_api(
+                "send_message",
+                data={
+                    "message": Message(
+                        [MessageSegment.mention(user_id), MessageSegment.image("123")]
+                    ),
+                    "detail_type": "group",
+                    "group_id": "2233",
+                },
+                result={"message_id": user_id},
+            )
+            await template.send_to(target, bot, user=Mention(user_id))
+
+        # 丢弃预构建结果后重新上传
+        template.invalidate(bot)
+        ctx.should_call_api(
+            "upload_file",
+            {"type": "data", "name": "image", "data": b"\x89PNG\r"},
+            {"file_id": "456"},
+        )
+        ctx.should_call_api(
+            "send_message",
+            data={
+                "message": Message(
+                    [MessageSegment.mention("3"), MessageSegment.image("456")]
+                ),
+                "detail_type": "group",
+                "group_id": "2233",
+            },
+            result={"message_id": "3"},
+        )
+        await template.send_to(target, bot, user=Mention("3"))